@@ -1,10 +1,81 @@
 from fastapi import APIRouter
-from .endpoints import customers, sales, productivity, analytics, bi, customer
+from ..core.admission import RouteGroup
+from ..core.config import settings
+from .endpoints import customers, sales, productivity, analytics, bi, customer, kpi
 
 api_router = APIRouter()
+
+# Heavy routes, paths relative to api_router. Each group gets its own
+# concurrency limit and queue (app/core/admission.py); every other route is
+# admitted straight away, so cheap CRUD reads never wait behind these.
+admission_groups = [
+    RouteGroup(
+        "export",
+        [
+            "/sales/transactions/export",
+            "/bi/fato_financeiro/export",
+            "/bi/fato_oportunidades/export",
+            "/bi/fato_movimentacoes/export",
+            "/bi/columnar/{table_name}",
+        ],
+        max_concurrent=settings.ADMISSION_EXPORT_CONCURRENCY,
+        max_queue=settings.ADMISSION_EXPORT_QUEUE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    ),
+    RouteGroup(
+        "analytics",
+        [
+            "/customer/summary",
+            "/sales/transactions/rollup",
+            "/bi/fato_financeiro/rollup",
+            "/bi/funnel/stages",
+            "/bi/funnel/dwell",
+            "/bi/funnel/wins",
+            "/kpi/revenue/monthly",
+            "/kpi/funnel",
+            "/productivity/utilization",
+        ],
+        max_concurrent=settings.ADMISSION_ANALYTICS_CONCURRENCY,
+        max_queue=settings.ADMISSION_ANALYTICS_QUEUE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    ),
+]
+
+if settings.DATABASE_ASYNC:
+    # Registered first so they take precedence over the sync routes with the
+    # same path; endpoints without an async port keep using the sync session.
+    from .async_endpoints import (
+        customers as async_customers, sales as async_sales, productivity as async_productivity,
+        analytics as async_analytics, bi as async_bi, customer as async_customer,
+    )
+    api_router.include_router(async_customers.router, prefix="/customers", tags=["customers"])
+    api_router.include_router(async_sales.router, prefix="/sales", tags=["sales"])
+    api_router.include_router(async_productivity.router, prefix="/productivity", tags=["productivity"])
+    api_router.include_router(async_analytics.router, prefix="/analytics", tags=["analytics"])
+    api_router.include_router(async_bi.router, prefix="/bi", tags=["bi"])
+    api_router.include_router(async_customer.router, prefix="/customer", tags=["customer"])
+
+# Compression (app/core/compression.py). These routes are sent as they are:
+# Parquet is already compressed and Arrow is binary.
+uncompressed_routes = ["/bi/columnar/{table_name}"]
+# These serve the same payload to many pollers, so their compressed bodies are cached.
+precompressed_routes = [
+    "/customer/summary",
+    "/sales/transactions/rollup",
+    "/bi/fato_financeiro/rollup",
+    "/bi/usuarios/",
+]
+
 api_router.include_router(customers.router, prefix="/customers", tags=["customers"])
 api_router.include_router(sales.router, prefix="/sales", tags=["sales"])
 api_router.include_router(productivity.router, prefix="/productivity", tags=["productivity"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 api_router.include_router(bi.router, prefix="/bi", tags=["bi"])
-api_router.include_router(customer.router, prefix="/customer", tags=["customer"])
\ No newline at end of file
+api_router.include_router(customer.router, prefix="/customer", tags=["customer"])
+api_router.include_router(kpi.router, prefix="/kpi", tags=["kpi"])
+
+if settings.QUERY_PROFILING:
+    from .endpoints import debug
+    api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
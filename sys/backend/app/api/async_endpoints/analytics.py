@@ -0,0 +1,24 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...schemas import analytics as schemas
+from ...schemas.pagination import Page
+from ...crud.aio import crud_analytics as crud
+from .. import deps
+
+router = APIRouter()
+
+@router.post("/activities/", response_model=schemas.Activity)
+async def create_activity(
+    activity: schemas.ActivityCreate,
+    customer_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+):
+    return await crud.create_activity(db=db, activity=activity, customer_id=customer_id)
+
+@router.get("/activities/", response_model=Page[schemas.Activity])
+async def read_activities(
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(deps.get_async_db)
+):
+    activities, next_cursor = await crud.get_activities(db, cursor=cursor, limit=limit)
+    return {"items": activities, "next_cursor": next_cursor}
@@ -0,0 +1,27 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models
+from ...schemas import business_intelligence as schemas
+from ...schemas.pagination import Page
+from ...crud.aio import crud_bi as crud
+from ..conditional import conditional
+from ..deps import get_async_db
+
+router = APIRouter()
+
+@router.post("/usuarios/", response_model=schemas.DimUsuario)
+async def create_usuario(usuario: schemas.DimUsuarioCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud.create_usuario(db=db, usuario=usuario)
+
+@router.get("/usuarios/", response_model=Page[schemas.DimUsuario], dependencies=[conditional(models.DimUsuario)])
+async def read_usuarios(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_async_db)):
+    usuarios, next_cursor = await crud.get_usuarios(db, cursor=cursor, limit=limit)
+    return {"items": usuarios, "next_cursor": next_cursor}
+
+@router.get("/usuarios/{usuario_id}", response_model=schemas.DimUsuario)
+async def read_usuario(usuario_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_usuario = await crud.get_usuario(db, usuario_id=usuario_id)
+    if db_usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario not found")
+    return db_usuario
@@ -0,0 +1,25 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models
+from ...core.config import settings
+from ...schemas import customer as schemas
+from ...schemas.pagination import Page
+from ...crud.aio import crud_customer as crud
+from .. import deps
+from ..coalesce import coalesce
+from ..conditional import conditional
+
+router = APIRouter()
+
+@router.get("/summary", dependencies=[conditional(models.Customer)])
+@coalesce(ttl=settings.COALESCE_CACHE_TTL_SECONDS, tables=(models.Customer,))
+async def get_summary(db: AsyncSession = Depends(deps.get_async_db)):
+    return await crud.get_summary(db)
+
+@router.get("/customers", response_model=Page[schemas.Customer], dependencies=[conditional(models.Customer)])
+async def read_customers(
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(deps.get_async_db)
+):
+    customers, next_cursor = await crud.get_customers(db, cursor=cursor, limit=limit)
+    return {"items": customers, "next_cursor": next_cursor}
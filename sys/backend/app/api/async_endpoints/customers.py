@@ -0,0 +1,37 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models
+from ...schemas import customer as schemas
+from ...schemas.pagination import Page
+from ...crud.aio import crud_customer as crud
+from .. import deps
+from ..conditional import conditional
+
+router = APIRouter()
+
+@router.post("/", response_model=schemas.Customer)
+async def create_customer(
+    customer: schemas.CustomerCreate, db: AsyncSession = Depends(deps.get_async_db)
+):
+    return await crud.create_customer(db=db, customer=customer)
+
+@router.post("/bulk", response_model=schemas.CustomerBulkResult)
+async def upsert_customers(
+    customers: List[schemas.CustomerCreate], db: AsyncSession = Depends(deps.get_async_db)
+):
+    return {"upserted": await crud.upsert_customers(db=db, customers=customers)}
+
+@router.get("/", response_model=Page[schemas.Customer], dependencies=[conditional(models.Customer)])
+async def read_customers(
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(deps.get_async_db)
+):
+    customers, next_cursor = await crud.get_customers(db, cursor=cursor, limit=limit)
+    return {"items": customers, "next_cursor": next_cursor}
+
+@router.get("/{customer_id}", response_model=schemas.Customer)
+async def read_customer(customer_id: str, db: AsyncSession = Depends(deps.get_async_db)):
+    db_customer = await crud.get_customer(db, customer_id=customer_id)
+    if db_customer is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return db_customer
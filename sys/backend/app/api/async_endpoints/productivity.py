@@ -0,0 +1,34 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...core.config import settings
+from ...crud.expand import loaded_view, parse_expand
+from ...schemas import productivity as schemas
+from ...schemas.pagination import Page
+from ...crud.aio import crud_productivity as crud
+from ..deps import get_async_db
+from ..endpoints.productivity import work_log_rows
+
+router = APIRouter()
+
+@router.get("/teachers/", response_model=Page[schemas.TeacherExpanded])
+async def read_teachers(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    expand: List[str] = Query([], description="Relationships to embed: work_logs, schedule_entries"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    teachers, next_cursor = await crud.get_teachers(db, cursor=cursor, limit=limit, expand=parse_expand(expand))
+    return {"items": loaded_view(teachers), "next_cursor": next_cursor}
+
+@router.get("/work_logs/", response_model=Page[schemas.WorkLog])
+async def read_work_logs(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_async_db)):
+    if settings.FAST_JSON_RESPONSES:
+        return work_log_rows.page(*await crud.get_work_log_rows(db, cursor=cursor, limit=limit))
+    work_logs, next_cursor = await crud.get_work_logs(db, cursor=cursor, limit=limit)
+    return {"items": work_logs, "next_cursor": next_cursor}
+
+@router.get("/schedule_entries/", response_model=Page[schemas.ScheduleEntry])
+async def read_schedule_entries(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_async_db)):
+    schedule_entries, next_cursor = await crud.get_schedule_entries(db, cursor=cursor, limit=limit)
+    return {"items": schedule_entries, "next_cursor": next_cursor}
@@ -0,0 +1,47 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...core.config import settings
+from ...schemas import sales as schemas
+from ...schemas.pagination import Page
+from ...crud.aio import crud_sales as crud
+from .. import deps
+from ..endpoints.sales import transaction_rows
+
+router = APIRouter()
+
+@router.post("/funnels/", response_model=schemas.SalesFunnel)
+async def create_sales_funnel(
+    sales_funnel: schemas.SalesFunnelCreate,
+    customer_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+):
+    return await crud.create_sales_funnel(
+        db=db, sales_funnel=sales_funnel, customer_id=customer_id
+    )
+
+@router.get("/funnels/", response_model=Page[schemas.SalesFunnel])
+async def read_sales_funnels(
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(deps.get_async_db)
+):
+    sales_funnels, next_cursor = await crud.get_sales_funnel(db, cursor=cursor, limit=limit)
+    return {"items": sales_funnels, "next_cursor": next_cursor}
+
+@router.post("/transactions/", response_model=schemas.Transaction)
+async def create_transaction(
+    transaction: schemas.TransactionCreate,
+    customer_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+):
+    return await crud.create_transaction(
+        db=db, transaction=transaction, customer_id=customer_id
+    )
+
+@router.get("/transactions/", response_model=Page[schemas.Transaction])
+async def read_transactions(
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(deps.get_async_db)
+):
+    if settings.FAST_JSON_RESPONSES:
+        return transaction_rows.page(*await crud.get_transaction_rows(db, cursor=cursor, limit=limit))
+    transactions, next_cursor = await crud.get_transactions(db, cursor=cursor, limit=limit)
+    return {"items": transactions, "next_cursor": next_cursor}
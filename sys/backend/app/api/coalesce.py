@@ -0,0 +1,164 @@
+"""Single-flight coalescing of identical concurrent requests.
+
+``@coalesce()`` goes between the route decorator and the endpoint:
+
+    @router.get("/summary")
+    @coalesce()
+    def get_summary(db: Session = Depends(get_db)):
+        ...
+
+Calls with the same endpoint and the same path, query and body parameters
+share one in-flight computation. The first caller runs the endpoint and the
+others wait for its result or its exception. Parameters declared with
+``Depends`` (sessions and the like) are left out of the key. With ``ttl``, the
+result is also kept for that many seconds, so requests that arrive just after
+it finishes reuse it too. ``COALESCE_REQUESTS=false`` turns the decorator into
+a no-op.
+
+On routes with a ``conditional`` ETag, pass the same ``tables``: their
+``table_versions`` become part of the key, so a request that arrives after a
+write, in any worker, never joins a computation or reuses a result from
+before it and sends that older body under the newer ETag.
+
+Followers receive the very object the leader returned, so only use this on
+endpoints that return plain data (dicts, rows, schemas). ORM instances still
+bound to the leader's session must not be shared.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from enum import Enum
+from typing import Any, Hashable, Optional, Sequence
+
+from fastapi.params import Depends
+from pydantic import BaseModel
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.metrics import registry
+from ..crud import table_versions
+
+REQUESTS = registry.counter(
+    "coalesced_requests_total",
+    "Requests to coalescing endpoints by role: leader (computed), follower (shared in-flight result) or cached.",
+    ("endpoint", "role"),
+)
+
+_MISSING = object()
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(_freeze(item) for item in value)
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+def coalesce(ttl: Optional[float] = None, maxsize: int = 1_024, tables: Sequence = ()):
+    def decorator(func):
+        if not settings.COALESCE_REQUESTS:
+            return func
+        name = f"{func.__module__}.{func.__qualname__}"
+        keyed = [
+            parameter.name
+            for parameter in inspect.signature(func).parameters.values()
+            if not isinstance(parameter.default, Depends)
+        ]
+        cache = TTLCache(ttl=ttl, maxsize=maxsize) if ttl else None
+
+        def key_of(kwargs) -> Hashable:
+            params = tuple((param, _freeze(kwargs.get(param))) for param in keyed)
+            return (params, table_versions.versions.get(*tables)) if tables else params
+
+        def cached(key):
+            if cache is None:
+                return _MISSING
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                REQUESTS.labels(name, "cached").inc()
+            return value
+
+        if inspect.iscoroutinefunction(func):
+            in_flight = {}
+
+            @functools.wraps(func)
+            async def async_wrapper(**kwargs):
+                key = key_of(kwargs)
+                value = cached(key)
+                if value is not _MISSING:
+                    return value
+                task = in_flight.get(key)
+                if task is None:
+                    REQUESTS.labels(name, "leader").inc()
+                    # A task, so a leader whose client disconnects does not cancel the followers' result.
+                    task = in_flight[key] = asyncio.ensure_future(func(**kwargs))
+
+                    def finished(done, key=key):
+                        in_flight.pop(key, None)
+                        if cache is not None and not done.cancelled() and done.exception() is None:
+                            cache.set(key, done.result())
+
+                    task.add_done_callback(finished)
+                else:
+                    REQUESTS.labels(name, "follower").inc()
+                return await asyncio.shield(task)
+
+            return async_wrapper
+
+        in_flight_calls = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            key = key_of(kwargs)
+            value = cached(key)
+            if value is not _MISSING:
+                return value
+            with lock:
+                call = in_flight_calls.get(key)
+                leader = call is None
+                if leader:
+                    call = in_flight_calls[key] = _Call()
+            if not leader:
+                REQUESTS.labels(name, "follower").inc()
+                call.done.wait()
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            REQUESTS.labels(name, "leader").inc()
+            try:
+                call.result = func(**kwargs)
+                if cache is not None:
+                    cache.set(key, call.result)
+                return call.result
+            except BaseException as exc:
+                call.error = exc
+                raise
+            finally:
+                with lock:
+                    in_flight_calls.pop(key, None)
+                call.done.set()
+
+        return wrapper
+
+    return decorator
@@ -1,4 +1,4 @@
-from ..core.database import SessionLocal
+from ..core.database import SessionLocal, AsyncSessionLocal
 
 def get_db():
     db = SessionLocal()
@@ -6,3 +6,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access is disabled; set DATABASE_ASYNC=true")
+    async with AsyncSessionLocal() as db:
+        yield db
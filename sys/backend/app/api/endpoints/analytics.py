@@ -1,8 +1,9 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from ... import models
 from ...schemas import analytics as schemas
+from ...schemas.pagination import Page
 from ...crud import crud_analytics as crud
 from .. import deps
 
@@ -16,9 +17,9 @@ def create_activity(
 ):
     return crud.create_activity(db=db, activity=activity, customer_id=customer_id)
 
-@router.get("/activities/", response_model=List[schemas.Activity])
+@router.get("/activities/", response_model=Page[schemas.Activity])
 def read_activities(
-    skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(deps.get_db)
 ):
-    activities = crud.get_activities(db, skip=skip, limit=limit)
-    return activities
\ No newline at end of file
+    activities, next_cursor = crud.get_activities(db, cursor=cursor, limit=limit)
+    return {"items": activities, "next_cursor": next_cursor}
\ No newline at end of file
@@ -1,9 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Union
 
-from ... import crud
+from ... import crud, models
+from ...core.config import settings
+from ...core.database import SessionLocal
+from ...crud import dimension_cache
+from ...crud.expand import loaded_view, parse_expand
 from ...schemas import business_intelligence as schemas
+from ...schemas.batch import BatchRequest, BatchResult
+from ...schemas.enums import BiDimension, ColumnarFormat, ExportFormat, FinanceiroDimension, RollupBucket, WinGroupBy
+from ...schemas.pagination import Page
+from ...schemas.rollup import Rollup
+from ...services import columnar_export, export_service
+from ..coalesce import coalesce
+from ..conditional import conditional
 from ..deps import get_db
 
 router = APIRouter()
@@ -12,10 +25,10 @@ router = APIRouter()
 def create_usuario(usuario: schemas.DimUsuarioCreate, db: Session = Depends(get_db)):
     return crud.crud_bi.create_usuario(db=db, usuario=usuario)
 
-@router.get("/usuarios/", response_model=List[schemas.DimUsuario])
-def read_usuarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    usuarios = crud.crud_bi.get_usuarios(db, skip=skip, limit=limit)
-    return usuarios
+@router.get("/usuarios/", response_model=Page[schemas.DimUsuario], dependencies=[conditional(models.DimUsuario)])
+def read_usuarios(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    usuarios, next_cursor = crud.crud_bi.get_usuarios(db, cursor=cursor, limit=limit)
+    return {"items": usuarios, "next_cursor": next_cursor}
 
 @router.get("/usuarios/{usuario_id}", response_model=schemas.DimUsuario)
 def read_usuario(usuario_id: int, db: Session = Depends(get_db)):
@@ -24,4 +37,110 @@ def read_usuario(usuario_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Usuario not found")
     return db_usuario
 
+@router.get(
+    "/oportunidades/", response_model=Page[schemas.FatoOportunidadesExpanded],
+    dependencies=[conditional(*crud.crud_bi.OPORTUNIDADE_TABLES)],
+)
+def read_oportunidades(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    expand: List[str] = Query([], description="Relationships to embed: " + ", ".join(crud.crud_bi.OPORTUNIDADE_EXPANSIONS)),
+    db: Session = Depends(get_db),
+):
+    oportunidades, next_cursor = crud.crud_bi.get_oportunidades(db, cursor=cursor, limit=limit, expand=parse_expand(expand))
+    labels = dimension_cache.cache.labels(db, oportunidades, dimension_cache.OPORTUNIDADE_LABELS)
+    return {"items": loaded_view(oportunidades, labels), "next_cursor": next_cursor}
+
+@router.get(
+    "/movimentacoes/", response_model=Page[schemas.FatoMovimentacoesExpanded],
+    dependencies=[conditional(*crud.crud_bi.MOVIMENTACAO_TABLES)],
+)
+def read_movimentacoes(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    expand: List[str] = Query([], description="Relationships to embed: " + ", ".join(crud.crud_bi.MOVIMENTACAO_EXPANSIONS)),
+    db: Session = Depends(get_db),
+):
+    movimentacoes, next_cursor = crud.crud_bi.get_movimentacoes(db, cursor=cursor, limit=limit, expand=parse_expand(expand))
+    labels = dimension_cache.cache.labels(db, movimentacoes, dimension_cache.MOVIMENTACAO_LABELS)
+    return {"items": loaded_view(movimentacoes, labels), "next_cursor": next_cursor}
+
+DimensionRow = Union[tuple(schema for _, schema in crud.crud_bi.DIMENSIONS.values())]
+
+@router.post("/{dimension}/batch", response_model=BatchResult[DimensionRow, int])
+def read_dimension_batch(dimension: BiDimension, request: BatchRequest[int], db: Session = Depends(get_db)):
+    rows, missing = crud.crud_bi.get_many(db, dimension, request.ids)
+    return {"items": rows, "missing": missing}
+
+def _export(model, format: ExportFormat):
+    return StreamingResponse(
+        export_service.export_table(SessionLocal, model, format),
+        media_type=export_service.MEDIA_TYPES[format],
+    )
+
+@router.get("/fato_financeiro/rollup", response_model=Rollup)
+@coalesce(ttl=settings.COALESCE_CACHE_TTL_SECONDS)
+def read_fato_financeiro_rollup(
+    start: datetime,
+    end: datetime,
+    bucket: RollupBucket = RollupBucket.day,
+    group_by: List[FinanceiroDimension] = Query([]),
+    db: Session = Depends(get_db),
+):
+    rows = crud.crud_bi.get_financeiro_rollup(db, bucket=bucket, start=start, end=end, group_by=group_by)
+    return {"bucket": bucket, "start": start, "end": end, "group_by": group_by, "rows": rows}
+
+@router.get("/fato_financeiro/export")
+def export_fato_financeiro(format: ExportFormat = ExportFormat.ndjson):
+    return _export(models.FatoFinanceiro, format)
+
+@router.get("/fato_oportunidades/export")
+def export_fato_oportunidades(format: ExportFormat = ExportFormat.ndjson):
+    return _export(models.FatoOportunidades, format)
+
+@router.get("/fato_movimentacoes/export")
+def export_fato_movimentacoes(format: ExportFormat = ExportFormat.ndjson):
+    return _export(models.FatoMovimentacoes, format)
+
+@router.get("/columnar/{table_name}")
+def export_columnar(table_name: str, format: ColumnarFormat = ColumnarFormat.parquet):
+    model = columnar_export.BI_TABLES.get(table_name)
+    if model is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    try:
+        columnar_export.require_pyarrow()
+    except columnar_export.ColumnarExportUnavailable as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    filename = f"{table_name}.{columnar_export.FILE_EXTENSIONS[format]}"
+    return StreamingResponse(
+        columnar_export.stream_table(SessionLocal, model, format),
+        media_type=columnar_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/funnel/stages", response_model=List[schemas.FunnelStageStats])
+@coalesce(ttl=settings.COALESCE_CACHE_TTL_SECONDS)
+def read_funnel_stages(
+    start: Optional[datetime] = None, end: Optional[datetime] = None, db: Session = Depends(get_db)
+):
+    return crud.crud_funnel.get_stage_funnel(db, start=start, end=end)
+
+@router.get("/funnel/dwell", response_model=List[schemas.StageDwell])
+@coalesce(ttl=settings.COALESCE_CACHE_TTL_SECONDS)
+def read_funnel_dwell(
+    start: Optional[datetime] = None, end: Optional[datetime] = None, db: Session = Depends(get_db)
+):
+    return crud.crud_funnel.get_stage_dwell(db, start=start, end=end)
+
+@router.get("/funnel/wins", response_model=List[schemas.WinsByGroup])
+@coalesce(ttl=settings.COALESCE_CACHE_TTL_SECONDS)
+def read_funnel_wins(
+    group_by: WinGroupBy = WinGroupBy.origem,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    won_stage_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    return crud.crud_funnel.get_wins(db, group_by=group_by, start=start, end=end, won_stage_id=won_stage_id)
+
 # Add similar endpoints for all other models...
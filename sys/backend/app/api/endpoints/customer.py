@@ -1,37 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 
-from ... import crud
+from ... import crud, models
 from ...schemas import customer as schemas
+from ...schemas.pagination import Page
+from ..coalesce import coalesce
+from ..conditional import conditional
 from ..deps import get_db
+from ...core.config import settings
 from ...services import customer_data_service
 
 router = APIRouter()
 
 @router.on_event("startup")
 def on_startup():
-    db = next(get_db())
-    customer_data_service.load_and_process_data(db)
+    # Returns at once: the load runs in a background thread of one worker only.
+    if settings.DATA_LOAD_ON_STARTUP:
+        customer_data_service.data_load_job.start(force=settings.DATA_LOAD_FORCE)
 
 @router.get("/status")
 def get_status():
-    return {"status": "ok"}
+    return {"status": "ok", "data_load": customer_data_service.data_load_job.status()}
 
-@router.get("/summary")
+@router.get("/summary", dependencies=[conditional(models.Customer)])
+@coalesce(ttl=settings.COALESCE_CACHE_TTL_SECONDS, tables=(models.Customer,))
 def get_summary(db: Session = Depends(get_db)):
-    total_customers = db.query(crud.crud_customer.models.Customer).count()
-    active_customers = db.query(crud.crud_customer.models.Customer).filter(crud.crud_customer.models.Customer.status == 'Active').count()
-    total_revenue = db.query(crud.crud_customer.func.sum(crud.crud_customer.models.Customer.total_spent)).scalar()
-    avg_customer_value = total_revenue / total_customers if total_customers > 0 else 0
-    return {
-        'total_customers': total_customers,
-        'active_customers': active_customers,
-        'total_revenue': total_revenue,
-        'avg_customer_value': avg_customer_value
-    }
+    return crud.crud_customer.get_summary(db)
 
-@router.get("/customers", response_model=List[schemas.Customer])
-def read_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    customers = crud.crud_customer.get_customers(db, skip=skip, limit=limit)
-    return customers
+@router.get("/customers", response_model=Page[schemas.Customer], dependencies=[conditional(models.Customer)])
+def read_customers(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    customers, next_cursor = crud.crud_customer.get_customers(db, cursor=cursor, limit=limit)
+    return {"items": customers, "next_cursor": next_cursor}
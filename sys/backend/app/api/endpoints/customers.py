@@ -1,10 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from ... import models
 from ...schemas import customer as schemas
+from ...schemas.batch import BatchRequest, BatchResult
+from ...schemas.pagination import Page
 from ...crud import crud_customer as crud
 from .. import deps
+from ..conditional import conditional
 
 router = APIRouter()
 
@@ -14,15 +17,26 @@ def create_customer(
 ):
     return crud.create_customer(db=db, customer=customer)
 
-@router.get("/", response_model=List[schemas.Customer])
+@router.post("/bulk", response_model=schemas.CustomerBulkResult)
+def upsert_customers(
+    customers: List[schemas.CustomerCreate], db: Session = Depends(deps.get_db)
+):
+    return {"upserted": crud.upsert_customers(db=db, customers=customers)}
+
+@router.post("/batch", response_model=BatchResult[schemas.Customer, str])
+def read_customers_batch(request: BatchRequest[str], db: Session = Depends(deps.get_db)):
+    customers, missing = crud.get_many(db, ids=request.ids)
+    return {"items": customers, "missing": missing}
+
+@router.get("/", response_model=Page[schemas.Customer], dependencies=[conditional(models.Customer)])
 def read_customers(
-    skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(deps.get_db)
 ):
-    customers = crud.get_customers(db, skip=skip, limit=limit)
-    return customers
+    customers, next_cursor = crud.get_customers(db, cursor=cursor, limit=limit)
+    return {"items": customers, "next_cursor": next_cursor}
 
 @router.get("/{customer_id}", response_model=schemas.Customer)
-def read_customer(customer_id: int, db: Session = Depends(deps.get_db)):
+def read_customer(customer_id: str, db: Session = Depends(deps.get_db)):
     db_customer = crud.get_customer(db, customer_id=customer_id)
     if db_customer is None:
         raise HTTPException(status_code=404, detail="Customer not found")
@@ -0,0 +1,26 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+
+from ...core import query_profiler
+from ...core.config import settings
+
+router = APIRouter()
+
+def _profiler():
+    if query_profiler.profiler is None:
+        raise HTTPException(status_code=404, detail="Query profiling is disabled")
+    return query_profiler.profiler
+
+@router.get("/queries")
+def read_query_profile(limit: Optional[int] = 50):
+    return {"statements": _profiler().report(limit=limit)}
+
+@router.post("/queries/dump")
+def dump_query_profile():
+    path = settings.QUERY_PROFILE_PATH
+    return {"path": path, "statements": _profiler().dump(path)}
+
+@router.delete("/queries")
+def reset_query_profile():
+    _profiler().reset()
+    return {"status": "ok"}
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ...schemas import kpi as schemas
+from ...crud import crud_kpi as crud
+from .. import deps
+
+router = APIRouter()
+
+@router.get("/customers/{customer_id}", response_model=schemas.CustomerTotals)
+def read_customer_totals(customer_id: str, db: Session = Depends(deps.get_db)):
+    totals = crud.get_customer_totals(db, customer_id=customer_id)
+    if totals is None:
+        raise HTTPException(status_code=404, detail="No KPIs recorded for this customer")
+    return totals
+
+@router.get("/revenue/monthly", response_model=List[schemas.MonthlyRevenue])
+def read_monthly_revenue(
+    start: Optional[datetime] = None, end: Optional[datetime] = None, db: Session = Depends(deps.get_db)
+):
+    return crud.get_monthly_revenue(db, start=start, end=end)
+
+@router.get("/funnel", response_model=List[schemas.FunnelStageCount])
+def read_funnel_stages(db: Session = Depends(deps.get_db)):
+    return crud.get_funnel_stages(db)
@@ -1,24 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime, time, timedelta
+from typing import List, Optional
 
 from ... import crud
+from ...core.config import settings
+from ...crud.expand import loaded_view, parse_expand
 from ...schemas import productivity as schemas
+from ...schemas.pagination import Page
+from ..coalesce import coalesce
 from ..deps import get_db
+from ..fast_json import RowSerializer
 
 router = APIRouter()
 
-@router.get("/teachers/", response_model=List[schemas.Teacher])
-def read_teachers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    teachers = crud.crud_productivity.get_teachers(db, skip=skip, limit=limit)
-    return teachers
+work_log_rows = RowSerializer(schemas.WorkLog)
 
-@router.get("/work_logs/", response_model=List[schemas.WorkLog])
-def read_work_logs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    work_logs = crud.crud_productivity.get_work_logs(db, skip=skip, limit=limit)
-    return work_logs
+@router.get("/teachers/", response_model=Page[schemas.TeacherExpanded])
+def read_teachers(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    expand: List[str] = Query([], description="Relationships to embed: work_logs, schedule_entries"),
+    db: Session = Depends(get_db),
+):
+    teachers, next_cursor = crud.crud_productivity.get_teachers(db, cursor=cursor, limit=limit, expand=parse_expand(expand))
+    return {"items": loaded_view(teachers), "next_cursor": next_cursor}
 
-@router.get("/schedule_entries/", response_model=List[schemas.ScheduleEntry])
-def read_schedule_entries(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    schedule_entries = crud.crud_productivity.get_schedule_entries(db, skip=skip, limit=limit)
-    return schedule_entries
+@router.get("/utilization", response_model=List[schemas.TeacherUtilization])
+@coalesce(ttl=settings.COALESCE_CACHE_TTL_SECONDS)
+def read_utilization(
+    start: datetime,
+    end: datetime,
+    teacher_id: List[int] = Query([], description="Restrict to these teachers; all when omitted"),
+    db: Session = Depends(get_db),
+):
+    return crud.crud_productivity.get_utilization(db, start=start, end=end, teacher_ids=teacher_id or None)
+
+@router.get("/schedule/overlaps", response_model=List[schemas.ScheduleEntry])
+def read_schedule_overlaps(
+    start: datetime,
+    end: datetime,
+    teacher_id: Optional[int] = None,
+    day: Optional[int] = Query(None, ge=0, le=6, description="Weekday, 0 = Sunday"),
+    class_type: Optional[schemas.ClassType] = None,
+    exclude_id: Optional[int] = Query(None, description="Entry being edited, so it does not conflict with itself"),
+    db: Session = Depends(get_db),
+):
+    return crud.crud_productivity.get_schedule_overlaps(
+        db, start=start, end=end, teacher_id=teacher_id, day=day,
+        class_type=class_type.value if class_type else None, exclude_id=exclude_id,
+    )
+
+@router.get("/schedule/free_slots", response_model=List[schemas.FreeSlot])
+def read_free_slots(
+    teacher_id: int,
+    week_start: Optional[datetime] = Query(None, description="Defaults to this week's Monday"),
+    opens: time = time(6),
+    closes: time = time(22),
+    min_minutes: int = Query(30, ge=1),
+    db: Session = Depends(get_db),
+):
+    if week_start is None:
+        today = datetime.combine(datetime.now().date(), time())
+        week_start = today - timedelta(days=today.weekday())
+    return crud.crud_productivity.get_free_slots(
+        db, teacher_id, week_start, week_start + timedelta(days=7),
+        opens=opens, closes=closes, min_length=timedelta(minutes=min_minutes),
+    )
+
+@router.get("/work_logs/", response_model=Page[schemas.WorkLog])
+def read_work_logs(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    if settings.FAST_JSON_RESPONSES:
+        return work_log_rows.page(*crud.crud_productivity.get_work_log_rows(db, cursor=cursor, limit=limit))
+    work_logs, next_cursor = crud.crud_productivity.get_work_logs(db, cursor=cursor, limit=limit)
+    return {"items": work_logs, "next_cursor": next_cursor}
+
+@router.get("/schedule_entries/", response_model=Page[schemas.ScheduleEntry])
+def read_schedule_entries(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    schedule_entries, next_cursor = crud.crud_productivity.get_schedule_entries(db, cursor=cursor, limit=limit)
+    return {"items": schedule_entries, "next_cursor": next_cursor}
@@ -1,13 +1,25 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from ... import models
+from ...core.config import settings
+from ...core.database import SessionLocal
+from ...schemas.enums import ExportFormat, RollupBucket, TransactionDimension
 from ...schemas import sales as schemas
+from ...schemas.pagination import Page
+from ...schemas.rollup import Rollup
 from ...crud import crud_sales as crud
+from ...services import export_service
 from .. import deps
+from ..coalesce import coalesce
+from ..fast_json import RowSerializer
 
 router = APIRouter()
 
+transaction_rows = RowSerializer(schemas.Transaction)
+
 @router.post("/funnels/", response_model=schemas.SalesFunnel)
 def create_sales_funnel(
     sales_funnel: schemas.SalesFunnelCreate,
@@ -18,12 +30,12 @@ def create_sales_funnel(
         db=db, sales_funnel=sales_funnel, customer_id=customer_id
     )
 
-@router.get("/funnels/", response_model=List[schemas.SalesFunnel])
+@router.get("/funnels/", response_model=Page[schemas.SalesFunnel])
 def read_sales_funnels(
-    skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(deps.get_db)
 ):
-    sales_funnels = crud.get_sales_funnel(db, skip=skip, limit=limit)
-    return sales_funnels
+    sales_funnels, next_cursor = crud.get_sales_funnel(db, cursor=cursor, limit=limit)
+    return {"items": sales_funnels, "next_cursor": next_cursor}
 
 @router.post("/transactions/", response_model=schemas.Transaction)
 def create_transaction(
@@ -35,9 +47,36 @@ def create_transaction(
         db=db, transaction=transaction, customer_id=customer_id
     )
 
-@router.get("/transactions/", response_model=List[schemas.Transaction])
+@router.post("/transactions/bulk", response_model=schemas.TransactionBulkResult)
+def create_transactions(
+    transactions: List[schemas.TransactionBulkCreate], db: Session = Depends(deps.get_db)
+):
+    return {"created": crud.create_transactions(db, transactions=transactions)}
+
+@router.get("/transactions/", response_model=Page[schemas.Transaction])
 def read_transactions(
-    skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(deps.get_db)
+):
+    if settings.FAST_JSON_RESPONSES:
+        return transaction_rows.page(*crud.get_transaction_rows(db, cursor=cursor, limit=limit))
+    transactions, next_cursor = crud.get_transactions(db, cursor=cursor, limit=limit)
+    return {"items": transactions, "next_cursor": next_cursor}
+
+@router.get("/transactions/rollup", response_model=Rollup)
+@coalesce(ttl=settings.COALESCE_CACHE_TTL_SECONDS)
+def read_transactions_rollup(
+    start: datetime,
+    end: datetime,
+    bucket: RollupBucket = RollupBucket.day,
+    group_by: List[TransactionDimension] = Query([]),
+    db: Session = Depends(deps.get_db),
 ):
-    transactions = crud.get_transactions(db, skip=skip, limit=limit)
-    return transactions
\ No newline at end of file
+    rows = crud.get_transaction_rollup(db, bucket=bucket, start=start, end=end, group_by=group_by)
+    return {"bucket": bucket, "start": start, "end": end, "group_by": group_by, "rows": rows}
+
+@router.get("/transactions/export")
+def export_transactions(format: ExportFormat = ExportFormat.ndjson):
+    return StreamingResponse(
+        export_service.export_table(SessionLocal, models.Transaction, format),
+        media_type=export_service.MEDIA_TYPES[format],
+    )
@@ -0,0 +1,129 @@
+"""Admission control: concurrency limits with bounded queues for groups of heavy routes.
+
+A ``RouteGroup`` names some route templates (``/bi/columnar/{table_name}``)
+and says how many of its requests may run at once. Requests beyond that
+limit wait in the group's queue for at most ``queue_timeout`` seconds. When
+the queue is full or the wait times out, the request is turned away with
+``503 Service Unavailable`` and a ``Retry-After`` header. Routes in no group
+are never queued, so cheap reads keep their threads while exports and
+analytics pile up.
+
+``AdmissionMiddleware`` does the check in the event loop, before a sync
+endpoint gets a threadpool thread. It keeps the slot until the response has
+been sent, streamed bodies included.
+"""
+import asyncio
+import json
+import time
+from typing import List, Optional, Sequence
+
+from starlette.routing import compile_path
+
+from .metrics import registry
+
+QUEUE_WAIT = registry.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a slot, by route group.", ("group",),
+)
+REJECTIONS = registry.counter(
+    "admission_rejections_total", "Requests turned away with 503, by route group and reason.", ("group", "reason"),
+)
+IN_FLIGHT = registry.gauge("admission_in_flight", "Requests holding a slot, by route group.", ("group",))
+QUEUED = registry.gauge("admission_queue_depth", "Requests waiting for a slot, by route group.", ("group",))
+
+
+class RouteGroup:
+    def __init__(
+        self,
+        name: str,
+        routes: Sequence[str],
+        max_concurrent: int,
+        max_queue: int = 0,
+        queue_timeout: float = 10.0,
+        retry_after: int = 5,
+    ):
+        self.name = name
+        self.routes = list(routes)
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.waiting = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _slots(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; a new loop (a new test client) starts afresh.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._semaphore, self.waiting = loop, asyncio.Semaphore(self.max_concurrent), 0
+        return self._semaphore
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns why not (``queue_full`` or ``timeout``) when the request must be shed."""
+        slots = self._slots()
+        if not slots.locked():
+            await slots.acquire()
+            QUEUE_WAIT.labels(self.name).observe(0.0)
+            return None
+        if self.waiting >= self.max_queue:
+            return "queue_full"
+        self.waiting += 1
+        QUEUED.labels(self.name).inc()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            return "timeout"
+        finally:
+            self.waiting -= 1
+            QUEUED.labels(self.name).dec()
+        QUEUE_WAIT.labels(self.name).observe(time.perf_counter() - start)
+        return None
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, groups: Sequence[RouteGroup], prefix: str = ""):
+        self.app = app
+        self.groups: List[tuple] = [
+            (compile_path(prefix + route)[0], group) for group in groups for route in group.routes
+        ]
+
+    def _group(self, path: str) -> Optional[RouteGroup]:
+        for pattern, group in self.groups:
+            if pattern.match(path):
+                return group
+        return None
+
+    async def __call__(self, scope, receive, send):
+        group = self._group(scope["path"]) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+        reason = await group.acquire()
+        if reason is not None:
+            REJECTIONS.labels(group.name, reason).inc()
+            await _unavailable(send, group)
+            return
+        IN_FLIGHT.labels(group.name).inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            IN_FLIGHT.labels(group.name).dec()
+            group.release()
+
+
+async def _unavailable(send, group: RouteGroup) -> None:
+    body = json.dumps({"detail": f"Too many {group.name} requests in progress; retry later"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(group.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,193 @@
+"""Response compression (brotli or gzip) with a cache of precompressed bodies.
+
+``CompressionMiddleware`` picks brotli when the client accepts it and the
+``brotli`` package is installed, and gzip otherwise. It compresses text-like
+responses (JSON, CSV, text) of at least ``minimum_size`` bytes. Bodies that
+are streamed in several chunks are compressed as they go. Responses that
+already carry a ``Content-Encoding`` are left alone, and so are the routes in
+``exclude``.
+
+The routes in ``cacheable`` return the same bytes to many callers: the
+summary, the rollups, the dimension lists. For those, the compressed body is
+kept in an LRU cache keyed by encoding and a digest of the uncompressed body,
+so a hot payload is compressed once. Hashing is far cheaper than compressing,
+brotli especially. Streamed bodies are never cached.
+
+Routes are matched on their templates (``/bi/columnar/{table_name}``), read
+from the ``route`` the router leaves in the scope.
+"""
+import gzip
+import hashlib
+import zlib
+from typing import Optional, Sequence
+
+from .cache import LRUCache
+from .metrics import registry
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CACHE_LOOKUPS = registry.counter(
+    "compression_cache_lookups_total", "Precompressed body cache lookups by result.", ("result",),
+)
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/xml", "application/javascript")
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """``br``, ``gzip`` or ``None``, honouring ``q=0``; brotli only when installed."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress, self._finish = self._compressor.process, self._compressor.finish
+        else:
+            # wbits=31: zlib with a gzip header and trailer.
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._compress, self._finish = self._compressor.compress, self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1_024,
+        exclude: Sequence[str] = (),
+        cacheable: Sequence[str] = (),
+        prefix: str = "",
+        cache_size: int = 256,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude = {prefix + route for route in exclude}
+        self.cacheable = {prefix + route for route in cacheable}
+        self.cache = LRUCache(maxsize=cache_size)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = accepted_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self, scope, encoding, send).run(receive)
+
+    def compress_body(self, body: bytes, encoding: str, cacheable: bool) -> bytes:
+        if not cacheable:
+            return compress(body, encoding, self.gzip_level, self.brotli_quality)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        CACHE_LOOKUPS.labels("miss" if compressed is None else "hit").inc()
+        if compressed is None:
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            self.cache.set(key, compressed)
+        return compressed
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, scope, encoding: str, send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.send = send
+        self.start = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def run(self, receive) -> None:
+        await self.middleware.app(self.scope, receive, self.send_wrapper)
+
+    def _route(self) -> Optional[str]:
+        route = self.scope.get("route")
+        return getattr(route, "path", None)
+
+    def _eligible(self) -> bool:
+        headers = {name.lower(): value for name, value in self.start["headers"]}
+        if b"content-encoding" in headers or self._route() in self.middleware.exclude:
+            return False
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _headers(self, length: Optional[int]) -> list:
+        headers = [
+            (name, value) for name, value in self.start["headers"]
+            if name.lower() not in (b"content-length", b"vary")
+        ]
+        vary = [value for name, value in self.start["headers"] if name.lower() == b"vary"]
+        headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return headers
+
+    async def send_wrapper(self, message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows the size.
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body, more_body = message.get("body", b""), message.get("more_body", False)
+        if self.compressor is None:
+            start = self.start
+            if not self._eligible() or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            if not more_body:
+                compressed = self.middleware.compress_body(
+                    body, self.encoding, self._route() in self.middleware.cacheable,
+                )
+                await self.send({**start, "headers": self._headers(len(compressed))})
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            await self.send({**start, "headers": self._headers(None)})
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
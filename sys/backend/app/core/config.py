@@ -1,9 +1,84 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./test.db"
+    # Serve the CRUD endpoints from async routes on an asyncpg/aiosqlite engine.
+    DATABASE_ASYNC: bool = False
+    # Defaults to DATABASE_URL with its driver swapped for the async one.
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool (ignored for in-memory SQLite, which uses a single connection).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite performance mode: WAL lets readers proceed while a writer commits.
+    SQLITE_PERFORMANCE_MODE: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    # Negative values are KiB, as in PRAGMA cache_size.
+    SQLITE_CACHE_SIZE: int = -64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Serve the large list endpoints from row tuples, bulk-validated and encoded with orjson.
+    FAST_JSON_RESPONSES: bool = False
+
+    SUMMARY_CACHE_TTL_SECONDS: float = 30.0
+    # Identical concurrent requests to the analytics endpoints share one computation;
+    # a positive value also reuses the result for that many seconds.
+    COALESCE_REQUESTS: bool = True
+    COALESCE_CACHE_TTL_SECONDS: float = 0.0
+    # Rollups: the open (current) bucket is cached for ROLLUP_CACHE_TTL_SECONDS, closed ones
+    # until their table version changes or, for rows loaded behind the crud layer, the closed TTL.
+    ROLLUP_CACHE_TTL_SECONDS: float = 30.0
+    ROLLUP_CLOSED_CACHE_TTL_SECONDS: float = 3600.0
+    ROLLUP_CACHE_MAXSIZE: int = 10_000
+    ROLLUP_MAX_BUCKETS: int = 1_000
+    # Rows of the small dim_* tables kept per process for the batch lookup endpoints.
+    DIMENSION_CACHE_MAXSIZE: int = 50_000
+    # Schedule interval index: ids skipped by a sync are re-checked for SCHEDULE_INDEX_GAP_TTL_SECONDS
+    # in case their transaction commits late; the whole index is reloaded every SCHEDULE_INDEX_RELOAD_SECONDS.
+    SCHEDULE_INDEX_GAP_TTL_SECONDS: float = 60.0
+    SCHEDULE_INDEX_RELOAD_SECONDS: float = 3600.0
+
+    # Admission control for the route groups declared in app/api/api.py: requests
+    # beyond the concurrency limit queue, and past the queue cap or timeout get 503.
+    ADMISSION_CONTROL: bool = True
+    ADMISSION_ANALYTICS_CONCURRENCY: int = 8
+    ADMISSION_ANALYTICS_QUEUE: int = 32
+    ADMISSION_EXPORT_CONCURRENCY: int = 2
+    ADMISSION_EXPORT_QUEUE: int = 4
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+
+    # Spreadsheet load at startup: runs in the background in whichever worker
+    # takes the lock; every worker reads its progress from the status file. Once
+    # the file records a successful load it is not repeated unless DATA_LOAD_FORCE.
+    DATA_LOAD_ON_STARTUP: bool = True
+    DATA_LOAD_FORCE: bool = False
+    DATA_LOAD_LOCK_PATH: str = "data_load.lock"
+    DATA_LOAD_STATUS_PATH: str = "data_load_status.json"
+
+    # gzip/brotli for text responses of at least COMPRESSION_MINIMUM_SIZE bytes; the
+    # cacheable routes in app/api/api.py keep their compressed bodies in an LRU cache.
+    COMPRESSION: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CACHE_MAXSIZE: int = 256
+
+    # Per-table version counters behind the ETags of polled endpoints, shared by all workers.
+    TABLE_VERSIONS_PATH: str = "table_versions.bin"
+
+    # Query profiler (debug only): per-statement timings, EXPLAIN of slow statements.
+    QUERY_PROFILING: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    QUERY_PROFILE_PATH: str = "query_profile.json"
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
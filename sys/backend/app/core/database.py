@@ -1,11 +1,82 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from ..core.config import settings
 
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()!r} databases")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    url = make_url(url)
+    if _is_memory_sqlite(url):
+        return {}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if is_async:
+        # aiosqlite defaults to NullPool, which rejects the queue-pool options.
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+def sqlite_pragmas() -> dict:
+    return {
+        "journal_mode": "WAL",
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "temp_store": "MEMORY",
+    }
+
+def configure_sqlite(sync_engine, pragmas: dict) -> None:
+    """Run ``PRAGMA`` statements on every new DBAPI connection of a SQLite engine."""
+    if sync_engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def _pragmas_for(url: str) -> dict:
+    if not settings.SQLITE_PERFORMANCE_MODE or _is_memory_sqlite(make_url(url)):
+        return {}
+    return sqlite_pragmas()
+
 engine = create_engine(
-    settings.DATABASE_URL
+    settings.DATABASE_URL, **engine_options(settings.DATABASE_URL)
 )
+configure_sqlite(engine, _pragmas_for(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_database_url, **engine_options(async_database_url, is_async=True))
+    configure_sqlite(async_engine.sync_engine, _pragmas_for(async_database_url))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
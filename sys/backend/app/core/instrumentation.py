@@ -0,0 +1,124 @@
+"""Per-request latency, in-flight and database metrics.
+
+``TimingMiddleware`` is a plain ASGI middleware (no ``BaseHTTPMiddleware``
+task group per request). It opens a ``RequestStats`` in a context variable
+that the SQLAlchemy hooks installed by ``instrument_engine`` add statement
+time and row counts to; context variables follow sync routes into the
+threadpool, so both sync and async routes are covered.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+
+from .metrics import ROW_BUCKETS, registry
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.",
+)
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.", ("method", "route"),
+)
+REQUEST_DB_STATEMENTS = registry.histogram(
+    "http_request_db_statements", "SQL statements executed per request.", ("method", "route"),
+    buckets=ROW_BUCKETS,
+)
+REQUEST_DB_ROWS = registry.histogram(
+    "http_request_db_rows", "ORM rows loaded plus rows written per request.", ("method", "route"),
+    buckets=ROW_BUCKETS,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    __slots__ = ("db_time", "statements", "rows")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.statements = 0
+        self.rows = 0
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start_time"].pop()
+    stats = current_request_stats.get()
+    if stats is None:
+        return
+    stats.db_time += time.perf_counter() - start
+    stats.statements += 1
+    if context is not None and (context.isinsert or context.isupdate or context.isdelete) and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def _on_load(target, context):
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def instrument_engine(sync_engine) -> None:
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    if not event.contains(Mapper, "load", _on_load):
+        event.listen(Mapper, "load", _on_load)
+
+
+def route_name(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE) if route is not None else UNMATCHED_ROUTE
+
+
+class TimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            current_request_stats.reset(token)
+            method, route = scope["method"], route_name(scope)
+            REQUEST_LATENCY.labels(method, route, status_code).observe(elapsed)
+            REQUEST_DB_TIME.labels(method, route).observe(stats.db_time)
+            REQUEST_DB_STATEMENTS.labels(method, route).observe(stats.statements)
+            REQUEST_DB_ROWS.labels(method, route).observe(stats.rows)
@@ -0,0 +1,140 @@
+"""Background jobs that run once per deployment rather than once per worker.
+
+``BackgroundJob.start`` takes a cross-process file lock without waiting. The
+worker that gets it runs the job in a daemon thread and keeps holding the lock
+until it exits, so workers that start later skip the job as well. If the
+holder dies, the OS releases the lock and the next worker to start takes over.
+A worker that gets the lock after the job has succeeded, e.g. one started by a
+recycle, reads that from the status file and skips it too, unless
+``start(force=True)`` asks for another run.
+The runner writes its status (state, stage, progress, timings, error, result)
+to a JSON file after every update. ``status()`` in any worker reads that file,
+so every worker reports the same progress. A file that still says ``running``
+while nobody holds the lock was left by a worker that died mid-run. ``status()``
+then marks it ``failed`` and writes that back.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+
+from .file_lock import FileLock
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PROGRESS = registry.gauge("background_job_progress", "Progress of the background job run by this worker (0-1).", ("job",))
+RUNS = registry.counter("background_job_runs_total", "Finished background job runs by result.", ("job", "result"))
+
+# Called by the job as ``report(stage, progress)``; progress is a fraction in [0, 1].
+Reporter = Callable[[str, Optional[float]], None]
+
+
+class BackgroundJob:
+    def __init__(self, name: str, target: Callable[[Reporter], object], lock_path: str, status_path: str):
+        self.name = name
+        self.target = target
+        self.lock = FileLock(lock_path)
+        self.status_path = status_path
+        self._status = {"job": name, "state": "pending", "stage": None, "progress": 0.0}
+        self._status_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, force: bool = False) -> bool:
+        """Run the job in a background thread if no other worker runs or ran it; returns whether this one does."""
+        if self._thread is not None:
+            return True
+        if not self.lock.acquire(blocking=False):
+            logger.info("%s: another worker holds %s, not running it here", self.name, self.lock.path)
+            return False
+        if not force and (self._read() or {}).get("state") == "succeeded":
+            self.lock.release()
+            logger.info("%s: already succeeded according to %s, not running it again", self.name, self.status_path)
+            return False
+        self._update(
+            state="running", stage="starting", progress=0.0, pid=os.getpid(),
+            started_at=_now(), finished_at=None, error=None, result=None,
+        )
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def report(self, stage: str, progress: Optional[float] = None) -> None:
+        changes = {"stage": stage}
+        if progress is not None:
+            changes["progress"] = progress
+        self._update(**changes)
+
+    def status(self) -> dict:
+        if self.lock.held:
+            with self._status_lock:
+                status = dict(self._status)
+        else:
+            status = self._read() or dict(self._status)
+            if status.get("state") == "running":
+                status = self._check_stale(status)
+        status["leader"] = self.lock.held
+        return status
+
+    def _check_stale(self, status: dict) -> dict:
+        # Taking the lock proves the runner is gone; it is held only while the
+        # stale status is rewritten, then left for the next worker to start.
+        if not self.lock.acquire(blocking=False):
+            return status
+        try:
+            current = self._read() or status
+            if current.get("state") != "running":
+                return current
+            status = {
+                **current, "state": "failed", "finished_at": _now(),
+                "error": f"worker {current.get('pid')} exited before finishing",
+            }
+            self._write(status)
+            return status
+        finally:
+            self.lock.release()
+
+    def _run(self) -> None:
+        try:
+            result = self.target(self.report)
+        except Exception as exc:
+            logger.exception("%s failed", self.name)
+            self._update(state="failed", error=str(exc), finished_at=_now())
+            RUNS.labels(self.name, "failed").inc()
+        else:
+            self._update(state="succeeded", stage="done", progress=1.0, result=result, finished_at=_now())
+            RUNS.labels(self.name, "succeeded").inc()
+
+    def _update(self, **changes) -> None:
+        with self._status_lock:
+            self._status.update(changes)
+            status = dict(self._status)
+        PROGRESS.labels(self.name).set(status["progress"])
+        self._write(status)
+
+    def _write(self, status: dict) -> None:
+        # Replace atomically so readers in other workers never see a half-written file.
+        tmp = f"{self.status_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(status, f, default=str)
+            os.replace(tmp, self.status_path)
+        except OSError:
+            logger.warning("%s: could not write status to %s", self.name, self.status_path, exc_info=True)
+
+    def _read(self) -> Optional[dict]:
+        try:
+            with open(self.status_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
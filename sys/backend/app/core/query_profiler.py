@@ -0,0 +1,177 @@
+"""Opt-in SQL profiler: per-statement timings and EXPLAIN capture for slow queries.
+
+Enabled with ``QUERY_PROFILING=true``. Statements are normalised (literals and
+``IN`` lists collapsed, whitespace squeezed) so every call of the same ORM
+query lands in one bucket. The first time a bucket's statement runs slower
+than ``SLOW_QUERY_THRESHOLD_MS`` its plan is captured with ``EXPLAIN QUERY
+PLAN`` (SQLite) or ``EXPLAIN`` (PostgreSQL) on a separate DBAPI cursor, so
+the pending result of the profiled statement is left untouched. The EXPLAIN
+runs inside a savepoint, so if it fails the caller's transaction carries on.
+"""
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SAMPLES_PER_STATEMENT = 1024
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_EXPLAIN_SAVEPOINT = "query_profiler_explain"
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+def normalize_statement(statement: str) -> str:
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class _StatementStats:
+    __slots__ = ("calls", "total", "max", "samples", "explain")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES_PER_STATEMENT)
+        self.explain = None
+
+    def as_dict(self, statement: str) -> dict:
+        samples = list(self.samples)
+        return {
+            "statement": statement,
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.calls * 1000, 3) if self.calls else 0.0,
+            "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "explain": self.explain,
+        }
+
+
+class QueryProfiler:
+    def __init__(self, slow_threshold_ms: float = 100.0, capture_explain: bool = True):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.capture_explain = capture_explain
+        self._stats: Dict[str, _StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def install(self, sync_engine) -> None:
+        if event.contains(sync_engine, "after_cursor_execute", self._after_cursor_execute):
+            return
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_start_time", []).append((context, time.perf_counter()))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("profiler_start_time")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()[1]
+        key = normalize_statement(statement)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _StatementStats()
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.samples.append(elapsed)
+            needs_plan = (
+                self.capture_explain and stats.explain is None and elapsed >= self.slow_threshold
+                and not executemany
+            )
+            if needs_plan:
+                stats.explain = []  # claim it so concurrent slow calls don't all EXPLAIN
+        if needs_plan:
+            plan = self._explain(conn, statement, parameters)
+            with self._lock:
+                stats.explain = plan
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, key)
+
+    def _handle_error(self, exception_context) -> None:
+        # A failed statement never reaches after_cursor_execute; drop its start
+        # time so it does not pile up on a pooled connection.
+        conn = exception_context.connection
+        starts = conn.info.get("profiler_start_time") if conn is not None else None
+        if starts and starts[-1][0] is exception_context.execution_context:
+            starts.pop()
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[list]:
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                # In a savepoint: on PostgreSQL a failed EXPLAIN would otherwise
+                # abort the transaction of the request being profiled.
+                cursor.execute(f"SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+                try:
+                    cursor.execute(prefix + statement, parameters or ())
+                    return [list(row) for row in cursor.fetchall()]
+                except Exception:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+                    raise
+                finally:
+                    cursor.execute(f"RELEASE SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+            finally:
+                cursor.close()
+        except Exception as exc:  # the plan is best-effort diagnostics
+            logger.debug("EXPLAIN failed for %s: %s", statement, exc)
+            return None
+
+    def report(self, limit: Optional[int] = None) -> list:
+        with self._lock:
+            rows = [stats.as_dict(statement) for statement, stats in self._stats.items()]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def dump(self, path: str) -> int:
+        rows = self.report()
+        with open(path, "w") as f:
+            json.dump({"generated_at": time.time(), "statements": rows}, f, indent=2, default=str)
+        return len(rows)
+
+
+profiler: Optional[QueryProfiler] = None
+
+
+def enable(sync_engines, slow_threshold_ms: float, capture_explain: bool = True) -> QueryProfiler:
+    global profiler
+    if profiler is None:
+        profiler = QueryProfiler(slow_threshold_ms, capture_explain)
+    for sync_engine in sync_engines:
+        profiler.install(sync_engine)
+    return profiler
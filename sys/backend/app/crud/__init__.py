@@ -1 +1 @@
-from . import crud_productivity
\ No newline at end of file
+from . import crud_analytics, crud_bi, crud_customer, crud_funnel, crud_kpi, crud_productivity, crud_sales
@@ -0,0 +1,2 @@
+"""Async variants of the ``crud_*`` modules, used when ``DATABASE_ASYNC`` is enabled."""
+from . import crud_analytics, crud_bi, crud_customer, crud_productivity, crud_sales
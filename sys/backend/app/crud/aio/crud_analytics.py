@@ -0,0 +1,22 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...models import analytics as models
+from ...schemas import analytics as schemas
+from .. import crud_kpi, table_versions
+from ..pagination import build_page, keyset
+
+async def get_activities(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    columns = [models.Activity.date, models.Activity.id]
+    result = await db.scalars(keyset(select(models.Activity), columns, cursor=cursor, limit=limit))
+    return build_page(result.all(), columns, limit)
+
+async def create_activity(db: AsyncSession, activity: schemas.ActivityCreate, customer_id: int):
+    db_activity = models.Activity(**activity.dict(), customer_id=customer_id)
+    db.add(db_activity)
+    for stmt in crud_kpi.activity_statements(db.get_bind().dialect.name, [db_activity]):
+        await db.execute(stmt)
+    await db.commit()
+    table_versions.bump(models.Activity, *crud_kpi.ACTIVITY_KPI_TABLES)
+    await db.refresh(db_activity)
+    return db_activity
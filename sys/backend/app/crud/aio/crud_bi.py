@@ -0,0 +1,41 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models
+from ...schemas import business_intelligence as schemas
+from .. import table_versions
+from ..dimension_cache import cache
+from ..pagination import build_page, keyset
+
+async def _page(db: AsyncSession, model, cursor: Optional[str], limit: int):
+    columns = [model.id]
+    result = await db.scalars(keyset(select(model), columns, cursor=cursor, limit=limit))
+    return build_page(result.all(), columns, limit)
+
+async def _create(db: AsyncSession, db_obj):
+    db.add(db_obj)
+    await db.commit()
+    table_versions.bump(type(db_obj))
+    await db.refresh(db_obj)
+    cache.put(db_obj)
+    return db_obj
+
+# CRUD for DimUsuario
+async def get_usuario(db: AsyncSession, usuario_id: int):
+    return await db.get(models.DimUsuario, usuario_id)
+
+async def get_usuarios(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await _page(db, models.DimUsuario, cursor, limit)
+
+async def create_usuario(db: AsyncSession, usuario: schemas.DimUsuarioCreate):
+    return await _create(db, models.DimUsuario(**usuario.dict()))
+
+# CRUD for DimEmpresa
+async def get_empresa(db: AsyncSession, empresa_id: int):
+    return await db.get(models.DimEmpresa, empresa_id)
+
+async def get_empresas(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await _page(db, models.DimEmpresa, cursor, limit)
+
+async def create_empresa(db: AsyncSession, empresa: schemas.DimEmpresaCreate):
+    return await _create(db, models.DimEmpresa(**empresa.dict()))
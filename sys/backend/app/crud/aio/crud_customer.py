@@ -0,0 +1,50 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models
+from ...schemas import customer as schemas
+from .. import crud_customer as sync_crud, table_versions
+from ..pagination import build_page, keyset
+
+async def get_customer(db: AsyncSession, customer_id: str):
+    return await db.get(models.Customer, customer_id)
+
+async def get_customers(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    columns = [models.Customer.id]
+    result = await db.scalars(keyset(select(models.Customer), columns, cursor=cursor, limit=limit))
+    return build_page(result.all(), columns, limit)
+
+async def create_customer(db: AsyncSession, customer: schemas.CustomerCreate):
+    db_customer = models.Customer(**customer.dict())
+    db.add(db_customer)
+    await db.commit()
+    sync_crud.summary_cache.clear()
+    table_versions.bump(models.Customer)
+    await db.refresh(db_customer)
+    return db_customer
+
+async def upsert_customers(db: AsyncSession, customers: List[schemas.CustomerCreate], batch_size: int = sync_crud.UPSERT_BATCH_SIZE):
+    records = sync_crud.prepare_upsert_records(customers)
+    if not records:
+        return 0
+
+    stmt = sync_crud.upsert_statement(db.get_bind().dialect.name, records[0])
+    try:
+        if stmt is None:
+            for record in records:
+                await db.merge(models.Customer(**record))
+        else:
+            for start in range(0, len(records), batch_size):
+                await db.execute(stmt, records[start:start + batch_size])
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    sync_crud.summary_cache.clear()
+    table_versions.bump(models.Customer)
+    return len(records)
+
+async def get_summary(db: AsyncSession):
+    async def compute():
+        return sync_crud.summary_from_row((await db.execute(sync_crud.summary_statement)).one())
+    return await sync_crud.summary_cache.aget_or_set(sync_crud.summary_key(), compute)
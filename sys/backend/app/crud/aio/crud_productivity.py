@@ -0,0 +1,59 @@
+from typing import Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models
+from ...schemas import productivity as schemas
+from ..crud_productivity import TEACHER_EXPANSIONS
+from ..expand import expand_options
+from .. import table_versions
+from ..pagination import build_page, keyset
+from ..schedule_index import index as schedule_index
+
+async def _page(db: AsyncSession, model, cursor: Optional[str], limit: int, options=()):
+    columns = [model.id]
+    result = await db.scalars(keyset(select(model).options(*options), columns, cursor=cursor, limit=limit))
+    return build_page(result.all(), columns, limit)
+
+async def _create(db: AsyncSession, db_obj):
+    db.add(db_obj)
+    await db.commit()
+    table_versions.bump(type(db_obj))
+    await db.refresh(db_obj)
+    return db_obj
+
+# CRUD for Teacher
+async def get_teacher(db: AsyncSession, teacher_id: str):
+    return await db.get(models.Teacher, teacher_id)
+
+async def get_teachers(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, expand: Sequence[str] = ()):
+    return await _page(db, models.Teacher, cursor, limit, expand_options(models.Teacher, expand, TEACHER_EXPANSIONS))
+
+async def create_teacher(db: AsyncSession, teacher: schemas.TeacherCreate):
+    return await _create(db, models.Teacher(**teacher.dict()))
+
+# CRUD for WorkLog
+async def get_work_log(db: AsyncSession, work_log_id: str):
+    return await db.get(models.WorkLog, work_log_id)
+
+async def get_work_logs(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await _page(db, models.WorkLog, cursor, limit)
+
+async def get_work_log_rows(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    columns = [models.WorkLog.id]
+    stmt = keyset(select(*models.WorkLog.__table__.columns), columns, cursor=cursor, limit=limit)
+    return build_page((await db.execute(stmt)).all(), columns, limit)
+
+async def create_work_log(db: AsyncSession, work_log: schemas.WorkLogCreate):
+    return await _create(db, models.WorkLog(**work_log.dict()))
+
+# CRUD for ScheduleEntry
+async def get_schedule_entry(db: AsyncSession, schedule_entry_id: str):
+    return await db.get(models.ScheduleEntry, schedule_entry_id)
+
+async def get_schedule_entries(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await _page(db, models.ScheduleEntry, cursor, limit)
+
+async def create_schedule_entry(db: AsyncSession, schedule_entry: schemas.ScheduleEntryCreate):
+    db_schedule_entry = await _create(db, models.ScheduleEntry(**schedule_entry.dict(exclude=schemas.SCHEDULE_ENTRY_CLIENT_FIELDS)))
+    schedule_index.add(db_schedule_entry)
+    return db_schedule_entry
@@ -0,0 +1,42 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...models import sales as models
+from ...schemas import sales as schemas
+from .. import crud_kpi, table_versions
+from ..pagination import build_page, keyset
+
+async def get_sales_funnel(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    columns = [models.SalesFunnel.id]
+    result = await db.scalars(keyset(select(models.SalesFunnel), columns, cursor=cursor, limit=limit))
+    return build_page(result.all(), columns, limit)
+
+async def create_sales_funnel(db: AsyncSession, sales_funnel: schemas.SalesFunnelCreate, customer_id: int):
+    db_sales_funnel = models.SalesFunnel(**sales_funnel.dict(), customer_id=customer_id)
+    db.add(db_sales_funnel)
+    for stmt in crud_kpi.sales_funnel_statements(db.get_bind().dialect.name, [db_sales_funnel]):
+        await db.execute(stmt)
+    await db.commit()
+    table_versions.bump(models.SalesFunnel, *crud_kpi.SALES_FUNNEL_KPI_TABLES)
+    await db.refresh(db_sales_funnel)
+    return db_sales_funnel
+
+async def get_transactions(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    columns = [models.Transaction.date, models.Transaction.id]
+    result = await db.scalars(keyset(select(models.Transaction), columns, cursor=cursor, limit=limit))
+    return build_page(result.all(), columns, limit)
+
+async def get_transaction_rows(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    columns = [models.Transaction.date, models.Transaction.id]
+    stmt = keyset(select(*models.Transaction.__table__.columns), columns, cursor=cursor, limit=limit)
+    return build_page((await db.execute(stmt)).all(), columns, limit)
+
+async def create_transaction(db: AsyncSession, transaction: schemas.TransactionCreate, customer_id: int):
+    db_transaction = models.Transaction(**transaction.dict(), customer_id=customer_id)
+    db.add(db_transaction)
+    for stmt in crud_kpi.transaction_statements(db.get_bind().dialect.name, [db_transaction]):
+        await db.execute(stmt)
+    await db.commit()
+    await db.refresh(db_transaction)
+    table_versions.bump(models.Transaction, *crud_kpi.TRANSACTION_KPI_TABLES)
+    return db_transaction
@@ -1,13 +1,18 @@
+from typing import Optional
 from sqlalchemy.orm import Session
 from ..models import analytics as models
 from ..schemas import analytics as schemas
+from . import crud_kpi, table_versions
+from .pagination import paginate
 
-def get_activities(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Activity).offset(skip).limit(limit).all()
+def get_activities(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return paginate(db.query(models.Activity), [models.Activity.date, models.Activity.id], cursor=cursor, limit=limit)
 
 def create_activity(db: Session, activity: schemas.ActivityCreate, customer_id: int):
     db_activity = models.Activity(**activity.dict(), customer_id=customer_id)
     db.add(db_activity)
+    crud_kpi.record_activities(db, [db_activity])
     db.commit()
+    table_versions.bump(models.Activity, *crud_kpi.ACTIVITY_KPI_TABLES)
     db.refresh(db_activity)
-    return db_activity
\ No newline at end of file
+    return db_activity
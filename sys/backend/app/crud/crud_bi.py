@@ -1,33 +1,110 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 from .. import models
+from ..core.cache import LRUCache
+from ..core.config import settings
 from ..schemas import business_intelligence as schemas
+from ..schemas.enums import BiDimension, FinanceiroDimension, RollupBucket
+from . import rollup, table_versions
+from .dimension_cache import cache
+from .expand import expand_options
+from .pagination import paginate
+
+DIMENSIONS = {
+    BiDimension.usuarios: (models.DimUsuario, schemas.DimUsuario),
+    BiDimension.empresas: (models.DimEmpresa, schemas.DimEmpresa),
+    BiDimension.pessoas: (models.DimPessoa, schemas.DimPessoa),
+    BiDimension.estagios: (models.DimEstagio, schemas.DimEstagio),
+    BiDimension.origens: (models.DimOrigem, schemas.DimOrigem),
+}
+
+# (table name, id) -> validated response schema, for dimensions outside the preloaded ``cache``.
+dimension_row_cache = LRUCache(maxsize=settings.DIMENSION_CACHE_MAXSIZE)
+
+def get_many(db: Session, dimension: BiDimension, ids: Iterable[int]) -> Tuple[list, List[int]]:
+    """Rows for ``ids`` in request order plus the ids that do not exist, with one ``IN`` query for cache misses."""
+    model, schema = DIMENSIONS[dimension]
+    if model in cache:
+        return cache.get_many(db, model, ids)
+    table = model.__tablename__
+    ids = list(dict.fromkeys(ids))
+    found = {}
+    for id_ in ids:
+        row = dimension_row_cache.get((table, id_))
+        if row is not None:
+            found[id_] = row
+    misses = [id_ for id_ in ids if id_ not in found]
+    if misses:
+        for obj in db.query(model).filter(model.id.in_(misses)):
+            row = found[obj.id] = schema.model_validate(obj, from_attributes=True)
+            dimension_row_cache.set((table, obj.id), row)
+    return [found[id_] for id_ in ids if id_ in found], [id_ for id_ in ids if id_ not in found]
 
 # CRUD for DimUsuario
 def get_usuario(db: Session, usuario_id: int):
     return db.query(models.DimUsuario).filter(models.DimUsuario.id == usuario_id).first()
 
-def get_usuarios(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.DimUsuario).offset(skip).limit(limit).all()
+def get_usuarios(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return paginate(db.query(models.DimUsuario), [models.DimUsuario.id], cursor=cursor, limit=limit)
 
 def create_usuario(db: Session, usuario: schemas.DimUsuarioCreate):
     db_usuario = models.DimUsuario(**usuario.dict())
     db.add(db_usuario)
     db.commit()
+    table_versions.bump(models.DimUsuario)
     db.refresh(db_usuario)
+    cache.put(db_usuario)
     return db_usuario
 
 # CRUD for DimEmpresa
 def get_empresa(db: Session, empresa_id: int):
     return db.query(models.DimEmpresa).filter(models.DimEmpresa.id == empresa_id).first()
 
-def get_empresas(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.DimEmpresa).offset(skip).limit(limit).all()
+def get_empresas(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return paginate(db.query(models.DimEmpresa), [models.DimEmpresa.id], cursor=cursor, limit=limit)
 
 def create_empresa(db: Session, empresa: schemas.DimEmpresaCreate):
     db_empresa = models.DimEmpresa(**empresa.dict())
     db.add(db_empresa)
     db.commit()
+    table_versions.bump(models.DimEmpresa)
     db.refresh(db_empresa)
+    cache.put(db_empresa)
     return db_empresa
 
+# Fact lists with expand=
+OPORTUNIDADE_EXPANSIONS = ("empresa", "pessoa", "usuario", "estagio", "origem")
+MOVIMENTACAO_EXPANSIONS = (
+    "oportunidade", *(f"oportunidade.{name}" for name in OPORTUNIDADE_EXPANSIONS),
+    "estagio_saida", "estagio_entrada", "usuario",
+)
+# Every table a fact list response can read from, labels and expansions included.
+OPORTUNIDADE_TABLES = (
+    models.FatoOportunidades, models.DimEmpresa, models.DimPessoa, models.DimUsuario, models.DimEstagio, models.DimOrigem,
+)
+MOVIMENTACAO_TABLES = (models.FatoMovimentacoes, *OPORTUNIDADE_TABLES)
+
+def get_oportunidades(db: Session, cursor: Optional[str] = None, limit: int = 100, expand: Sequence[str] = ()):
+    O = models.FatoOportunidades
+    query = db.query(O).options(*expand_options(O, expand, OPORTUNIDADE_EXPANSIONS))
+    return paginate(query, [O.id], cursor=cursor, limit=limit)
+
+def get_movimentacoes(db: Session, cursor: Optional[str] = None, limit: int = 100, expand: Sequence[str] = ()):
+    M = models.FatoMovimentacoes
+    query = db.query(M).options(*expand_options(M, expand, MOVIMENTACAO_EXPANSIONS))
+    return paginate(query, [M.id], cursor=cursor, limit=limit)
+
+# Rollups over FatoFinanceiro
+def get_financeiro_rollup(
+    db: Session,
+    bucket: RollupBucket,
+    start: datetime,
+    end: datetime,
+    group_by: Sequence[FinanceiroDimension] = (),
+):
+    F = models.FatoFinanceiro
+    dimensions = {d.value: getattr(F, d.value) for d in FinanceiroDimension if d in group_by}
+    return rollup.rollup(db, F.__tablename__, F.data, F.valor, dimensions, bucket, start, end)
+
 # ... and so on for all the other models
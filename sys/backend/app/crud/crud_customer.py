@@ -1,16 +1,113 @@
+from typing import List, Optional
+from uuid import uuid4
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from .. import models
+from ..core.cache import TTLCache
+from ..core.config import settings
 from ..schemas import customer as schemas
+from . import table_versions
+from .pagination import paginate
+
+UPSERT_BATCH_SIZE = 1000
+
+# Keyed by the customers table version: a write in another worker bumps it, so
+# no worker serves a summary older than the version its ETag was built from.
+summary_cache = TTLCache(ttl=settings.SUMMARY_CACHE_TTL_SECONDS, maxsize=16)
+
+_upsert_dialects = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
 
 def get_customer(db: Session, customer_id: str):
     return db.query(models.Customer).filter(models.Customer.id == customer_id).first()
 
-def get_customers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Customer).offset(skip).limit(limit).all()
+def get_many(db: Session, ids: List[str]):
+    """Customers for ``ids`` in request order plus the ids that do not exist, with one ``IN`` query."""
+    ids = list(dict.fromkeys(ids))
+    found = {c.id: c for c in db.query(models.Customer).filter(models.Customer.id.in_(ids))} if ids else {}
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
+
+def get_customers(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return paginate(db.query(models.Customer), [models.Customer.id], cursor=cursor, limit=limit)
 
 def create_customer(db: Session, customer: schemas.CustomerCreate):
     db_customer = models.Customer(**customer.dict())
     db.add(db_customer)
     db.commit()
+    summary_cache.clear()
+    table_versions.bump(models.Customer)
     db.refresh(db_customer)
     return db_customer
+
+def prepare_upsert_records(customers: List[schemas.CustomerCreate]):
+    records = {}
+    for customer in customers:
+        record = customer.dict()
+        if record["id"] is None:
+            record["id"] = uuid4().hex
+        records[record["id"]] = record
+    return list(records.values())
+
+def upsert_statement(dialect_name: str, columns):
+    insert = _upsert_dialects.get(dialect_name)
+    if insert is None:
+        return None
+    stmt = insert(models.Customer)
+    return stmt.on_conflict_do_update(
+        index_elements=[models.Customer.id],
+        set_={column: stmt.excluded[column] for column in columns if column != "id"},
+    )
+
+def upsert_customers(db: Session, customers: List[schemas.CustomerCreate], batch_size: int = UPSERT_BATCH_SIZE):
+    """Insert or update customers by id in batches, committing once.
+
+    Uses ``INSERT ... ON CONFLICT (id) DO UPDATE`` on PostgreSQL and SQLite,
+    and falls back to ``Session.merge`` on other backends.
+    """
+    records = prepare_upsert_records(customers)
+    if not records:
+        return 0
+
+    stmt = upsert_statement(db.get_bind().dialect.name, records[0])
+    try:
+        if stmt is None:
+            for record in records:
+                db.merge(models.Customer(**record))
+        else:
+            for start in range(0, len(records), batch_size):
+                db.execute(stmt, records[start:start + batch_size])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    summary_cache.clear()
+    table_versions.bump(models.Customer)
+    return len(records)
+
+summary_statement = select(
+    func.count(models.Customer.id),
+    func.coalesce(func.sum(case((models.Customer.status == 'Active', 1), else_=0)), 0),
+    func.coalesce(func.sum(models.Customer.total_spent), 0.0),
+)
+
+def summary_from_row(row):
+    total_customers, active_customers, total_revenue = row
+    return {
+        'total_customers': total_customers,
+        'active_customers': active_customers,
+        'total_revenue': total_revenue,
+        'avg_customer_value': total_revenue / total_customers if total_customers > 0 else 0,
+    }
+
+def summary_key():
+    # Read before the query runs, so the cached body is at least as new as the key.
+    return ('summary', table_versions.versions.get(models.Customer))
+
+def get_summary(db: Session):
+    """Customer KPIs from one conditional-aggregation query, cached until the next write."""
+    return summary_cache.get_or_set(
+        summary_key(), lambda: summary_from_row(db.execute(summary_statement).one())
+    )
@@ -0,0 +1,136 @@
+"""Funnel aggregates over the BI star schema, computed in SQL.
+
+Every query returns one row per stage or group, so the cost of a dashboard
+request does not depend on how many facts it summarises.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Float, cast, func, select, union_all
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..schemas.enums import WinGroupBy
+
+def _in_range(column, start: Optional[datetime], end: Optional[datetime]):
+    clauses = []
+    if start is not None:
+        clauses.append(column >= start)
+    if end is not None:
+        clauses.append(column < end)
+    return clauses
+
+def seconds_between(dialect_name: str, start, end):
+    if dialect_name == "postgresql":
+        return func.extract("epoch", end - start)
+    # SQLite and anything else with julianday()
+    return (func.julianday(end) - func.julianday(start)) * 86400.0
+
+def get_stage_funnel(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Per stage: deals currently there, deals that reached it, and conversion from the previous stage.
+
+    A deal has reached every stage up to the highest ``ordem`` among its
+    current stage and all stages it moved into.
+    """
+    O, M, E = models.FatoOportunidades, models.FatoMovimentacoes, models.DimEstagio
+    deal_filter = _in_range(O.data_criacao, start, end)
+
+    visited = union_all(
+        select(O.id.label("deal_id"), O.stage_id.label("stage_id")).where(*deal_filter),
+        select(M.deal_id, M.in_stage_id).join(O, O.id == M.deal_id).where(*deal_filter),
+    ).subquery()
+    progress = (
+        select(visited.c.deal_id, func.max(E.ordem).label("max_ordem"))
+        .join(E, E.id == visited.c.stage_id)
+        .group_by(visited.c.deal_id)
+        .subquery()
+    )
+    current = (
+        select(O.stage_id, func.count(O.id).label("deals"), func.sum(O.valor).label("value"))
+        .where(*deal_filter)
+        .group_by(O.stage_id)
+        .subquery()
+    )
+    reached = (
+        select(E.id, E.estagio_nome, E.ordem, func.count(progress.c.deal_id).label("reached"))
+        .outerjoin(progress, progress.c.max_ordem >= E.ordem)
+        .group_by(E.id, E.estagio_nome, E.ordem)
+        .subquery()
+    )
+    previous = func.lag(reached.c.reached).over(order_by=(reached.c.ordem, reached.c.id))
+    stmt = (
+        select(
+            reached.c.id.label("estagio_id"),
+            reached.c.estagio_nome,
+            reached.c.ordem,
+            func.coalesce(current.c.deals, 0).label("current_deals"),
+            func.coalesce(current.c.value, 0.0).label("current_value"),
+            reached.c.reached,
+            (cast(reached.c.reached, Float) / func.nullif(previous, 0)).label("conversion_from_previous"),
+        )
+        .outerjoin(current, current.c.stage_id == reached.c.id)
+        .order_by(reached.c.ordem, reached.c.id)
+    )
+    return [row._asdict() for row in db.execute(stmt)]
+
+def get_stage_dwell(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Time deals spent in each stage, from ``data_entrada`` to ``data_saida`` of the move into it."""
+    M, E = models.FatoMovimentacoes, models.DimEstagio
+    seconds = seconds_between(db.get_bind().dialect.name, M.data_entrada, M.data_saida)
+    stmt = (
+        select(
+            E.id.label("estagio_id"),
+            E.estagio_nome,
+            E.ordem,
+            func.count(M.id).label("transitions"),
+            func.avg(seconds).label("avg_seconds"),
+            func.min(seconds).label("min_seconds"),
+            func.max(seconds).label("max_seconds"),
+        )
+        .join(E, E.id == M.in_stage_id)
+        .where(M.data_saida.isnot(None), *_in_range(M.data_entrada, start, end))
+        .group_by(E.id, E.estagio_nome, E.ordem)
+        .order_by(E.ordem, E.id)
+    )
+    return [row._asdict() for row in db.execute(stmt)]
+
+_WIN_GROUPS = {
+    WinGroupBy.origem: (models.DimOrigem, models.FatoOportunidades.origem_id, models.DimOrigem.origem_nome),
+    WinGroupBy.usuario: (models.DimUsuario, models.FatoOportunidades.user_id, models.DimUsuario.nome),
+}
+
+def get_wins(
+    db: Session,
+    group_by: WinGroupBy = WinGroupBy.origem,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    won_stage_id: Optional[int] = None,
+):
+    """Closed deals in the won stage (by default the one with the highest ``ordem``), grouped by a dimension."""
+    O, E = models.FatoOportunidades, models.DimEstagio
+    dimension, foreign_key, name = _WIN_GROUPS[group_by]
+    if won_stage_id is None:
+        won_stage = select(E.id).order_by(E.ordem.desc(), E.id.desc()).limit(1).scalar_subquery()
+    else:
+        won_stage = won_stage_id
+
+    won_value = func.coalesce(func.sum(O.valor), 0.0)
+    stmt = (
+        select(
+            foreign_key.label("group_id"),
+            name.label("group_name"),
+            func.count(O.id).label("deals_won"),
+            won_value.label("won_value"),
+            func.coalesce(func.avg(O.valor), 0.0).label("avg_value"),
+            (won_value / func.nullif(func.sum(won_value).over(), 0)).label("share"),
+        )
+        .outerjoin(dimension, dimension.id == foreign_key)
+        .where(
+            O.stage_id == won_stage,
+            O.data_encerramento.isnot(None),
+            *_in_range(O.data_encerramento, start, end),
+        )
+        .group_by(foreign_key, name)
+        .order_by(won_value.desc())
+    )
+    return [row._asdict() for row in db.execute(stmt)]
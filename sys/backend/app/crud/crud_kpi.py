@@ -0,0 +1,231 @@
+"""Incrementally maintained KPI summary tables (``kpi_*``).
+
+Writers add their summary statements to the same transaction as the fact
+rows, before committing, so a fact and its effect on the summaries commit or
+roll back together. Each batch of facts is pre-aggregated in Python and
+applied with one ``INSERT ... ON CONFLICT DO UPDATE`` per summary table that
+adds counts and sums and keeps the latest date, so concurrent writers never
+lose an increment. Backends without ``ON CONFLICT`` get, per summary row, an
+``UPDATE`` that adds to the row followed by an ``INSERT ... SELECT`` of it
+guarded by ``NOT EXISTS``. Increments are still never lost, but two writers
+creating the same summary row at once can hit a duplicate key. ``rebuild``
+recomputes every table from the facts with grouped queries; run it with
+``python rebuild_kpis.py`` after loading data behind the crud layer's back.
+"""
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import and_, case, delete, exists, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..schemas.enums import RollupBucket
+from . import table_versions
+from .rollup import as_datetime, bucket_expression, bucket_floor
+
+KPI_BATCH_SIZE = 1000
+
+# Summary tables each kind of fact writes to, for ``table_versions.bump``.
+TRANSACTION_KPI_TABLES = (models.KpiCustomerTotals, models.KpiMonthlyRevenue)
+ACTIVITY_KPI_TABLES = (models.KpiCustomerTotals,)
+SALES_FUNNEL_KPI_TABLES = (models.KpiFunnelStage,)
+
+_upsert_dialects = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+_CUSTOMER_SUMS = ("transactions", "revenue", "activities")
+_CUSTOMER_LATEST = ("last_transaction_date", "last_activity_date")
+
+
+def _later(column, incoming):
+    return case((or_(column.is_(None), incoming > column), incoming), else_=column)
+
+
+def _latest(current: Optional[datetime], incoming: Optional[datetime]) -> Optional[datetime]:
+    if current is None or (incoming is not None and incoming > current):
+        return incoming
+    return current
+
+
+def increment_statements(dialect_name: str, model, rows: List[dict], add=(), latest=()) -> list:
+    """Upserts adding ``add`` columns to, and keeping the latest ``latest`` columns of, existing rows."""
+    upsert = _upsert_dialects.get(dialect_name)
+    if upsert is None:
+        return _update_then_insert_statements(model, rows, add, latest)
+    table = model.__table__
+    statements = []
+    for start in range(0, len(rows), KPI_BATCH_SIZE):
+        stmt = upsert(table).values(rows[start:start + KPI_BATCH_SIZE])
+        set_ = {c: table.c[c] + stmt.excluded[c] for c in add}
+        set_.update({c: _later(table.c[c], stmt.excluded[c]) for c in latest})
+        statements.append(stmt.on_conflict_do_update(index_elements=list(table.primary_key.columns), set_=set_))
+    return statements
+
+
+def _update_then_insert_statements(model, rows: List[dict], add, latest) -> list:
+    # Without ON CONFLICT: add to the row if it exists, then insert it if it still does not.
+    table = model.__table__
+    statements = []
+    for row in rows:
+        match = and_(*(column == row[column.name] for column in table.primary_key.columns))
+        set_ = {c: table.c[c] + row[c] for c in add}
+        set_.update({c: _later(table.c[c], row[c]) for c in latest if row[c] is not None})
+        statements.append(update(table).where(match).values(set_))
+        values = select(*(literal(value, table.c[c].type) for c, value in row.items())).where(~exists().where(match))
+        statements.append(insert(table).from_select(list(row), values))
+    return statements
+
+
+def _customer_row(totals: dict, customer_id) -> dict:
+    key = str(customer_id)
+    row = totals.get(key)
+    if row is None:
+        row = totals[key] = {
+            "customer_id": key, "transactions": 0, "revenue": 0.0, "last_transaction_date": None,
+            "activities": 0, "last_activity_date": None,
+        }
+    return row
+
+
+def transaction_statements(dialect_name: str, transactions: Iterable) -> list:
+    customers, months = {}, {}
+    for t in transactions:
+        value = t.total_value or 0.0
+        if t.customer_id is not None:
+            row = _customer_row(customers, t.customer_id)
+            row["transactions"] += 1
+            row["revenue"] += value
+            row["last_transaction_date"] = _latest(row["last_transaction_date"], t.date)
+        if t.date is not None:
+            month = bucket_floor(t.date, RollupBucket.month)
+            row = months.setdefault(month, {"month": month, "transactions": 0, "revenue": 0.0})
+            row["transactions"] += 1
+            row["revenue"] += value
+    return (
+        increment_statements(dialect_name, models.KpiCustomerTotals, list(customers.values()),
+                             add=_CUSTOMER_SUMS, latest=_CUSTOMER_LATEST)
+        + increment_statements(dialect_name, models.KpiMonthlyRevenue, list(months.values()),
+                               add=("transactions", "revenue"))
+    )
+
+
+def activity_statements(dialect_name: str, activities: Iterable) -> list:
+    customers = {}
+    for a in activities:
+        if a.customer_id is None:
+            continue
+        row = _customer_row(customers, a.customer_id)
+        row["activities"] += 1
+        row["last_activity_date"] = _latest(row["last_activity_date"], a.date)
+    return increment_statements(dialect_name, models.KpiCustomerTotals, list(customers.values()),
+                                add=_CUSTOMER_SUMS, latest=_CUSTOMER_LATEST)
+
+
+def sales_funnel_statements(dialect_name: str, funnels: Iterable) -> list:
+    stages = {}
+    for f in funnels:
+        if f.stage is None:
+            continue
+        row = stages.setdefault(f.stage, {"stage": f.stage, "deals": 0, "value": 0.0})
+        row["deals"] += 1
+        row["value"] += f.value or 0.0
+    return increment_statements(dialect_name, models.KpiFunnelStage, list(stages.values()), add=("deals", "value"))
+
+
+def _apply(db: Session, statements: list) -> None:
+    for stmt in statements:
+        db.execute(stmt)
+
+
+def record_transactions(db: Session, transactions: Iterable) -> None:
+    _apply(db, transaction_statements(db.get_bind().dialect.name, transactions))
+
+
+def record_activities(db: Session, activities: Iterable) -> None:
+    _apply(db, activity_statements(db.get_bind().dialect.name, activities))
+
+
+def record_sales_funnels(db: Session, funnels: Iterable) -> None:
+    _apply(db, sales_funnel_statements(db.get_bind().dialect.name, funnels))
+
+
+# Reads
+def get_customer_totals(db: Session, customer_id: str):
+    return db.get(models.KpiCustomerTotals, customer_id)
+
+
+def get_monthly_revenue(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    query = db.query(models.KpiMonthlyRevenue)
+    if start is not None:
+        query = query.filter(models.KpiMonthlyRevenue.month >= bucket_floor(start, RollupBucket.month))
+    if end is not None:
+        query = query.filter(models.KpiMonthlyRevenue.month < end)
+    return query.order_by(models.KpiMonthlyRevenue.month).all()
+
+
+def get_funnel_stages(db: Session):
+    return db.query(models.KpiFunnelStage).order_by(models.KpiFunnelStage.stage).all()
+
+
+# Full rebuild
+def _insert_batches(db: Session, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), KPI_BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + KPI_BATCH_SIZE])
+
+
+def rebuild(db: Session) -> dict:
+    """Recompute every ``kpi_*`` table from the fact tables in one transaction; returns row counts."""
+    T, A, F = models.Transaction, models.Activity, models.SalesFunnel
+    customers = {}
+    for customer_id, count, revenue, last in db.execute(
+        select(T.customer_id, func.count(), func.coalesce(func.sum(T.total_value), 0.0), func.max(T.date))
+        .where(T.customer_id.isnot(None))
+        .group_by(T.customer_id)
+    ):
+        row = _customer_row(customers, customer_id)
+        row.update(transactions=count, revenue=revenue, last_transaction_date=last)
+    for customer_id, count, last in db.execute(
+        select(A.customer_id, func.count(), func.max(A.date)).where(A.customer_id.isnot(None)).group_by(A.customer_id)
+    ):
+        row = _customer_row(customers, customer_id)
+        row.update(activities=count, last_activity_date=last)
+
+    month = bucket_expression(db.get_bind().dialect.name, T.date, RollupBucket.month)
+    months = [
+        {"month": as_datetime(m), "transactions": count, "revenue": revenue}
+        for m, count, revenue in db.execute(
+            select(month, func.count(), func.coalesce(func.sum(T.total_value), 0.0))
+            .where(T.date.isnot(None))
+            .group_by(month)
+        )
+    ]
+    stages = [
+        {"stage": stage, "deals": count, "value": value}
+        for stage, count, value in db.execute(
+            select(F.stage, func.count(), func.coalesce(func.sum(F.value), 0.0))
+            .where(F.stage.isnot(None))
+            .group_by(F.stage)
+        )
+    ]
+
+    try:
+        for model, rows in (
+            (models.KpiCustomerTotals, list(customers.values())),
+            (models.KpiMonthlyRevenue, months),
+            (models.KpiFunnelStage, stages),
+        ):
+            db.execute(delete(model))
+            _insert_batches(db, model, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    table_versions.bump(models.KpiCustomerTotals, models.KpiMonthlyRevenue, models.KpiFunnelStage)
+    return {
+        models.KpiCustomerTotals.__tablename__: len(customers),
+        models.KpiMonthlyRevenue.__tablename__: len(months),
+        models.KpiFunnelStage.__tablename__: len(stages),
+    }
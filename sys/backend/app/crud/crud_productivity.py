@@ -1,18 +1,29 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
 from sqlalchemy.orm import Session
 from .. import models
 from ..schemas import productivity as schemas
+from .expand import expand_options
+from . import table_versions
+from .pagination import paginate
+from .schedule_index import index as schedule_index
+from .utilization import utilization
+
+TEACHER_EXPANSIONS = ("work_logs", "schedule_entries")
 
 # CRUD for Teacher
 def get_teacher(db: Session, teacher_id: str):
     return db.query(models.Teacher).filter(models.Teacher.id == teacher_id).first()
 
-def get_teachers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Teacher).offset(skip).limit(limit).all()
+def get_teachers(db: Session, cursor: Optional[str] = None, limit: int = 100, expand: Sequence[str] = ()):
+    query = db.query(models.Teacher).options(*expand_options(models.Teacher, expand, TEACHER_EXPANSIONS))
+    return paginate(query, [models.Teacher.id], cursor=cursor, limit=limit)
 
 def create_teacher(db: Session, teacher: schemas.TeacherCreate):
     db_teacher = models.Teacher(**teacher.dict())
     db.add(db_teacher)
     db.commit()
+    table_versions.bump(models.Teacher)
     db.refresh(db_teacher)
     return db_teacher
 
@@ -20,26 +31,60 @@ def create_teacher(db: Session, teacher: schemas.TeacherCreate):
 def get_work_log(db: Session, work_log_id: str):
     return db.query(models.WorkLog).filter(models.WorkLog.id == work_log_id).first()
 
-def get_work_logs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.WorkLog).offset(skip).limit(limit).all()
+def get_work_logs(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return paginate(db.query(models.WorkLog), [models.WorkLog.id], cursor=cursor, limit=limit)
+
+def get_work_log_rows(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    """``get_work_logs`` as plain row tuples, for the fast JSON path."""
+    return paginate(db.query(*models.WorkLog.__table__.columns), [models.WorkLog.id], cursor=cursor, limit=limit)
 
 def create_work_log(db: Session, work_log: schemas.WorkLogCreate):
     db_work_log = models.WorkLog(**work_log.dict())
     db.add(db_work_log)
     db.commit()
+    table_versions.bump(models.WorkLog)
     db.refresh(db_work_log)
     return db_work_log
 
+def get_schedule_overlaps(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    teacher_id: Optional[int] = None,
+    day: Optional[int] = None,
+    class_type: Optional[str] = None,
+    exclude_id: Optional[int] = None,
+):
+    schedule_index.sync(db)
+    slots = schedule_index.overlapping(
+        start, end, teacher_id=teacher_id, day=day, class_type=class_type, exclude_id=exclude_id
+    )
+    return [slot._asdict() for slot in slots]
+
+def get_free_slots(db: Session, teacher_id: int, start: datetime, end: datetime, **window):
+    schedule_index.sync(db)
+    return [
+        {"start_time": slot_start, "end_time": slot_end}
+        for slot_start, slot_end in schedule_index.free_slots(teacher_id, start, end, **window)
+    ]
+
+def get_utilization(
+    db: Session, start: datetime, end: datetime, teacher_ids: Optional[List[int]] = None
+):
+    return utilization(db, start=start, end=end, teacher_ids=teacher_ids)
+
 # CRUD for ScheduleEntry
 def get_schedule_entry(db: Session, schedule_entry_id: str):
     return db.query(models.ScheduleEntry).filter(models.ScheduleEntry.id == schedule_entry_id).first()
 
-def get_schedule_entries(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.ScheduleEntry).offset(skip).limit(limit).all()
+def get_schedule_entries(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return paginate(db.query(models.ScheduleEntry), [models.ScheduleEntry.id], cursor=cursor, limit=limit)
 
 def create_schedule_entry(db: Session, schedule_entry: schemas.ScheduleEntryCreate):
-    db_schedule_entry = models.ScheduleEntry(**schedule_entry.dict())
+    db_schedule_entry = models.ScheduleEntry(**schedule_entry.dict(exclude=schemas.SCHEDULE_ENTRY_CLIENT_FIELDS))
     db.add(db_schedule_entry)
     db.commit()
+    table_versions.bump(models.ScheduleEntry)
     db.refresh(db_schedule_entry)
+    schedule_index.add(db_schedule_entry)
     return db_schedule_entry
@@ -1,23 +1,69 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from ..models import sales as models
 from ..schemas import sales as schemas
+from ..schemas.enums import RollupBucket, TransactionDimension
+from . import crud_kpi, rollup, table_versions
+from .pagination import paginate
 
-def get_sales_funnel(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.SalesFunnel).offset(skip).limit(limit).all()
+def get_sales_funnel(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return paginate(db.query(models.SalesFunnel), [models.SalesFunnel.id], cursor=cursor, limit=limit)
 
 def create_sales_funnel(db: Session, sales_funnel: schemas.SalesFunnelCreate, customer_id: int):
     db_sales_funnel = models.SalesFunnel(**sales_funnel.dict(), customer_id=customer_id)
     db.add(db_sales_funnel)
+    crud_kpi.record_sales_funnels(db, [db_sales_funnel])
     db.commit()
+    table_versions.bump(models.SalesFunnel, *crud_kpi.SALES_FUNNEL_KPI_TABLES)
     db.refresh(db_sales_funnel)
     return db_sales_funnel
 
-def get_transactions(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Transaction).offset(skip).limit(limit).all()
+def get_transactions(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return paginate(db.query(models.Transaction), [models.Transaction.date, models.Transaction.id], cursor=cursor, limit=limit)
+
+def get_transaction_rows(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    """``get_transactions`` as plain row tuples, for the fast JSON path."""
+    return paginate(
+        db.query(*models.Transaction.__table__.columns), [models.Transaction.date, models.Transaction.id],
+        cursor=cursor, limit=limit,
+    )
 
 def create_transaction(db: Session, transaction: schemas.TransactionCreate, customer_id: int):
     db_transaction = models.Transaction(**transaction.dict(), customer_id=customer_id)
     db.add(db_transaction)
+    crud_kpi.record_transactions(db, [db_transaction])
     db.commit()
     db.refresh(db_transaction)
-    return db_transaction
\ No newline at end of file
+    table_versions.bump(models.Transaction, *crud_kpi.TRANSACTION_KPI_TABLES)
+    return db_transaction
+
+def create_transactions(db: Session, transactions: List[schemas.TransactionBulkCreate], batch_size: int = 1000):
+    """Insert transactions in batches and update the KPI tables, committing once."""
+    if not transactions:
+        return 0
+    records = [transaction.dict() for transaction in transactions]
+    try:
+        for start in range(0, len(records), batch_size):
+            db.execute(insert(models.Transaction), records[start:start + batch_size])
+        crud_kpi.record_transactions(db, transactions)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    table_versions.bump(models.Transaction, *crud_kpi.TRANSACTION_KPI_TABLES)
+    return len(records)
+
+def get_transaction_rollup(
+    db: Session,
+    bucket: RollupBucket,
+    start: datetime,
+    end: datetime,
+    group_by: Sequence[TransactionDimension] = (),
+):
+    dimensions = {d.value: getattr(models.Transaction, d.value) for d in TransactionDimension if d in group_by}
+    return rollup.rollup(
+        db, models.Transaction.__tablename__, models.Transaction.date, models.Transaction.total_value,
+        dimensions, bucket, start, end,
+    )
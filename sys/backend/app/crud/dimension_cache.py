@@ -0,0 +1,124 @@
+"""Process-wide cache of the small, read-mostly dimension tables.
+
+``dim_estagio``, ``dim_origem``, ``dim_usuario`` and ``dim_empresa`` are read
+whole at startup into id -> row maps (rows are the validated response
+schemas). Writes through ``crud_bi`` put the new row in its map. Ids that are
+not in a map, e.g. rows written by another process, are fetched with one
+``IN`` query per dimension and kept. Fact responses take their dimension
+labels from here instead of joining. Every id looked up is counted in
+``dimension_cache_lookups_total`` as a hit or a miss.
+"""
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.metrics import registry
+from ..schemas import business_intelligence as schemas
+
+LOOKUPS = registry.counter(
+    "dimension_cache_lookups_total", "Dimension cache lookups by table and result.", ("table", "result"),
+)
+ROWS = registry.gauge("dimension_cache_rows", "Rows held in the dimension cache.", ("table",))
+
+# model -> (response schema, label column)
+CACHED_DIMENSIONS = {
+    models.DimEstagio: (schemas.DimEstagio, "estagio_nome"),
+    models.DimOrigem: (schemas.DimOrigem, "origem_nome"),
+    models.DimUsuario: (schemas.DimUsuario, "nome"),
+    models.DimEmpresa: (schemas.DimEmpresa, "nome_empresa"),
+}
+
+# label field -> (dimension model, foreign key attribute on the fact)
+OPORTUNIDADE_LABELS = {
+    "empresa_nome": (models.DimEmpresa, "company_id"),
+    "usuario_nome": (models.DimUsuario, "user_id"),
+    "estagio_nome": (models.DimEstagio, "stage_id"),
+    "origem_nome": (models.DimOrigem, "origem_id"),
+}
+MOVIMENTACAO_LABELS = {
+    "out_stage_nome": (models.DimEstagio, "out_stage_id"),
+    "in_stage_nome": (models.DimEstagio, "in_stage_id"),
+    "usuario_nome": (models.DimUsuario, "user_id"),
+}
+
+
+class DimensionCache:
+    def __init__(self, dimensions=CACHED_DIMENSIONS):
+        self.dimensions = dimensions
+        self._maps: Dict[type, dict] = {model: {} for model in dimensions}
+        self._lock = threading.Lock()
+
+    def __contains__(self, model) -> bool:
+        return model in self.dimensions
+
+    def _row(self, obj):
+        schema, _ = self.dimensions[type(obj)]
+        return schema.model_validate(obj, from_attributes=True)
+
+    def load(self, db: Session) -> Dict[str, int]:
+        """(Re)read every cached dimension table; returns rows per table."""
+        counts = {}
+        for model in self.dimensions:
+            rows = {obj.id: self._row(obj) for obj in db.query(model)}
+            with self._lock:
+                self._maps[model] = rows
+            ROWS.labels(model.__tablename__).set(len(rows))
+            counts[model.__tablename__] = len(rows)
+        return counts
+
+    def put(self, obj) -> None:
+        model = type(obj)
+        if model not in self.dimensions:
+            return
+        with self._lock:
+            self._maps[model][obj.id] = self._row(obj)
+            size = len(self._maps[model])
+        ROWS.labels(model.__tablename__).set(size)
+
+    def clear(self) -> None:
+        with self._lock:
+            for model in self.dimensions:
+                self._maps[model] = {}
+                ROWS.labels(model.__tablename__).set(0)
+
+    def get_many(self, db: Session, model, ids: Iterable[int]) -> Tuple[list, List[int]]:
+        """Rows for ``ids`` in order plus the ids that do not exist; misses cost one ``IN`` query."""
+        ids = list(dict.fromkeys(ids))
+        rows = self._maps[model]
+        found = {id_: rows[id_] for id_ in ids if id_ in rows}
+        misses = [id_ for id_ in ids if id_ not in found]
+        table = model.__tablename__
+        if found:
+            LOOKUPS.labels(table, "hit").inc(len(found))
+        if misses:
+            LOOKUPS.labels(table, "miss").inc(len(misses))
+            for obj in db.query(model).filter(model.id.in_(misses)):
+                self.put(obj)
+                found[obj.id] = self._maps[model][obj.id]
+        return [found[id_] for id_ in ids if id_ in found], [id_ for id_ in ids if id_ not in found]
+
+    def labels(self, db: Session, facts: Sequence, spec: Dict[str, Tuple[type, str]]) -> List[dict]:
+        """Per fact, ``{label field: dimension label}`` for the foreign keys named in ``spec``."""
+        wanted: Dict[type, set] = {}
+        for fact in facts:
+            for model, foreign_key in spec.values():
+                id_ = getattr(fact, foreign_key)
+                if id_ is not None:
+                    wanted.setdefault(model, set()).add(id_)
+        names = {}
+        for model, ids in wanted.items():
+            _, label_column = self.dimensions[model]
+            rows, _ = self.get_many(db, model, ids)
+            names[model] = {row.id: getattr(row, label_column) for row in rows}
+        return [
+            {
+                field: names.get(model, {}).get(getattr(fact, foreign_key))
+                for field, (model, foreign_key) in spec.items()
+            }
+            for fact in facts
+        ]
+
+
+cache = DimensionCache()
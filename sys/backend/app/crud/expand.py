@@ -0,0 +1,88 @@
+"""``expand=`` support for list endpoints: eager loading of requested relationships.
+
+Each requested path (``estagio``, ``oportunidade.origem``) becomes a loader
+option chained along the path: ``selectinload`` for collections, which keeps
+``LIMIT`` applying to parent rows and costs one extra ``IN`` query per
+collection, and ``joinedload`` for many-to-one references, which costs
+nothing extra. The statements per request therefore depend on what is
+expanded, never on the page size.
+
+Relationships that were not expanded must not be lazy-loaded while the
+response is serialised either, so endpoints hand ``loaded_view``s to the
+response model: a relationship that was not loaded reads as missing and the
+schema falls back to its ``None`` default.
+"""
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+class InvalidExpandError(ValueError):
+    pass
+
+
+def parse_expand(values: Iterable[str]) -> List[str]:
+    """Accept both ``expand=a&expand=b`` and ``expand=a,b``."""
+    paths = []
+    for value in values or ():
+        for path in value.split(","):
+            path = path.strip()
+            if path and path not in paths:
+                paths.append(path)
+    return paths
+
+
+def expand_options(model, paths: Sequence[str], allowed: Iterable[str]) -> list:
+    allowed = set(allowed)
+    unknown = [path for path in paths if path not in allowed]
+    if unknown:
+        raise InvalidExpandError(
+            f"Cannot expand {', '.join(unknown)}; expected any of {', '.join(sorted(allowed))}"
+        )
+    options = []
+    for path in paths:
+        option, mapper = None, inspect(model)
+        for name in path.split("."):
+            relationship = mapper.relationships[name]
+            attribute = getattr(mapper.class_, name)
+            loader = selectinload if relationship.uselist else joinedload
+            option = loader(attribute) if option is None else getattr(option, loader.__name__)(attribute)
+            mapper = relationship.mapper
+        options.append(option)
+    return options
+
+
+class LoadedView:
+    """Read-only attribute view of an ORM instance that hides relationships that were not loaded.
+
+    ``extra`` adds computed attributes, e.g. dimension labels.
+    """
+
+    __slots__ = ("_obj", "_unloaded", "_extra")
+
+    def __init__(self, obj, extra: Optional[dict] = None):
+        self._obj = obj
+        self._unloaded = inspect(obj).unloaded
+        self._extra = extra or {}
+
+    def __getattr__(self, name):
+        if name in self._extra:
+            return self._extra[name]
+        if name in self._unloaded:
+            raise AttributeError(name)
+        return _view(getattr(self._obj, name))
+
+
+def _view(value):
+    if isinstance(value, list):
+        return [_view(item) for item in value]
+    if hasattr(value, "_sa_instance_state"):
+        return LoadedView(value)
+    return value
+
+
+def loaded_view(rows: list, extras: Optional[List[dict]] = None) -> list:
+    if extras is None:
+        return [LoadedView(row) for row in rows]
+    return [LoadedView(row, extra) for row, extra in zip(rows, extras)]
@@ -0,0 +1,98 @@
+"""Keyset (cursor) pagination shared by the ``crud_*`` list functions.
+
+A page is fetched with ``WHERE (key columns) > (last row's key)`` instead of
+``OFFSET``, so every page costs an index range scan no matter how deep the
+client has paged. The cursor handed to clients is the last row's key encoded
+as URL-safe base64 JSON; it is opaque and only meaningful to the query that
+produced it.
+
+The last key column must be unique and non-null (normally the primary key).
+Earlier columns may be nullable; NULLs sort after every other value.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, or_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursorError("Invalid cursor")
+    try:
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except (TypeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def _coerce(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def _equals(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _greater(column, value, nullable: bool = True):
+    # With NULLS LAST ordering nothing sorts after NULL, and NULL sorts after any value.
+    if value is None:
+        return false()
+    return or_(column > value, column.is_(None)) if nullable else column > value
+
+
+def _after(columns: Sequence, values: Sequence):
+    clauses = []
+    last = len(columns) - 1
+    for i, (column, value) in enumerate(zip(columns, values)):
+        prefix = [_equals(c, v) for c, v in zip(columns[:i], values[:i])]
+        # The last column is never NULL, and an OR on it keeps the planner
+        # from turning the predicate into a range on the (key..., id) index.
+        clauses.append(and_(*prefix, _greater(column, value, nullable=i < last)))
+    return or_(*clauses)
+
+
+def keyset(query, columns: Sequence, cursor: Optional[str] = None, limit: int = 100):
+    """Apply the cursor filter, key ordering and ``limit + 1`` to a ``Query`` or ``Select``."""
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns)))
+    order_by = [c.asc().nulls_last() for c in columns[:-1]] + [columns[-1].asc()]
+    return query.order_by(*order_by).limit(limit + 1)
+
+
+def build_page(rows: list, columns: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
+
+
+def paginate(query: Query, columns: Sequence, cursor: Optional[str] = None, limit: int = 100) -> Tuple[list, Optional[str]]:
+    """Return one page of ``query`` ordered by ``columns`` and the cursor for the next page."""
+    return build_page(keyset(query, columns, cursor, limit).all(), columns, limit)
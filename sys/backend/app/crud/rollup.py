@@ -0,0 +1,158 @@
+"""Time-bucketed rollups (count and sum per day/week/month and group) computed in SQL.
+
+The requested range is widened to whole buckets and every bucket's rows are
+cached under ``(table, table version, bucket size, group-by, bucket start)``.
+A bucket that ended before "now" is closed. Its rows are cached for
+``ROLLUP_CLOSED_CACHE_TTL_SECONDS``, so a dashboard sliding its window forward
+only queries the buckets it has not seen plus the open one. The open bucket
+is cached for ``ROLLUP_CACHE_TTL_SECONDS``. Missing buckets are fetched with
+one ``GROUP BY`` per contiguous run.
+
+The table version comes from ``table_versions``, which every crud write bumps
+in whichever worker it runs. A write anywhere therefore retires all cached
+buckets of its table at once, and they are refilled as they are asked for.
+Rows loaded behind the crud layer (``fato_financeiro`` has no write path at
+all) are picked up once the closed-bucket TTL expires, or immediately if the
+loader calls ``table_versions.bump``.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.orm import Session
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..schemas.enums import RollupBucket
+from . import table_versions
+
+rollup_cache = TTLCache(ttl=settings.ROLLUP_CACHE_TTL_SECONDS, maxsize=settings.ROLLUP_CACHE_MAXSIZE)
+
+
+class InvalidRollupRangeError(ValueError):
+    pass
+
+
+def bucket_floor(moment: datetime, bucket: RollupBucket) -> datetime:
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == RollupBucket.week:
+        return day - timedelta(days=day.weekday())
+    if bucket == RollupBucket.month:
+        return day.replace(day=1)
+    return day
+
+
+def bucket_next(start: datetime, bucket: RollupBucket) -> datetime:
+    if bucket == RollupBucket.week:
+        return start + timedelta(days=7)
+    if bucket == RollupBucket.month:
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return start + timedelta(days=1)
+
+
+def bucket_starts(start: datetime, end: datetime, bucket: RollupBucket) -> List[datetime]:
+    """Starts of the buckets covering ``[start, end)``."""
+    if end <= start:
+        raise InvalidRollupRangeError("end must be after start")
+    starts = []
+    current = bucket_floor(start, bucket)
+    while current < end:
+        starts.append(current)
+        if len(starts) > settings.ROLLUP_MAX_BUCKETS:
+            raise InvalidRollupRangeError(
+                f"Range spans more than {settings.ROLLUP_MAX_BUCKETS} {bucket.value} buckets"
+            )
+        current = bucket_next(current, bucket)
+    return starts
+
+
+def bucket_expression(dialect_name: str, column, bucket: RollupBucket):
+    if dialect_name == "postgresql":
+        # A literal, not a bind parameter, so SELECT and GROUP BY render the same expression.
+        return func.date_trunc(literal_column(f"'{bucket.value}'"), column)
+    # SQLite: 'weekday 0' moves forward to Sunday (or stays), minus six days is that week's Monday.
+    if bucket == RollupBucket.week:
+        return func.date(column, "weekday 0", "-6 days")
+    if bucket == RollupBucket.month:
+        return func.strftime("%Y-%m-01", column)
+    return func.date(column)
+
+
+def as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    return datetime.fromisoformat(value)
+
+
+def _runs(starts: Sequence[datetime], bucket: RollupBucket):
+    """Group bucket starts into contiguous ``[first, end)`` runs."""
+    runs = []
+    for start in starts:
+        if runs and runs[-1][1] == start:
+            runs[-1][1] = bucket_next(start, bucket)
+        else:
+            runs.append([start, bucket_next(start, bucket)])
+    return runs
+
+
+def _query_run(db: Session, date_column, value_column, dimensions: Dict[str, object], bucket, run_start, run_end):
+    bucket_column = bucket_expression(db.get_bind().dialect.name, date_column, bucket).label("bucket")
+    group_columns = [column.label(name) for name, column in dimensions.items()]
+    stmt = (
+        select(
+            bucket_column,
+            *group_columns,
+            func.count().label("count"),
+            func.coalesce(func.sum(value_column), 0.0).label("total"),
+        )
+        .where(date_column >= run_start, date_column < run_end)
+        .group_by(bucket_column, *group_columns)
+        .order_by(bucket_column, *group_columns)
+    )
+    rows_by_bucket: Dict[datetime, list] = {}
+    for row in db.execute(stmt):
+        mapping = row._mapping
+        rows_by_bucket.setdefault(as_datetime(row.bucket), []).append({
+            "bucket": as_datetime(row.bucket),
+            "group": {name: mapping[name] for name in dimensions},
+            "count": row.count,
+            "total": row.total,
+        })
+    return rows_by_bucket
+
+
+def rollup(
+    db: Session,
+    table: str,
+    date_column,
+    value_column,
+    dimensions: Dict[str, object],
+    bucket: RollupBucket,
+    start: datetime,
+    end: datetime,
+    now: Optional[datetime] = None,
+) -> list:
+    """Rows of ``{bucket, group, count, total}`` for every non-empty bucket/group in the range."""
+    now = now or datetime.now()
+    # Fact dates are stored naive; drop any offset the client sent.
+    starts = bucket_starts(as_datetime(start), as_datetime(end), bucket)
+    group_key = tuple(dimensions)
+    # Read before querying, so rows cached under a version are at least as new as it.
+    (version,) = table_versions.versions.get(table)
+
+    def key(bucket_start):
+        return (table, version, bucket.value, group_key, bucket_start)
+
+    cached = {s: rollup_cache.get(key(s)) for s in starts}
+    missing = [s for s in starts if cached[s] is None]
+    # A write during the query bumps the version, so these rows land under a key nobody reads again.
+    for run_start, run_end in _runs(missing, bucket):
+        rows_by_bucket = _query_run(db, date_column, value_column, dimensions, bucket, run_start, run_end)
+        current = run_start
+        while current < run_end:
+            cached[current] = rows_by_bucket.get(current, [])
+            closed = bucket_next(current, bucket) <= now
+            ttl = settings.ROLLUP_CLOSED_CACHE_TTL_SECONDS if closed else rollup_cache.ttl
+            rollup_cache.set(key(current), cached[current], ttl=ttl)
+            current = bucket_next(current, bucket)
+    return [row for s in starts for row in cached[s]]
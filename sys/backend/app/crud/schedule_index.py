@@ -0,0 +1,282 @@
+"""In-memory interval index over ``schedule_entries`` for conflict checks and free-slot search.
+
+There is one interval tree per ``(teacher_id, day, class_type)``. Each tree is
+a treap ordered by ``start_time`` in which every node also stores the largest
+``end_time`` in its subtree. An overlap query therefore skips every subtree
+that ends before the slot starts, and visits nothing to the right of a node
+that starts after the slot ends. A query costs O(log n + k) and an insert
+O(log n), both expected.
+
+The index is filled at startup, and ``create_schedule_entry`` adds every entry
+it commits. Schedule entries are only ever inserted, so before answering a
+query ``sync`` pulls in rows whose id is above the highest one indexed. That
+covers entries written by other workers at the cost of one primary-key lookup.
+
+Ids are assigned when a row is inserted but become visible when its
+transaction commits, so a lower id can appear after a higher one. The ids
+skipped below the highest indexed one are kept as gaps, and ``sync`` asks for
+them again until they show up or ``SCHEDULE_INDEX_GAP_TTL_SECONDS`` passes.
+Most gaps never fill, because of rollbacks or sequence caching, so they are
+dropped after that time and only the newest ``MAX_GAPS`` are kept. A
+transaction that commits later than that is missed until the next full
+``load``. ``sync`` does a full load every ``SCHEDULE_INDEX_RELOAD_SECONDS``.
+"""
+import random
+import threading
+from datetime import datetime, time, timedelta
+from time import monotonic
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.config import settings
+from ..core.metrics import registry
+from .rollup import as_datetime
+
+ENTRIES = registry.gauge("schedule_index_entries", "Schedule entries held in the interval index.")
+
+# Also keeps the IN list of a sync under SQLite's bound-parameter limit.
+MAX_GAPS = 500
+
+
+class InvalidSlotError(ValueError):
+    pass
+
+
+class Slot(NamedTuple):
+    id: int
+    teacher_id: int
+    start_time: datetime
+    end_time: datetime
+    day: int
+    class_type: str
+
+
+class _Node:
+    __slots__ = ("slot", "priority", "left", "right", "max_end")
+
+    def __init__(self, slot: Slot):
+        self.slot = slot
+        self.priority = random.random()
+        self.left = self.right = None
+        self.max_end = slot.end_time
+
+
+def _update(node: _Node) -> _Node:
+    node.max_end = node.slot.end_time
+    for child in (node.left, node.right):
+        if child is not None and child.max_end > node.max_end:
+            node.max_end = child.max_end
+    return node
+
+
+def _key(slot: Slot):
+    return slot.start_time, slot.id
+
+
+def _insert(node: Optional[_Node], new: _Node) -> _Node:
+    if node is None:
+        return new
+    if _key(new.slot) < _key(node.slot):
+        node.left = _insert(node.left, new)
+        if node.left.priority > node.priority:
+            pivot, node.left = node.left, node.left.right
+            pivot.right = _update(node)
+            node = pivot
+    else:
+        node.right = _insert(node.right, new)
+        if node.right.priority > node.priority:
+            pivot, node.right = node.right, node.right.left
+            pivot.left = _update(node)
+            node = pivot
+    return _update(node)
+
+
+class IntervalTree:
+    def __init__(self):
+        self.root: Optional[_Node] = None
+        self.size = 0
+
+    def add(self, slot: Slot) -> None:
+        self.root = _insert(self.root, _Node(slot))
+        self.size += 1
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Slot]:
+        """Slots with ``start_time < end`` and ``end_time > start``, by start time."""
+        found, stack = [], []
+        node = self.root
+        # In-order walk with pruning: subtrees ending by ``start`` cannot overlap,
+        # and nothing right of a node starting at or after ``end`` can either.
+        while stack or node is not None:
+            if node is not None and node.max_end > start:
+                stack.append(node)
+                node = node.left
+                continue
+            if not stack:
+                break
+            node = stack.pop()
+            if node.slot.start_time >= end:
+                break
+            if node.slot.end_time > start:
+                found.append(node.slot)
+            node = node.right
+        return found
+
+
+class ScheduleIndex:
+    def __init__(self):
+        self._trees: Dict[Tuple[int, int, str], IntervalTree] = {}
+        self._by_teacher: Dict[int, set] = {}
+        self._ids = set()
+        self._max_id = 0
+        # id below _max_id not seen yet -> monotonic time it was first skipped
+        self._gaps: Dict[int, float] = {}
+        self._loaded_at = monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _add(self, slot: Slot, now: float) -> None:
+        if slot.id > self._max_id:
+            for missing in range(max(self._max_id + 1, slot.id - MAX_GAPS), slot.id):
+                self._gaps[missing] = now
+            self._max_id = slot.id
+        else:
+            self._gaps.pop(slot.id, None)
+        if slot.id in self._ids or None in (slot.teacher_id, slot.start_time, slot.end_time):
+            return
+        key = (slot.teacher_id, slot.day, slot.class_type)
+        tree = self._trees.get(key)
+        if tree is None:
+            tree = self._trees[key] = IntervalTree()
+            self._by_teacher.setdefault(slot.teacher_id, set()).add(key)
+        tree.add(slot)
+        self._ids.add(slot.id)
+
+    def _prune_gaps(self, now: float) -> None:
+        ttl = settings.SCHEDULE_INDEX_GAP_TTL_SECONDS
+        for id_ in [id_ for id_, seen in self._gaps.items() if now - seen > ttl]:
+            del self._gaps[id_]
+        if len(self._gaps) > MAX_GAPS:
+            for id_ in sorted(self._gaps)[:len(self._gaps) - MAX_GAPS]:
+                del self._gaps[id_]
+
+    def add(self, entry) -> None:
+        with self._lock:
+            self._add(_slot(entry), monotonic())
+            ENTRIES.set(len(self._ids))
+
+    def load(self, db: Session) -> int:
+        """(Re)build the index from ``schedule_entries``; returns the number of entries indexed."""
+        # Built aside and swapped in, so queries meanwhile see the old index rather than a partial one.
+        fresh = ScheduleIndex()
+        now = monotonic()
+        for row in db.query(*_COLUMNS):
+            fresh._add(Slot(*row), now)
+        fresh._prune_gaps(now)
+        with self._lock:
+            self._trees, self._by_teacher = fresh._trees, fresh._by_teacher
+            self._ids, self._max_id, self._gaps = fresh._ids, fresh._max_id, fresh._gaps
+            self._loaded_at = now
+            ENTRIES.set(len(self._ids))
+        return len(self)
+
+    def sync(self, db: Session) -> None:
+        """Index rows committed since the last load or sync, e.g. by another worker."""
+        E = models.ScheduleEntry
+        now = monotonic()
+        if now - self._loaded_at >= settings.SCHEDULE_INDEX_RELOAD_SECONDS:
+            self.load(db)
+            return
+        with self._lock:
+            self._prune_gaps(now)
+            max_id, gaps = self._max_id, list(self._gaps)
+        if gaps:
+            rows = db.query(*_COLUMNS).filter(or_(E.id > max_id, E.id.in_(gaps))).all()
+        elif (db.query(func.max(E.id)).scalar() or 0) > max_id:
+            rows = db.query(*_COLUMNS).filter(E.id > max_id).all()
+        else:
+            return
+        with self._lock:
+            for row in rows:
+                self._add(Slot(*row), now)
+            ENTRIES.set(len(self._ids))
+
+    def _keys(self, teacher_id: Optional[int], day: Optional[int], class_type: Optional[str]):
+        keys = self._by_teacher.get(teacher_id, ()) if teacher_id is not None else self._trees
+        return [
+            key for key in keys
+            if (day is None or key[1] == day) and (class_type is None or key[2] == class_type)
+        ]
+
+    def overlapping(
+        self,
+        start: datetime,
+        end: datetime,
+        teacher_id: Optional[int] = None,
+        day: Optional[int] = None,
+        class_type: Optional[str] = None,
+        exclude_id: Optional[int] = None,
+    ) -> List[Slot]:
+        start, end = as_datetime(start), as_datetime(end)
+        if end <= start:
+            raise InvalidSlotError("end must be after start")
+        with self._lock:
+            found = [
+                slot
+                for key in self._keys(teacher_id, day, class_type)
+                for slot in self._trees[key].overlapping(start, end)
+                if slot.id != exclude_id
+            ]
+        return sorted(found, key=lambda slot: (slot.start_time, slot.id))
+
+    def free_slots(
+        self,
+        teacher_id: int,
+        start: datetime,
+        end: datetime,
+        opens: time = time(6),
+        closes: time = time(22),
+        min_length: timedelta = timedelta(minutes=30),
+    ) -> List[Tuple[datetime, datetime]]:
+        """Gaps of at least ``min_length`` between the teacher's entries, within opening hours each day."""
+        if closes <= opens:
+            raise InvalidSlotError("closes must be after opens")
+        busy = self.overlapping(start, end, teacher_id=teacher_id)
+        start, end = as_datetime(start), as_datetime(end)
+        free = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            window_start = max(datetime.combine(day.date(), opens), start)
+            window_end = min(datetime.combine(day.date(), closes), end)
+            cursor = window_start
+            for slot in busy:
+                if slot.end_time <= window_start or slot.start_time >= window_end:
+                    continue
+                if slot.start_time - cursor >= min_length:
+                    free.append((cursor, slot.start_time))
+                cursor = max(cursor, slot.end_time)
+            if window_end - cursor >= min_length:
+                free.append((cursor, window_end))
+            day += timedelta(days=1)
+        return free
+
+
+_COLUMNS = (
+    models.ScheduleEntry.id,
+    models.ScheduleEntry.teacher_id,
+    models.ScheduleEntry.start_time,
+    models.ScheduleEntry.end_time,
+    models.ScheduleEntry.day,
+    models.ScheduleEntry.class_type,
+)
+
+
+def _slot(entry) -> Slot:
+    return Slot(entry.id, entry.teacher_id, entry.start_time, entry.end_time, entry.day, entry.class_type)
+
+
+index = ScheduleIndex()
@@ -0,0 +1,94 @@
+"""Per-table version counters shared by every worker, for ETags.
+
+Each table has a 64-bit counter in a small memory-mapped file
+(``TABLE_VERSIONS_PATH``). A write through the crud layer calls ``bump`` after
+it commits, which increments the counter under a file lock. ``get`` just reads
+the mapped memory, so no query or syscall is needed to tell whether a table
+changed, and a write in one worker is seen by the others immediately.
+
+A table's slot is the CRC32 of its name modulo ``SLOTS``. Two tables that
+share a slot share a counter: a write to either changes both, which costs a
+needless refresh but never serves stale data. Counters only grow, and a new
+file starts them at the current time in nanoseconds, so ETags from a
+previous file cannot match by accident.
+
+Writers outside the crud layer, such as SQL loads into the ``fato_*`` tables,
+must call ``bump`` for the tables they change. Otherwise clients keep
+getting ``304`` for those tables.
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Optional, Tuple, Union
+
+from ..core.config import settings
+from ..core.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+SLOTS = 256
+_SLOT = struct.Struct("<q")
+
+Table = Union[str, type]
+
+
+def table_name(table: Table) -> str:
+    return table if isinstance(table, str) else table.__tablename__
+
+
+def _slot(table: Table) -> int:
+    return zlib.crc32(table_name(table).encode()) % SLOTS * _SLOT.size
+
+
+class TableVersions:
+    def __init__(self, path: str):
+        self.path = path
+        self._map: Optional[Union[mmap.mmap, bytearray]] = None
+        self._open_lock = threading.Lock()
+        self._bump_lock = threading.Lock()
+
+    def _memory(self):
+        if self._map is None:
+            with self._open_lock:
+                if self._map is None:
+                    self._map = self._open()
+        return self._map
+
+    def _open(self):
+        size = SLOTS * _SLOT.size
+        try:
+            with FileLock(f"{self.path}.lock"):
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    if os.fstat(fd).st_size < size:
+                        os.write(fd, _SLOT.pack(time.time_ns()) * SLOTS)
+                    return mmap.mmap(fd, size)
+                finally:
+                    os.close(fd)
+        except OSError:
+            # Still correct within this worker; other workers' writes go unseen.
+            logger.warning("Could not map %s; table versions are per process", self.path, exc_info=True)
+            return bytearray(_SLOT.pack(time.time_ns()) * SLOTS)
+
+    def get(self, *tables: Table) -> Tuple[int, ...]:
+        memory = self._memory()
+        return tuple(_SLOT.unpack_from(memory, _slot(table))[0] for table in tables)
+
+    def bump(self, *tables: Table) -> None:
+        memory = self._memory()
+        offsets = sorted({_slot(table) for table in tables})
+        with self._bump_lock, FileLock(f"{self.path}.lock"):
+            for offset in offsets:
+                _SLOT.pack_into(memory, offset, _SLOT.unpack_from(memory, offset)[0] + 1)
+
+
+versions = TableVersions(settings.TABLE_VERSIONS_PATH)
+
+
+def bump(*tables: Table) -> None:
+    """Mark ``tables`` (models or table names) as changed; call after committing the write."""
+    versions.bump(*tables)
@@ -1,3 +1 @@
-from sqlalchemy.ext.declarative import declarative_base
-
-Base = declarative_base()
+from ..core.database import Base
@@ -1,8 +1,16 @@
 from fastapi import FastAPI, Request, Response
-from app.api.api import api_router
-from app.core.database import engine, Base
+from fastapi.responses import JSONResponse
+from app.api.api import admission_groups, api_router, precompressed_routes, uncompressed_routes
+from app.core.database import engine, async_engine, Base, SessionLocal
+from app.core import admission, compression, instrumentation, metrics, query_profiler
+from app.core.config import settings
+from app.crud import dimension_cache, schedule_index
+from app.crud.expand import InvalidExpandError
+from app.crud.pagination import InvalidCursorError
+from app.crud.rollup import InvalidRollupRangeError
+from app.crud.schedule_index import InvalidSlotError
+from app.crud.utilization import InvalidUtilizationRangeError
 from starlette.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -10,13 +18,57 @@ logger = logging.getLogger(__name__)
 
 Base.metadata.create_all(bind=engine)
 
+sync_engines = [engine]
+if async_engine is not None:
+    sync_engines.append(async_engine.sync_engine)
+
+for sync_engine in sync_engines:
+    instrumentation.instrument_engine(sync_engine)
+
+if settings.QUERY_PROFILING:
+    query_profiler.enable(sync_engines, slow_threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS)
+
 app = FastAPI()
 
-@app.middleware("http")
-async def log_headers_middleware(request: Request, call_next):
-    response = await call_next(request)
-    logger.info(f"Response headers: {response.headers}")
-    return response
+@app.on_event("startup")
+def load_dimension_cache():
+    with SessionLocal() as db:
+        counts = dimension_cache.cache.load(db)
+    logger.info("Dimension cache loaded: %s", counts)
+
+@app.on_event("startup")
+def load_schedule_index():
+    with SessionLocal() as db:
+        count = schedule_index.index.load(db)
+    logger.info("Schedule index loaded: %d entries", count)
+
+@app.exception_handler(InvalidCursorError)
+@app.exception_handler(InvalidRollupRangeError)
+@app.exception_handler(InvalidExpandError)
+@app.exception_handler(InvalidUtilizationRangeError)
+@app.exception_handler(InvalidSlotError)
+async def bad_request_handler(request: Request, exc: ValueError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+if settings.ADMISSION_CONTROL:
+    # Innermost, so 503s still get CORS headers and are timed.
+    app.add_middleware(admission.AdmissionMiddleware, groups=admission_groups, prefix="/api/v1")
+
+if settings.COMPRESSION:
+    app.add_middleware(
+        compression.CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        exclude=uncompressed_routes,
+        cacheable=precompressed_routes,
+        prefix="/api/v1",
+        cache_size=settings.COMPRESSION_CACHE_MAXSIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
 
 origins = ["*"]
 
@@ -27,5 +79,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it wraps every other middleware and times the whole request.
+app.add_middleware(instrumentation.TimingMiddleware)
 
-app.include_router(api_router, prefix="/api/v1")
\ No newline at end of file
+app.include_router(api_router, prefix="/api/v1")
@@ -1,5 +1,9 @@
 from .productivity import Teacher, WorkLog, ScheduleEntry
 from .customer import Customer
 from .sales import SalesFunnel, Transaction
-from .business_intelligence import BusinessIntelligence
-from .analytics import Analytics
\ No newline at end of file
+from .business_intelligence import (
+    DimUsuario, DimEmpresa, DimPessoa, DimEstagio, DimOrigem,
+    FatoOportunidades, FatoMovimentacoes, FatoAtividades, FatoFinanceiro,
+)
+from .analytics import Activity
+from .kpi import KpiCustomerTotals, KpiMonthlyRevenue, KpiFunnelStage
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..core.database import Base
 from .customer import Customer
@@ -13,4 +13,8 @@ class Activity(Base):
 
     customer = relationship("Customer", back_populates="activities")
 
+    __table_args__ = (
+        Index('ix_activities_date_id', 'date', 'id'),
+    )
+
 Customer.activities = relationship("Activity", back_populates="customer")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Index, Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship
 from ..database.base import Base
 import enum
@@ -35,6 +35,11 @@ class DimOrigem(Base):
 
 class FatoOportunidades(Base):
     __tablename__ = 'fato_oportunidades'
+    # Date range + stage filters; valor is carried so stage sums never touch the table.
+    __table_args__ = (
+        Index('ix_fato_oportunidades_data_criacao_stage', 'data_criacao', 'stage_id', 'valor'),
+        Index('ix_fato_oportunidades_stage_data_criacao', 'stage_id', 'data_criacao', 'valor'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey('dim_empresa.id'))
     person_id = Column(Integer, ForeignKey('dim_pessoa.id'))
@@ -53,6 +58,9 @@ class FatoOportunidades(Base):
 
 class FatoMovimentacoes(Base):
     __tablename__ = 'fato_movimentacoes'
+    __table_args__ = (
+        Index('ix_fato_movimentacoes_deal_data_entrada', 'deal_id', 'data_entrada', 'in_stage_id'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     deal_id = Column(Integer, ForeignKey('fato_oportunidades.id'))
     out_stage_id = Column(Integer, ForeignKey('dim_estagio.id'))
@@ -99,6 +107,10 @@ class StatusPagamentoEnum(str, enum.Enum):
 
 class FatoFinanceiro(Base):
     __tablename__ = 'fato_financeiro'
+    __table_args__ = (
+        Index('ix_fato_financeiro_data_tipo_status', 'data', 'tipo', 'status', 'valor'),
+        Index('ix_fato_financeiro_tipo_status_data', 'tipo', 'status', 'data', 'valor'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, ForeignKey('dim_empresa.id'), nullable=True)
     data = Column(DateTime)
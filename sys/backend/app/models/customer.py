@@ -1,10 +1,11 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime
 from sqlalchemy.orm import relationship
+from uuid import uuid4
 from ..database.base import Base
 
 class Customer(Base):
     __tablename__ = 'customers'
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True, index=True, default=lambda: uuid4().hex)
     name = Column(String, index=True)
     status = Column(String)
     total_spent = Column(Float)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from ..core.database import Base
+
+# Summary tables kept in step with the fact tables by app.crud.crud_kpi.
+
+class KpiCustomerTotals(Base):
+    __tablename__ = "kpi_customer_totals"
+
+    customer_id = Column(String, primary_key=True)
+    transactions = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    last_transaction_date = Column(DateTime, nullable=True)
+    activities = Column(Integer, nullable=False, default=0)
+    last_activity_date = Column(DateTime, nullable=True)
+
+class KpiMonthlyRevenue(Base):
+    __tablename__ = "kpi_monthly_revenue"
+
+    month = Column(DateTime, primary_key=True)
+    transactions = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class KpiFunnelStage(Base):
+    __tablename__ = "kpi_funnel_stage"
+
+    stage = Column(String, primary_key=True)
+    deals = Column(Integer, nullable=False, default=0)
+    value = Column(Float, nullable=False, default=0.0)
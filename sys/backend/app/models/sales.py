@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..core.database import Base
 from .customer import Customer
@@ -11,7 +11,7 @@ class SalesFunnel(Base):
     value = Column(Float)
     customer_id = Column(Integer, ForeignKey("customers.id"))
 
-customer = relationship("app.models.customer.Customer", back_populates="sales_funnel")
+    customer = relationship("Customer", back_populates="sales_funnel")
 
 class Transaction(Base):
     __tablename__ = "transactions"
@@ -26,4 +26,8 @@ class Transaction(Base):
     date = Column(DateTime)
     customer_id = Column(Integer, ForeignKey("customers.id"))
 
-customer = relationship("app.models.customer.Customer", back_populates="transactions")
+    customer = relationship("Customer", back_populates="transactions")
+
+    __table_args__ = (
+        Index('ix_transactions_date_id', 'date', 'id'),
+    )
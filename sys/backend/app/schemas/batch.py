@@ -0,0 +1,15 @@
+from typing import Generic, List, TypeVar
+
+from pydantic import BaseModel, Field
+
+BATCH_MAX_IDS = 1000
+
+IdT = TypeVar("IdT")
+T = TypeVar("T")
+
+class BatchRequest(BaseModel, Generic[IdT]):
+    ids: List[IdT] = Field(..., max_length=BATCH_MAX_IDS)
+
+class BatchResult(BaseModel, Generic[T, IdT]):
+    items: List[T]
+    missing: List[IdT] = []
@@ -110,6 +110,27 @@ class FatoMovimentacoes(FatoMovimentacoesBase):
     class Config:
         orm_mode = True
 
+class FatoOportunidadesExpanded(FatoOportunidades):
+    # Labels from the in-process dimension cache; always filled on list responses.
+    empresa_nome: Optional[str] = None
+    usuario_nome: Optional[str] = None
+    estagio_nome: Optional[str] = None
+    origem_nome: Optional[str] = None
+    empresa: Optional[DimEmpresa] = None
+    pessoa: Optional[DimPessoa] = None
+    usuario: Optional[DimUsuario] = None
+    estagio: Optional[DimEstagio] = None
+    origem: Optional[DimOrigem] = None
+
+class FatoMovimentacoesExpanded(FatoMovimentacoes):
+    out_stage_nome: Optional[str] = None
+    in_stage_nome: Optional[str] = None
+    usuario_nome: Optional[str] = None
+    oportunidade: Optional[FatoOportunidadesExpanded] = None
+    estagio_saida: Optional[DimEstagio] = None
+    estagio_entrada: Optional[DimEstagio] = None
+    usuario: Optional[DimUsuario] = None
+
 # FatoAtividades
 class FatoAtividadesBase(BaseModel):
     deal_id: int
@@ -144,3 +165,30 @@ class FatoFinanceiro(FatoFinanceiroBase):
 
     class Config:
         orm_mode = True
+
+# Funnel analytics
+class FunnelStageStats(BaseModel):
+    estagio_id: int
+    estagio_nome: str
+    ordem: int
+    current_deals: int
+    current_value: float
+    reached: int
+    conversion_from_previous: Optional[float] = None
+
+class StageDwell(BaseModel):
+    estagio_id: int
+    estagio_nome: str
+    ordem: int
+    transitions: int
+    avg_seconds: Optional[float] = None
+    min_seconds: Optional[float] = None
+    max_seconds: Optional[float] = None
+
+class WinsByGroup(BaseModel):
+    group_id: Optional[int] = None
+    group_name: Optional[str] = None
+    deals_won: int
+    won_value: float
+    avg_value: float
+    share: Optional[float] = None
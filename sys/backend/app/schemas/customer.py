@@ -10,10 +10,13 @@ class CustomerBase(BaseModel):
     last_transaction_date: Optional[datetime] = None
 
 class CustomerCreate(CustomerBase):
-    id: str
+    id: Optional[str] = None
 
 class Customer(CustomerBase):
     id: str
 
     class Config:
         orm_mode = True
+
+class CustomerBulkResult(BaseModel):
+    upserted: int
@@ -18,3 +18,38 @@ class StatusPagamentoEnum(str, Enum):
     paid = "paid"
     pending = "pending"
     failed = "failed"
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+class ColumnarFormat(str, Enum):
+    parquet = "parquet"
+    arrow = "arrow"
+
+class WinGroupBy(str, Enum):
+    origem = "origem"
+    usuario = "usuario"
+
+class RollupBucket(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+class TransactionDimension(str, Enum):
+    category = "category"
+    payment_method = "payment_method"
+    item = "item"
+
+class FinanceiroDimension(str, Enum):
+    tipo = "tipo"
+    metodo = "metodo"
+    status = "status"
+    empresa_id = "empresa_id"
+
+class BiDimension(str, Enum):
+    usuarios = "usuarios"
+    empresas = "empresas"
+    pessoas = "pessoas"
+    estagios = "estagios"
+    origens = "origens"
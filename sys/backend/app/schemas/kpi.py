@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class CustomerTotals(BaseModel):
+    customer_id: str
+    transactions: int
+    revenue: float
+    last_transaction_date: Optional[datetime] = None
+    activities: int
+    last_activity_date: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class MonthlyRevenue(BaseModel):
+    month: datetime
+    transactions: int
+    revenue: float
+
+    class Config:
+        orm_mode = True
+
+class FunnelStageCount(BaseModel):
+    stage: str
+    deals: int
+    value: float
+
+    class Config:
+        orm_mode = True
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import List, Optional
 import enum
@@ -13,16 +13,21 @@ class ClassType(str, enum.Enum):
     BOTH = 'Ambos'
     PONTO = 'Ponto'
 
+# Field names follow the ORM columns; the camelCase aliases are the wire format.
+
 class TeacherBase(BaseModel):
     name: str
     type: TeacherType
-    contractedHours: int
+    contracted_hours: int = Field(alias="contractedHours")
+
+    class Config:
+        populate_by_name = True
 
 class TeacherCreate(TeacherBase):
     pass
 
 class Teacher(TeacherBase):
-    id: str
+    id: int
 
     class Config:
         orm_mode = True
@@ -40,34 +45,71 @@ class Student(StudentBase):
         orm_mode = True
 
 class ScheduleEntryBase(BaseModel):
-    teacherId: str
-    studentIds: List[str]
-    startTime: datetime
-    endTime: datetime
+    teacher_id: int = Field(alias="teacherId")
+    student_ids: List[str] = Field(default_factory=list, alias="studentIds")
+    start_time: datetime = Field(alias="startTime")
+    end_time: datetime = Field(alias="endTime")
     day: int
-    classType: ClassType
-    workLogId: Optional[str] = None
-    isUnplanned: Optional[bool] = False
+    class_type: ClassType = Field(alias="classType")
+    work_log_id: Optional[str] = Field(None, alias="workLogId")
+    is_unplanned: Optional[bool] = Field(False, alias="isUnplanned")
+
+    class Config:
+        populate_by_name = True
 
 class ScheduleEntryCreate(ScheduleEntryBase):
     pass
 
+# Client-side fields with no column on schedule_entries.
+SCHEDULE_ENTRY_CLIENT_FIELDS = {"student_ids", "work_log_id", "is_unplanned"}
+
 class ScheduleEntry(ScheduleEntryBase):
-    id: str
+    id: int
 
     class Config:
         orm_mode = True
 
 class WorkLogBase(BaseModel):
-    teacherId: str
-    checkIn: datetime
-    checkOut: Optional[datetime] = None
+    teacher_id: int = Field(alias="teacherId")
+    check_in: datetime = Field(alias="checkIn")
+    check_out: Optional[datetime] = Field(None, alias="checkOut")
+
+    class Config:
+        populate_by_name = True
 
 class WorkLogCreate(WorkLogBase):
     pass
 
 class WorkLog(WorkLogBase):
-    id: str
+    id: int
 
     class Config:
         orm_mode = True
+
+class TeacherExpanded(Teacher):
+    work_logs: Optional[List[WorkLog]] = Field(None, alias="workLogs")
+    schedule_entries: Optional[List[ScheduleEntry]] = Field(None, alias="scheduleEntries")
+
+class FreeSlot(BaseModel):
+    start_time: datetime = Field(alias="startTime")
+    end_time: datetime = Field(alias="endTime")
+
+    class Config:
+        populate_by_name = True
+
+class TeacherUtilization(BaseModel):
+    teacher_id: int = Field(alias="teacherId")
+    name: Optional[str] = None
+    contracted_hours: Optional[int] = Field(None, alias="contractedHours")
+    expected_hours: float = Field(alias="expectedHours")
+    worked_hours: float = Field(alias="workedHours")
+    scheduled_hours: float = Field(alias="scheduledHours")
+    overlap_hours: float = Field(alias="overlapHours")
+    # On the clock with no class scheduled / scheduled with nobody on the clock.
+    idle_hours: float = Field(alias="idleHours")
+    missed_hours: float = Field(alias="missedHours")
+    utilization: Optional[float] = None
+    schedule_adherence: Optional[float] = Field(None, alias="scheduleAdherence")
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pydantic import BaseModel
+
+from .enums import RollupBucket
+
+class RollupRow(BaseModel):
+    bucket: datetime
+    group: Dict[str, Any]
+    count: int
+    total: float
+
+class Rollup(BaseModel):
+    bucket: RollupBucket
+    start: datetime
+    end: datetime
+    group_by: List[str]
+    rows: List[RollupRow]
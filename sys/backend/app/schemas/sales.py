@@ -28,6 +28,12 @@ class TransactionBase(BaseModel):
 class TransactionCreate(TransactionBase):
     pass
 
+class TransactionBulkCreate(TransactionCreate):
+    customer_id: int
+
+class TransactionBulkResult(BaseModel):
+    created: int
+
 class Transaction(TransactionBase):
     id: int
     customer_id: int
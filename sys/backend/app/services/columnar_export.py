@@ -0,0 +1,176 @@
+"""Arrow IPC / Parquet export of the BI star schema (``dim_*`` and ``fato_*`` tables).
+
+Record batches are built straight from ``yield_per`` partitions of the DB
+cursor, so no table is ever materialised whole. Enum columns are written as
+dictionary arrays over the enum's values.
+"""
+import enum
+from typing import Callable, Iterator
+
+from sqlalchemy import Boolean, DateTime, Enum as SQLAlchemyEnum, Float, Integer, String, select
+from sqlalchemy.orm import Session
+
+from app.models import business_intelligence
+from app.schemas.enums import ColumnarFormat
+
+BATCH_SIZE = 50_000
+
+BI_TABLES = {
+    model.__tablename__: model
+    for model in (
+        business_intelligence.DimUsuario,
+        business_intelligence.DimEmpresa,
+        business_intelligence.DimPessoa,
+        business_intelligence.DimEstagio,
+        business_intelligence.DimOrigem,
+        business_intelligence.FatoOportunidades,
+        business_intelligence.FatoMovimentacoes,
+        business_intelligence.FatoAtividades,
+        business_intelligence.FatoFinanceiro,
+    )
+}
+
+MEDIA_TYPES = {
+    ColumnarFormat.parquet: "application/vnd.apache.parquet",
+    ColumnarFormat.arrow: "application/vnd.apache.arrow.stream",
+}
+
+FILE_EXTENSIONS = {
+    ColumnarFormat.parquet: "parquet",
+    ColumnarFormat.arrow: "arrows",
+}
+
+
+class ColumnarExportUnavailable(RuntimeError):
+    pass
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ColumnarExportUnavailable("Columnar export requires the 'pyarrow' package")
+    return pyarrow
+
+
+def _arrow_type(pa, column):
+    column_type = column.type
+    if isinstance(column_type, SQLAlchemyEnum):
+        return pa.dictionary(pa.int8(), pa.string())
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, String):
+        return pa.string()
+    raise TypeError(f"Unsupported column type {column_type!r} for {column}")
+
+
+def arrow_schema(model):
+    pa = require_pyarrow()
+    return pa.schema([
+        pa.field(column.name, _arrow_type(pa, column), nullable=column.nullable)
+        for column in model.__table__.columns
+    ])
+
+
+def _enum_array(pa, values, column):
+    members = [member.value for member in column.type.enum_class]
+    positions = {value: i for i, value in enumerate(members)}
+    indices = pa.array(
+        [None if v is None else positions[v.value if isinstance(v, enum.Enum) else v] for v in values],
+        type=pa.int8(),
+    )
+    return pa.DictionaryArray.from_arrays(indices, pa.array(members, type=pa.string()))
+
+
+def record_batches(db: Session, model, batch_size: int = BATCH_SIZE) -> Iterator:
+    pa = require_pyarrow()
+    table = model.__table__
+    columns = list(table.columns)
+    schema = arrow_schema(model)
+    result = db.execute(
+        select(table).order_by(table.primary_key.columns.values()[0]),
+        execution_options={"yield_per": batch_size},
+    )
+    for partition in result.partitions():
+        arrays = []
+        for position, (column, field) in enumerate(zip(columns, schema)):
+            values = [row[position] for row in partition]
+            if pa.types.is_dictionary(field.type):
+                arrays.append(_enum_array(pa, values, column))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file object whose buffered bytes are handed out by ``drain``."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def write_table(db: Session, model, sink, fmt: ColumnarFormat, batch_size: int = BATCH_SIZE) -> int:
+    """Write ``model``'s table to a path or file object; returns the number of rows."""
+    return sum(_write_batches(db, model, sink, fmt, batch_size))
+
+
+def _write_batches(db: Session, model, sink, fmt: ColumnarFormat, batch_size: int):
+    pa = require_pyarrow()
+    schema = arrow_schema(model)
+    if fmt == ColumnarFormat.parquet:
+        writer = pa.parquet.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for batch in record_batches(db, model, batch_size):
+            writer.write_batch(batch)
+            yield batch.num_rows
+    finally:
+        writer.close()
+
+
+def stream_table(
+    session_factory: Callable[[], Session], model, fmt: ColumnarFormat, batch_size: int = BATCH_SIZE
+) -> Iterator[bytes]:
+    """Yield the encoded file chunk by chunk as each record batch is written."""
+    sink = _ChunkSink()
+    db = session_factory()
+    try:
+        for _ in _write_batches(db, model, sink, fmt, batch_size):
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    finally:
+        db.close()
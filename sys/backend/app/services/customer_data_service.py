@@ -6,6 +6,9 @@ import logging
 import os
 from sqlalchemy.orm import Session
 from app import crud
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.jobs import BackgroundJob
 from app.schemas import customer as schemas
 
 # Configure logging
@@ -38,93 +41,138 @@ def clean_monetary(value):
             return 0.0
     return 0.0
 
-def load_and_process_data(db: Session):
-    logger.info("Starting up and loading data from Excel files...")
-    try:
-        # Define file paths relative to the business-intelligence-dashboard
-        base_path = '../business-intelligence-dashboard/datasets/'
-        clientes_path = os.path.join(base_path, 'clientes.xlsx')
-        fluxo_path = os.path.join(base_path, 'fluxo_caixa.xlsx')
-        funil_path = os.path.join(base_path, 'funil_vendas.xlsx')
-
-        # Check for files
-        if not all(os.path.exists(p) for p in [clientes_path, fluxo_path, funil_path]):
-            logger.warning("One or more data files are missing. API will run with empty data.")
-            return
-
-        # --- Data Extraction ---
-        customers_df = pd.read_excel(clientes_path, header=None)
-        # Simple extraction logic, assuming structure from previous analysis
-        customers_records = []
-        for i in range(1, len(customers_df)):
-            row = customers_df.iloc[i]
-            if pd.isna(row[1]): continue
-            try:
-                customer_id = str(int(float(row[1])))
-                customers_records.append({
-                    'customer_id': customer_id, 'name': str(row[2]),
-                    'status': str(row[7]), 'email': str(row[8]), 'phone': str(row[9]),
-                    'source': str(row[10])
-                })
-            except (ValueError, TypeError):
-                logger.warning(f"Skipping row {i+1} in clientes.xlsx due to invalid customer ID: {row[1]}")
-                continue
-        customers_master = pd.DataFrame(customers_records)
-
-        transactions_df = pd.read_excel(fluxo_path)
-        sales_df = pd.read_excel(funil_path)
-
-        # --- Data Cleaning & Transformation ---
-        for col in ['Valor Unitário', 'Valor Total', 'Valor Desconto']:
-            if col in transactions_df.columns:
-                transactions_df[col] = transactions_df[col].apply(clean_monetary)
-        if 'Data (Recibo)' in transactions_df.columns:
-            transactions_df['Data (Recibo)'] = pd.to_datetime(transactions_df['Data (Recibo)'], errors='coerce')
-        if 'Código' in transactions_df.columns:
-            transactions_df['Código'] = transactions_df['Código'].astype(str)
-
-        # --- Unifying Data ---
-        customer_ids_from_master = set()
-        if not customers_master.empty and 'customer_id' in customers_master.columns:
-            customer_ids_from_master = set(customers_master['customer_id'].unique())
-
-        customer_ids_from_transactions = set()
-        if 'Código' in transactions_df.columns:
-            customer_ids_from_transactions = set(transactions_df['Código'].unique())
-
-        customer_ids_from_sales = set()
-        if 'Código' in sales_df.columns:
-            customer_ids_from_sales = set(sales_df['Código'].unique())
-
-        all_customer_ids = customer_ids_from_master \
-            .union(customer_ids_from_transactions) \
-            .union(customer_ids_from_sales)
-        all_customer_ids = {cid for cid in all_customer_ids if cid != 'nan'}
-
-        for customer_id in all_customer_ids:
-            customer_info = customers_master[customers_master['customer_id'] == customer_id]
-            customer_tx = transactions_df[transactions_df['Código'] == customer_id]
-            
-            last_transaction = customer_tx['Data (Recibo)'].max() if not customer_tx.empty else None
-            activity_status = "New"
-            if last_transaction:
-                days_since_last = (datetime.now() - last_transaction).days
-                if days_since_last < 30: activity_status = "Active"
-                elif days_since_last < 90: activity_status = "At Risk"
-                else: activity_status = "Inactive"
-
-            customer_data = {
-                'id': customer_id,
-                'name': customer_info['name'].values[0] if not customer_info.empty else "Unknown Customer",
-                'status': activity_status,
-                'total_spent': float(customer_tx['Valor Total'].sum()),
-                'total_transactions': len(customer_tx),
-                'last_transaction_date': last_transaction
-            }
-            customer_schema = schemas.CustomerCreate(**customer_data)
-            crud.crud_customer.create_customer(db, customer=customer_schema)
-
-        logger.info("Data loaded and processed successfully.")
-
-    except Exception as e:
-        logger.error(f"An error occurred during data loading: {e}")
+def _customer_ids(df, column):
+    if df.empty or column not in df.columns:
+        return pd.Index([], dtype=object)
+    return pd.Index(df[column].dropna().astype(str).unique())
+
+def aggregate_customers(customers_master, transactions_df, sales_df, now=None):
+    """Build one row per customer from the master, cash-flow and funnel sheets.
+
+    Transaction totals, counts and the last receipt date are computed with a
+    single groupby over the cash-flow sheet instead of filtering it once per
+    customer, so the cost is linear in the number of transaction rows.
+    """
+    now = now or datetime.now()
+
+    all_customer_ids = _customer_ids(customers_master, 'customer_id') \
+        .union(_customer_ids(transactions_df, 'Código')) \
+        .union(_customer_ids(sales_df, 'Código'))
+    all_customer_ids = all_customer_ids[all_customer_ids != 'nan']
+
+    customers = pd.DataFrame(index=all_customer_ids)
+    customers.index.name = 'id'
+
+    if 'customer_id' in customers_master.columns:
+        names = customers_master.drop_duplicates('customer_id').set_index('customer_id')['name']
+        customers['name'] = names.reindex(all_customer_ids).fillna("Unknown Customer").values
+    else:
+        customers['name'] = "Unknown Customer"
+
+    customers['total_spent'] = 0.0
+    customers['total_transactions'] = 0
+    last = pd.Series(pd.NaT, index=all_customer_ids, dtype='datetime64[ns]')
+
+    if 'Código' in transactions_df.columns and not transactions_df.empty:
+        codes = transactions_df['Código'].astype(str)
+        totals = transactions_df['Valor Total'] if 'Valor Total' in transactions_df.columns \
+            else pd.Series(0.0, index=transactions_df.index)
+        dates = pd.to_datetime(transactions_df['Data (Recibo)'], errors='coerce') \
+            if 'Data (Recibo)' in transactions_df.columns \
+            else pd.Series(pd.NaT, index=transactions_df.index, dtype='datetime64[ns]')
+        grouped = pd.DataFrame({'code': codes, 'total': totals, 'date': dates}) \
+            .groupby('code', sort=False) \
+            .agg(total_spent=('total', 'sum'), total_transactions=('total', 'size'), last=('date', 'max')) \
+            .reindex(all_customer_ids)
+        customers['total_spent'] = grouped['total_spent'].fillna(0.0).astype(float).values
+        customers['total_transactions'] = grouped['total_transactions'].fillna(0).astype(int).values
+        last = grouped['last']
+
+    days_since_last = (pd.Timestamp(now) - last).dt.days
+    customers['status'] = np.select(
+        [last.isna(), days_since_last < 30, days_since_last < 90],
+        ["New", "Active", "At Risk"],
+        default="Inactive",
+    )
+    customers['last_transaction_date'] = pd.Series(
+        [ts.to_pydatetime() if pd.notna(ts) else None for ts in last], index=all_customer_ids, dtype=object
+    )
+
+    return customers.reset_index()[
+        ['id', 'name', 'status', 'total_spent', 'total_transactions', 'last_transaction_date']
+    ]
+
+def load_and_process_data(db: Session, report=None):
+    """Load the spreadsheets into ``customers``; returns the number of customers upserted.
+
+    ``report(stage, progress)`` is called as each stage starts.
+    """
+    report = report or (lambda stage, progress=None: None)
+    logger.info("Loading data from Excel files...")
+    # Define file paths relative to the business-intelligence-dashboard
+    base_path = '../business-intelligence-dashboard/datasets/'
+    clientes_path = os.path.join(base_path, 'clientes.xlsx')
+    fluxo_path = os.path.join(base_path, 'fluxo_caixa.xlsx')
+    funil_path = os.path.join(base_path, 'funil_vendas.xlsx')
+
+    # Check for files
+    if not all(os.path.exists(p) for p in [clientes_path, fluxo_path, funil_path]):
+        logger.warning("One or more data files are missing. API will run with empty data.")
+        return 0
+
+    # --- Data Extraction ---
+    report("reading clientes.xlsx", 0.05)
+    customers_df = pd.read_excel(clientes_path, header=None)
+    # Simple extraction logic, assuming structure from previous analysis
+    customers_records = []
+    for i in range(1, len(customers_df)):
+        row = customers_df.iloc[i]
+        if pd.isna(row[1]): continue
+        try:
+            customer_id = str(int(float(row[1])))
+            customers_records.append({
+                'customer_id': customer_id, 'name': str(row[2]),
+                'status': str(row[7]), 'email': str(row[8]), 'phone': str(row[9]),
+                'source': str(row[10])
+            })
+        except (ValueError, TypeError):
+            logger.warning(f"Skipping row {i+1} in clientes.xlsx due to invalid customer ID: {row[1]}")
+            continue
+    customers_master = pd.DataFrame(customers_records)
+
+    report("reading fluxo_caixa.xlsx", 0.25)
+    transactions_df = pd.read_excel(fluxo_path)
+    report("reading funil_vendas.xlsx", 0.5)
+    sales_df = pd.read_excel(funil_path)
+
+    # --- Data Cleaning & Transformation ---
+    report("cleaning", 0.6)
+    for col in ['Valor Unitário', 'Valor Total', 'Valor Desconto']:
+        if col in transactions_df.columns:
+            transactions_df[col] = transactions_df[col].apply(clean_monetary)
+    if 'Data (Recibo)' in transactions_df.columns:
+        transactions_df['Data (Recibo)'] = pd.to_datetime(transactions_df['Data (Recibo)'], errors='coerce')
+    if 'Código' in transactions_df.columns:
+        transactions_df['Código'] = transactions_df['Código'].astype(str)
+
+    # --- Unifying Data ---
+    report("aggregating", 0.7)
+    customers = aggregate_customers(customers_master, transactions_df, sales_df)
+    report("upserting customers", 0.8)
+    crud.crud_customer.upsert_customers(
+        db, customers=[schemas.CustomerCreate(**record) for record in customers.to_dict('records')]
+    )
+
+    logger.info("Data loaded and processed successfully.")
+    return len(customers)
+
+def _run_data_load(report):
+    # The job thread owns its session; closing it returns the connection to the pool.
+    with SessionLocal() as db:
+        return {"customers": load_and_process_data(db, report)}
+
+# Started once per deployment (see app.core.jobs); /customer/status reports its progress.
+data_load_job = BackgroundJob(
+    "customer_data_load", _run_data_load,
+    lock_path=settings.DATA_LOAD_LOCK_PATH, status_path=settings.DATA_LOAD_STATUS_PATH,
+)
@@ -0,0 +1,62 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from typing import Callable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.schemas.enums import ExportFormat
+
+EXPORT_BATCH_SIZE = 2000
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def _encode_ndjson(columns, rows) -> bytes:
+    lines = [json.dumps(dict(zip(columns, map(_plain, row))), separators=(",", ":")) for row in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([[_plain(value) for value in row] for row in rows])
+    return buffer.getvalue().encode()
+
+def export_table(
+    session_factory: Callable[[], Session],
+    model,
+    fmt: ExportFormat = ExportFormat.ndjson,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Stream every row of ``model``'s table as NDJSON or CSV chunks.
+
+    Rows are read through a server-side cursor (``yield_per``) and encoded one
+    partition at a time, so memory stays flat regardless of table size. The
+    generator opens its own session because it outlives the request's
+    ``get_db`` dependency.
+    """
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    db = session_factory()
+    try:
+        result = db.execute(
+            select(table).order_by(table.primary_key.columns.values()[0]),
+            execution_options={"yield_per": batch_size},
+        )
+        if fmt == ExportFormat.csv:
+            yield _encode_csv([columns])
+        for partition in result.partitions():
+            yield _encode_csv(partition) if fmt == ExportFormat.csv else _encode_ndjson(columns, partition)
+    finally:
+        db.close()
@@ -0,0 +1,112 @@
+"""Requests/sec of the sync and async database paths under concurrent load.
+
+Seeds a SQLite database, then starts uvicorn once with DATABASE_ASYNC=false
+and once with DATABASE_ASYNC=true and hammers the same list endpoints with
+concurrent clients.
+
+    python -m benchmarks.bench_async_load --requests 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+ENDPOINTS = [
+    "/api/v1/customers/?limit=50",
+    "/api/v1/sales/transactions/?limit=50",
+    "/api/v1/customer/summary",
+]
+
+def seed(database_url, customers=5_000, transactions=50_000):
+    os.environ["DATABASE_URL"] = database_url
+    from app.core.database import Base
+    from app import models
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Customer), [
+            {"id": str(i), "name": f"Customer {i}", "status": "Active" if i % 3 else "Inactive",
+             "total_spent": float(i % 500), "total_transactions": i % 20}
+            for i in range(customers)
+        ])
+        conn.execute(insert(models.Transaction), [
+            {"item": "plan", "category": "membership", "quantity": 1, "unit_value": 99.0,
+             "total_value": 99.0, "payment_method": "pix", "date": start + timedelta(minutes=i),
+             "customer_id": i % customers}
+            for i in range(transactions)
+        ])
+    engine.dispose()
+
+async def wait_ready(base_url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/api/v1/customer/status")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+async def hammer(base_url, total, concurrency):
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(ENDPOINTS[i % len(ENDPOINTS)])
+    errors = 0
+
+    async def worker(client):
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return total / elapsed, errors
+
+def run_mode(database_url, is_async, port, total, concurrency):
+    env = dict(os.environ, DATABASE_URL=database_url, DATABASE_ASYNC=str(is_async).lower())
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        asyncio.run(hammer(base_url, min(total, 200), concurrency))  # warm-up
+        return asyncio.run(hammer(base_url, total, concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    seed(database_url)
+    print(f"{'mode':>6} {'req/s':>10} {'errors':>7}  ({args.requests} requests, concurrency {args.concurrency})")
+    for is_async in (False, True):
+        rps, errors = run_mode(database_url, is_async, args.port, args.requests, args.concurrency)
+        print(f"{'async' if is_async else 'sync':>6} {rps:10.1f} {errors:>7}")
+
+if __name__ == "__main__":
+    main()
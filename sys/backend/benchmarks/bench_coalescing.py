@@ -0,0 +1,138 @@
+"""Latency and database work of bursts of identical analytics requests, with and without coalescing.
+
+Seeds a SQLite database with a BI funnel and transactions, then starts
+uvicorn once with COALESCE_REQUESTS=false and once with COALESCE_REQUESTS=true
+(summary cache disabled in both, so every computation reaches the database).
+Each round fires ``--concurrency`` identical requests at once at every
+endpoint in ENDPOINTS. Reported: requests/sec, p50/p95 latency, and how many
+computations actually ran (``coalesced_requests_total`` leaders, or the
+number of requests when coalescing is off). Errors are mostly requests that
+timed out waiting for a pooled connection behind the duplicated work.
+
+    python -m benchmarks.bench_coalescing --rounds 20 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from benchmarks.bench_async_load import wait_ready
+
+ENDPOINTS = [
+    "/api/v1/bi/funnel/stages",
+    "/api/v1/bi/funnel/dwell",
+    "/api/v1/customer/summary",
+]
+STAGES = 8
+
+
+def seed(database_url, deals=100_000, customers=20_000, seed_value=7):
+    os.environ["DATABASE_URL"] = database_url
+    from app.core.database import Base
+    from app import models
+
+    rng = random.Random(seed_value)
+    start = datetime(2023, 1, 1)
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.DimEstagio), [
+            {"id": i, "estagio_nome": f"Stage {i}", "ordem": i} for i in range(1, STAGES + 1)
+        ])
+        conn.execute(insert(models.FatoOportunidades), [
+            {"id": i, "stage_id": rng.randrange(1, STAGES + 1), "valor": rng.uniform(100, 10_000),
+             "data_criacao": start + timedelta(minutes=rng.randrange(365 * 24 * 60))}
+            for i in range(1, deals + 1)
+        ])
+        conn.execute(insert(models.FatoMovimentacoes), [
+            {"deal_id": rng.randrange(1, deals + 1), "out_stage_id": stage, "in_stage_id": stage + 1,
+             "data_entrada": start + timedelta(minutes=rng.randrange(365 * 24 * 60)),
+             "data_saida": start + timedelta(minutes=rng.randrange(365 * 24 * 60))}
+            for stage in (rng.randrange(1, STAGES) for _ in range(deals * 2))
+        ])
+        conn.execute(insert(models.Customer), [
+            {"id": str(i), "name": f"Customer {i}", "status": rng.choice(("Active", "At Risk", "Inactive", "New")),
+             "total_spent": rng.uniform(0, 5_000), "total_transactions": rng.randrange(30)}
+            for i in range(customers)
+        ])
+    engine.dispose()
+
+
+async def burst(client, path, concurrency):
+    async def one():
+        started = time.perf_counter()
+        response = await client.get(path)
+        return time.perf_counter() - started, response.status_code == 200
+
+    return await asyncio.gather(*(one() for _ in range(concurrency)))
+
+
+async def hammer(base_url, rounds, concurrency):
+    limits = httpx.Limits(max_connections=concurrency * len(ENDPOINTS))
+    latencies, errors = [], 0
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for results in await asyncio.gather(*(burst(client, path, concurrency) for path in ENDPOINTS)):
+                latencies.extend(latency for latency, _ in results)
+                errors += sum(1 for _, ok in results if not ok)
+        elapsed = time.perf_counter() - started
+        metrics = (await client.get("/metrics")).text
+    leaders = sum(
+        float(value) for value in re.findall(r'coalesced_requests_total\{[^}]*role="leader"\} (\S+)', metrics)
+    )
+    return len(latencies) / elapsed, latencies, errors, int(leaders)
+
+
+def run_mode(database_url, coalescing, port, rounds, concurrency):
+    env = dict(
+        os.environ, DATABASE_URL=database_url, COALESCE_REQUESTS=str(coalescing).lower(),
+        SUMMARY_CACHE_TTL_SECONDS="0", DATA_LOAD_ON_STARTUP="false",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--timeout-keep-alive", "120"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        return asyncio.run(hammer(base_url, rounds, concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--deals", type=int, default=100_000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    seed(database_url, deals=args.deals)
+    total = args.rounds * args.concurrency * len(ENDPOINTS)
+    print(f"{args.rounds} rounds x {args.concurrency} concurrent identical requests x {len(ENDPOINTS)} endpoints")
+    print(f"{'mode':>12} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7} {'computations':>13}")
+    for coalescing in (False, True):
+        rps, latencies, errors, leaders = run_mode(database_url, coalescing, args.port, args.rounds, args.concurrency)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        computations = leaders if coalescing else total
+        print(f"{'coalesced' if coalescing else 'independent':>12} {rps:9.1f} "
+              f"{statistics.median(latencies) * 1000:9.1f} {p95 * 1000:9.1f} {errors:>7} {computations:>13}")
+
+
+if __name__ == "__main__":
+    main()
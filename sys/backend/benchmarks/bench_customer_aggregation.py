@@ -0,0 +1,82 @@
+"""Benchmark the customer unification stage of the startup loader.
+
+Compares the previous per-customer boolean-mask loop with the grouped
+``aggregate_customers`` implementation for growing cash-flow sheets.
+
+    python -m benchmarks.bench_customer_aggregation
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.services.customer_data_service import aggregate_customers
+
+SIZES = [1_000, 10_000, 50_000, 100_000, 500_000]
+# The legacy loop is O(customers x transactions); past this size it takes minutes.
+LEGACY_MAX_ROWS = 50_000
+
+def make_frames(n_transactions, seed=0):
+    rng = np.random.default_rng(seed)
+    n_customers = max(n_transactions // 10, 1)
+    ids = rng.integers(1, n_customers + 1, size=n_transactions).astype(str)
+    transactions_df = pd.DataFrame({
+        'Código': ids,
+        'Valor Total': rng.uniform(10, 500, size=n_transactions).round(2),
+        'Data (Recibo)': pd.Timestamp('2024-01-01') + pd.to_timedelta(
+            rng.integers(0, 365, size=n_transactions), unit='D'
+        ),
+    })
+    customers_master = pd.DataFrame({
+        'customer_id': np.arange(1, n_customers + 1).astype(str),
+        'name': [f'Customer {i}' for i in range(1, n_customers + 1)],
+    })
+    sales_df = pd.DataFrame({'Código': rng.integers(1, n_customers * 2, size=n_customers // 5 + 1).astype(str)})
+    return customers_master, transactions_df, sales_df
+
+def legacy_aggregate(customers_master, transactions_df, sales_df, now):
+    all_customer_ids = set(customers_master['customer_id'].unique()) \
+        .union(set(transactions_df['Código'].unique())) \
+        .union(set(sales_df['Código'].unique()))
+    rows = []
+    for customer_id in all_customer_ids:
+        customer_info = customers_master[customers_master['customer_id'] == customer_id]
+        customer_tx = transactions_df[transactions_df['Código'] == customer_id]
+        last_transaction = customer_tx['Data (Recibo)'].max() if not customer_tx.empty else None
+        activity_status = "New"
+        if last_transaction:
+            days_since_last = (now - last_transaction).days
+            if days_since_last < 30: activity_status = "Active"
+            elif days_since_last < 90: activity_status = "At Risk"
+            else: activity_status = "Inactive"
+        rows.append({
+            'id': customer_id,
+            'name': customer_info['name'].values[0] if not customer_info.empty else "Unknown Customer",
+            'status': activity_status,
+            'total_spent': float(customer_tx['Valor Total'].sum()),
+            'total_transactions': len(customer_tx),
+            'last_transaction_date': last_transaction,
+        })
+    return rows
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    now = datetime(2025, 1, 1)
+    print(f"{'rows':>10} {'customers':>10} {'grouped (s)':>12} {'legacy (s)':>12} {'speedup':>9}")
+    for n in SIZES:
+        frames = make_frames(n)
+        grouped_time, customers = timed(aggregate_customers, *frames, now)
+        if n <= LEGACY_MAX_ROWS:
+            legacy_time, _ = timed(legacy_aggregate, *frames, now)
+            legacy, speedup = f"{legacy_time:12.3f}", f"{legacy_time / grouped_time:8.1f}x"
+        else:
+            legacy, speedup = f"{'skipped':>12}", f"{'-':>9}"
+        print(f"{n:>10} {len(customers):>10} {grouped_time:12.3f} {legacy} {speedup}")
+
+if __name__ == "__main__":
+    main()
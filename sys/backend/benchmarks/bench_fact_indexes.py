@@ -0,0 +1,165 @@
+"""Query plans and timings for the fact-table access paths, with and without composite indexes.
+
+Seeds ``fato_oportunidades``, ``fato_movimentacoes`` and ``fato_financeiro``
+with ``--rows`` rows each (one million by default) in a temporary SQLite
+file, drops the composite indexes added by migration 3b9d4c7e2a10, and runs
+every query in ``QUERIES`` before and after creating them again. For each
+query it prints the ``EXPLAIN QUERY PLAN`` detail and the median runtime, so
+a scan turning into an index search shows up side by side.
+
+    python -m benchmarks.bench_fact_indexes --rows 1000000 --repeat 5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from app.core.database import Base
+from app import models
+
+FACT_MODELS = (models.FatoOportunidades, models.FatoMovimentacoes, models.FatoFinanceiro)
+START = datetime(2022, 1, 1)
+SPAN_DAYS = 3 * 365
+STAGES = 8
+SEED_BATCH = 50_000
+
+# name -> (sql, params). The SQL mirrors what crud_funnel and the rollups emit.
+QUERIES = {
+    "deals by stage in a month": (
+        "SELECT stage_id, count(*), sum(valor) FROM fato_oportunidades "
+        "WHERE data_criacao >= ? AND data_criacao < ? GROUP BY stage_id",
+        ("2023-03-01 00:00:00.000000", "2023-04-01 00:00:00.000000"),
+    ),
+    "one stage in a quarter": (
+        "SELECT count(*), sum(valor) FROM fato_oportunidades "
+        "WHERE stage_id = ? AND data_criacao >= ? AND data_criacao < ?",
+        (3, "2023-01-01 00:00:00.000000", "2023-04-01 00:00:00.000000"),
+    ),
+    "deal timeline": (
+        "SELECT in_stage_id, data_entrada FROM fato_movimentacoes "
+        "WHERE deal_id = ? ORDER BY data_entrada",
+        (4242,),
+    ),
+    "deal moves in a month": (
+        "SELECT count(*) FROM fato_movimentacoes "
+        "WHERE deal_id BETWEEN ? AND ? AND data_entrada >= ? AND data_entrada < ?",
+        (1000, 2000, "2023-03-01 00:00:00.000000", "2023-04-01 00:00:00.000000"),
+    ),
+    "successful income in a month": (
+        "SELECT sum(valor) FROM fato_financeiro "
+        "WHERE tipo = ? AND status = ? AND data >= ? AND data < ?",
+        ("entrada", "sucesso", "2023-03-01 00:00:00.000000", "2023-04-01 00:00:00.000000"),
+    ),
+    "cash flow by type in a week": (
+        "SELECT tipo, status, count(*), sum(valor) FROM fato_financeiro "
+        "WHERE data >= ? AND data < ? GROUP BY tipo, status",
+        ("2023-03-01 00:00:00.000000", "2023-03-08 00:00:00.000000"),
+    ),
+}
+
+
+def composite_indexes():
+    return [
+        index
+        for model in FACT_MODELS
+        for index in model.__table__.indexes
+        if len(index.columns) > 1
+    ]
+
+
+def _timestamp(rng):
+    return (START + timedelta(seconds=rng.randrange(SPAN_DAYS * 86400))).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _batches(rows, make_row):
+    batch = []
+    for i in range(1, rows + 1):
+        batch.append(make_row(i))
+        if len(batch) == SEED_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(engine, rows, seed_value=7):
+    rng = random.Random(seed_value)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for index in composite_indexes():
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+        for batch in _batches(rows, lambda i: (i, _timestamp(rng), rng.randrange(1, STAGES + 1), rng.uniform(100, 10_000))):
+            conn.exec_driver_sql(
+                "INSERT INTO fato_oportunidades (id, data_criacao, stage_id, valor) VALUES (?, ?, ?, ?)", batch,
+            )
+        for batch in _batches(rows, lambda i: (
+            i, rng.randrange(1, rows // 4 + 2), rng.randrange(1, STAGES + 1), _timestamp(rng),
+        )):
+            conn.exec_driver_sql(
+                "INSERT INTO fato_movimentacoes (id, deal_id, in_stage_id, data_entrada) VALUES (?, ?, ?, ?)", batch,
+            )
+        for batch in _batches(rows, lambda i: (
+            i, _timestamp(rng), rng.uniform(10, 1_000), rng.choice(("entrada", "saida")),
+            rng.choice(("sucesso", "sucesso", "sucesso", "falha")),
+        )):
+            conn.exec_driver_sql(
+                "INSERT INTO fato_financeiro (id, data, valor, tipo, status) VALUES (?, ?, ?, ?, ?)", batch,
+            )
+
+
+def create_indexes(engine):
+    with engine.begin() as conn:
+        for index in composite_indexes():
+            index.create(conn, checkfirst=True)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def explain(conn, sql, params):
+    return "; ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def measure(engine, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.exec_driver_sql(sql, params).fetchall()
+                timings.append(time.perf_counter() - start)
+            results[name] = (explain(conn, sql, params), statistics.median(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'facts.db')}")
+        started = time.perf_counter()
+        seed(engine, args.rows)
+        print(f"seeded {args.rows:,} rows per fact table in {time.perf_counter() - started:.1f}s")
+
+        before = measure(engine, args.repeat)
+        create_indexes(engine)
+        after = measure(engine, args.repeat)
+        engine.dispose()
+
+    for name in QUERIES:
+        (plan_before, t_before), (plan_after, t_after) = before[name], after[name]
+        print(f"\n{name}")
+        print(f"  without indexes {t_before * 1000:9.2f} ms  {plan_before}")
+        print(f"  with indexes    {t_after * 1000:9.2f} ms  {plan_after}")
+        print(f"  speedup         {t_before / t_after:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Time to serve 10k-row list pages with the regular and the fast JSON path.
+
+Seeds a temporary SQLite database with ``--rows`` transactions and work logs,
+then requests one page of ``--rows`` items from ``read_transactions`` and
+``read_work_logs`` through the ASGI app, first with FAST_JSON_RESPONSES off
+(ORM rows validated and encoded per field by FastAPI) and then with it on
+(row tuples, one TypeAdapter call and orjson). Both paths must return the
+same JSON. The median of ``--repeat`` requests is reported.
+
+    python -m benchmarks.bench_fast_json --rows 10000 --repeat 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ENDPOINTS = {
+    "read_transactions": "/api/v1/sales/transactions/",
+    "read_work_logs": "/api/v1/productivity/work_logs/",
+}
+
+
+def seed(engine, rows):
+    from sqlalchemy import insert
+    from app import models
+
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Transaction), [
+            {"item": f"item {i}", "category": "membership", "quantity": 1 + i % 3, "unit_value": 99.9,
+             "total_value": 99.9 * (1 + i % 3), "payment_method": "pix",
+             "date": start + timedelta(minutes=i), "customer_id": i % 500}
+            for i in range(rows)
+        ])
+        conn.execute(insert(models.WorkLog), [
+            {"teacher_id": i % 50, "check_in": start + timedelta(hours=i),
+             "check_out": start + timedelta(hours=i, minutes=50)}
+            for i in range(rows)
+        ])
+
+
+def measure(client, path, rows, repeat):
+    timings, body = [], None
+    for _ in range(repeat + 1):  # the first request warms up caches and compiled statements
+        started = time.perf_counter()
+        response = client.get(path, params={"limit": rows})
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+        body = response.content
+    return statistics.median(timings[1:]), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    import json
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+    from app.core.database import engine
+    from app.main import app
+
+    seed(engine, args.rows)
+    client = TestClient(app)
+    print(f"{'endpoint':>18} {'regular ms':>11} {'fast ms':>9} {'speedup':>8} {'KiB':>7}")
+    for name, path in ENDPOINTS.items():
+        settings.FAST_JSON_RESPONSES = False
+        regular, expected = measure(client, path, args.rows, args.repeat)
+        settings.FAST_JSON_RESPONSES = True
+        fast, body = measure(client, path, args.rows, args.repeat)
+        assert json.loads(body) == json.loads(expected), f"{name}: fast path returned different JSON"
+        print(f"{name:>18} {regular * 1000:11.1f} {fast * 1000:9.1f} {regular / fast:7.1f}x {len(body) / 1024:7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Concurrent read/write throughput on SQLite with and without performance mode.
+
+Runs reader and writer threads against the same database file, first with a
+default engine (rollback journal, no busy timeout) and then with the pooled
+engine and WAL pragmas from app.core.database.
+
+    python -m benchmarks.bench_sqlite_concurrency --seconds 5 --readers 8 --writers 2
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import Base, configure_sqlite, engine_options, sqlite_pragmas
+from app import models
+
+def make_engine(url, performance_mode):
+    if not performance_mode:
+        return create_engine(url)
+    engine = create_engine(url, **engine_options(url))
+    configure_sqlite(engine, sqlite_pragmas())
+    return engine
+
+def seed(engine, rows=20_000):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Transaction), [
+            {"item": "plan", "category": "membership", "quantity": 1, "unit_value": 99.0,
+             "total_value": 99.0, "payment_method": "pix", "date": datetime(2024, 1, 1), "customer_id": i % 500}
+            for i in range(rows)
+        ])
+
+def run(engine, seconds, readers, writers):
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        select(func.count(), func.sum(models.Transaction.total_value))
+                        .where(models.Transaction.customer_id == 42)
+                    ).one()
+                bump("reads")
+            except OperationalError:
+                bump("errors")
+
+    def writer():
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(models.Transaction).values(
+                        item="plan", category="membership", quantity=1, unit_value=99.0,
+                        total_value=99.0, payment_method="pix", date=datetime.now(), customer_id=42,
+                    ))
+                bump("writes")
+            except OperationalError:
+                bump("errors")
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {k: v / seconds if k != "errors" else v for k, v in counts.items()}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'mode':>12} {'reads/s':>10} {'writes/s':>10} {'errors':>8}")
+    for performance_mode in (False, True):
+        url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+        engine = make_engine(url, performance_mode)
+        seed(engine)
+        result = run(engine, args.seconds, args.readers, args.writers)
+        engine.dispose()
+        label = "performance" if performance_mode else "default"
+        print(f"{label:>12} {result['reads']:10.1f} {result['writes']:10.1f} {result['errors']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Teacher utilization over a million work logs.
+
+Seeds a temporary SQLite database with ``--work-logs`` work logs (one million
+by default) and a quarter as many schedule entries, spread over ``--teachers``
+teachers and one year. It then times ``utilization.utilization`` for the whole
+year, split into the two reads (SQL plus array building) and the sort-and-sweep. Finally it runs the
+sweep alone on in-memory arrays of growing size to show the O(n log n) scaling.
+
+    python -m benchmarks.bench_utilization --work-logs 1000000 --teachers 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.core.database import Base
+from app.crud import utilization
+
+START = datetime(2024, 1, 1)
+SPAN_HOURS = 365 * 24
+SEED_BATCH = 50_000
+
+
+def _timestamp(moment):
+    return moment.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def seed(engine, work_logs, teachers, seed_value=7):
+    rng = random.Random(seed_value)
+    Base.metadata.create_all(engine)
+
+    def shifts(n, max_hours):
+        for _ in range(n):
+            start = START + timedelta(minutes=rng.randrange(SPAN_HOURS * 60))
+            yield rng.randrange(1, teachers + 1), start, start + timedelta(minutes=rng.randrange(30, max_hours * 60))
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO teachers (id, name, type, contracted_hours) VALUES (?, ?, ?, ?)",
+            [(i, f"Teacher {i}", "Titular", rng.choice((10, 20, 30, 40))) for i in range(1, teachers + 1)],
+        )
+        batch = []
+        for teacher, check_in, check_out in shifts(work_logs, 6):
+            batch.append((teacher, _timestamp(check_in), _timestamp(check_out)))
+            if len(batch) == SEED_BATCH:
+                conn.exec_driver_sql("INSERT INTO work_logs (teacher_id, check_in, check_out) VALUES (?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.exec_driver_sql("INSERT INTO work_logs (teacher_id, check_in, check_out) VALUES (?, ?, ?)", batch)
+        conn.exec_driver_sql(
+            "INSERT INTO schedule_entries (teacher_id, start_time, end_time, day, class_type) VALUES (?, ?, ?, ?, ?)",
+            [(teacher, _timestamp(s), _timestamp(e), s.weekday(), "Escalada")
+             for teacher, s, e in shifts(work_logs // 4, 2)],
+        )
+
+
+def time_sweep(n, teachers, rng):
+    def arrays(count):
+        starts = rng.uniform(0, SPAN_HOURS * 3600, count)
+        return rng.integers(1, teachers + 1, count), starts, starts + rng.uniform(1800, 6 * 3600, count)
+
+    worked, scheduled = arrays(n), arrays(n // 4)
+    started = time.perf_counter()
+    utilization.sweep(worked, scheduled)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--work-logs", type=int, default=1_000_000)
+    parser.add_argument("--teachers", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'utilization.db')}")
+        started = time.perf_counter()
+        seed(engine, args.work_logs, args.teachers)
+        print(f"seeded {args.work_logs:,} work logs, {args.work_logs // 4:,} schedule entries, "
+              f"{args.teachers} teachers in {time.perf_counter() - started:.1f}s")
+
+        start, end = START, START + timedelta(days=365)
+        with sessionmaker(bind=engine)() as db:
+            phases = {}
+            original_intervals, original_sweep = utilization._intervals, utilization.sweep
+
+            def timed(name, fn):
+                def wrapper(*a, **kw):
+                    t = time.perf_counter()
+                    try:
+                        return fn(*a, **kw)
+                    finally:
+                        phases[name] = phases.get(name, 0.0) + time.perf_counter() - t
+                return wrapper
+
+            utilization._intervals, utilization.sweep = timed("reads", original_intervals), timed("sweep", original_sweep)
+            try:
+                started = time.perf_counter()
+                rows = utilization.utilization(db, start=start, end=end, now=end)
+                total = time.perf_counter() - started
+            finally:
+                utilization._intervals, utilization.sweep = original_intervals, original_sweep
+        engine.dispose()
+
+    print(f"\nutilization for {len(rows)} teachers over one year: {total * 1000:.0f} ms")
+    for name, seconds in phases.items():
+        print(f"  {name:<10} {seconds * 1000:8.0f} ms")
+    print(f"  {'other':<10} {(total - sum(phases.values())) * 1000:8.0f} ms")
+
+    print("\nsweep alone (work logs + a quarter as many schedule entries)")
+    rng = np.random.default_rng(7)
+    for n in (10_000, 100_000, 1_000_000, 2_000_000):
+        seconds = time_sweep(n, args.teachers, rng)
+        print(f"  {n:>9,} work logs {seconds * 1000:8.1f} ms  {seconds / n * 1e9:6.0f} ns/log")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Export the BI star schema (dim_* and fato_* tables) as Parquet or Arrow IPC files.
+
+    python export_columnar.py --format parquet --out ../exports
+    python export_columnar.py --format arrow fato_financeiro dim_usuario
+"""
+import argparse
+import os
+import time
+
+from app.core.database import SessionLocal
+from app.schemas.enums import ColumnarFormat
+from app.services import columnar_export
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tables", nargs="*", choices=[[]] + list(columnar_export.BI_TABLES), metavar="table",
+                        help="tables to export (default: all dim_* and fato_* tables)")
+    parser.add_argument("--format", type=ColumnarFormat, choices=list(ColumnarFormat), default=ColumnarFormat.parquet)
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--batch-size", type=int, default=columnar_export.BATCH_SIZE)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for table_name in args.tables or list(columnar_export.BI_TABLES):
+        path = os.path.join(args.out, f"{table_name}.{columnar_export.FILE_EXTENSIONS[args.format]}")
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            rows = columnar_export.write_table(
+                db, columnar_export.BI_TABLES[table_name], path, args.format, args.batch_size
+            )
+        finally:
+            db.close()
+        print(f"{table_name}: {rows} rows -> {path} ({time.perf_counter() - start:.2f}s)")
+
+if __name__ == "__main__":
+    main()
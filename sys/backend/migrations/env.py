@@ -17,7 +17,7 @@ if config.config_file_name is not None:
 # add your model's MetaData object here
 # for 'autogenerate' support
 from app.core.database import Base
-from app.models import customer, sales, productivity, analytics
+from app.models import customer, sales, productivity, analytics, business_intelligence, kpi
 
 target_metadata = Base.metadata
 
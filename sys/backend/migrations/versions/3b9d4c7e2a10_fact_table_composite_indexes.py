@@ -0,0 +1,60 @@
+"""Composite and covering indexes for fact-table query patterns
+
+Revision ID: 3b9d4c7e2a10
+Revises: f5021e2291aa
+Create Date: 2026-10-18 09:00:00.000000
+
+The ``fato_*`` tables are created by ``Base.metadata.create_all`` at startup
+rather than by a migration, so each index is only created when its table
+exists and the index is not already there. Offline (``--sql``) runs cannot
+inspect the database and emit every statement.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d4c7e2a10'
+down_revision: Union[str, Sequence[str], None] = 'f5021e2291aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_fato_oportunidades_data_criacao_stage', 'fato_oportunidades', ['data_criacao', 'stage_id', 'valor']),
+    ('ix_fato_oportunidades_stage_data_criacao', 'fato_oportunidades', ['stage_id', 'data_criacao', 'valor']),
+    ('ix_fato_movimentacoes_deal_data_entrada', 'fato_movimentacoes', ['deal_id', 'data_entrada', 'in_stage_id']),
+    ('ix_fato_financeiro_data_tipo_status', 'fato_financeiro', ['data', 'tipo', 'status', 'valor']),
+    ('ix_fato_financeiro_tipo_status_data', 'fato_financeiro', ['tipo', 'status', 'data', 'valor']),
+]
+
+
+def _inspector():
+    return None if op.get_context().as_sql else sa.inspect(op.get_bind())
+
+
+def _existing_indexes(inspector, table):
+    if inspector is None:
+        return set()
+    if not inspector.has_table(table):
+        return None
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = _inspector()
+    for name, table, columns in INDEXES:
+        existing = _existing_indexes(inspector, table)
+        if existing is not None and name not in existing:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = _inspector()
+    for name, table, columns in reversed(INDEXES):
+        existing = _existing_indexes(inspector, table)
+        if inspector is None or (existing is not None and name in existing):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,54 @@
+"""(date, id) indexes for keyset pagination of transactions and activities
+
+Revision ID: c7a2e5d8f140
+Revises: 8e4f1a6c9b23
+Create Date: 2026-10-18 15:00:00.000000
+
+The transactions and activities lists page on ``(date, id)``. Without a
+matching index every page sorts the whole table. ``Base.metadata.create_all``
+at startup may already have created these indexes, so each one is only
+created when it is not there yet. Offline (``--sql``) runs cannot inspect the
+database and emit every statement.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a2e5d8f140'
+down_revision: Union[str, Sequence[str], None] = '8e4f1a6c9b23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_transactions_date_id', 'transactions', ['date', 'id']),
+    ('ix_activities_date_id', 'activities', ['date', 'id']),
+]
+
+
+def _existing_indexes():
+    if op.get_context().as_sql:
+        return None
+    inspector = sa.inspect(op.get_bind())
+    return {
+        table: {index['name'] for index in inspector.get_indexes(table)}
+        for table in {table for _, table, _ in INDEXES}
+    }
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = _existing_indexes()
+    for name, table, columns in INDEXES:
+        if existing is None or name not in existing[table]:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    existing = _existing_indexes()
+    for name, table, columns in reversed(INDEXES):
+        if existing is None or name in existing[table]:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,25 @@
+"""Rebuild the kpi_* summary tables from the transaction, activity and sales funnel tables.
+
+    python rebuild_kpis.py
+"""
+import argparse
+import time
+
+from app.core.database import Base, SessionLocal, engine
+from app.crud import crud_kpi
+
+def main():
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = crud_kpi.rebuild(db)
+    finally:
+        db.close()
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
+    print(f"rebuilt in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,29 @@
 import sys
 import os
+import tempfile
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+_tmp = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(_tmp, "test.db"))
+os.environ.setdefault("DATA_LOAD_LOCK_PATH", os.path.join(_tmp, "data_load.lock"))
+os.environ.setdefault("DATA_LOAD_STATUS_PATH", os.path.join(_tmp, "data_load_status.json"))
+os.environ.setdefault("TABLE_VERSIONS_PATH", os.path.join(_tmp, "table_versions.bin"))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models  # registers every table on Base.metadata
+from app.core.database import Base
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A session on a fresh SQLite file with every table, for tests that need a database of their own."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.api import admission_groups
+from app.core import admission
+from app.main import app
+
+
+def _app(group):
+    test_app = FastAPI()
+    release = asyncio.Event()
+
+    @test_app.get("/api/heavy/{name}")
+    async def heavy(name: str):
+        await release.wait()
+        return {"name": name}
+
+    @test_app.get("/api/cheap")
+    async def cheap():
+        return {"ok": True}
+
+    test_app.add_middleware(admission.AdmissionMiddleware, groups=[group], prefix="/api")
+    return test_app, release
+
+
+def test_requests_beyond_the_queue_are_shed_with_retry_after():
+    group = admission.RouteGroup("test_shed", ["/heavy/{name}"], max_concurrent=2, max_queue=1, retry_after=7)
+    test_app, release = _app(group)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=test_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            running = [asyncio.create_task(client.get(f"/api/heavy/{i}")) for i in range(3)]
+            await asyncio.sleep(0.05)
+            assert group.waiting == 1
+
+            shed = await client.get("/api/heavy/4")
+            assert shed.status_code == 503
+            assert shed.headers["retry-after"] == "7"
+            # Routes outside the group are not held up.
+            assert (await client.get("/api/cheap")).status_code == 200
+
+            release.set()
+            responses = await asyncio.gather(*running)
+            return [response.status_code for response in responses]
+
+    assert asyncio.run(scenario()) == [200, 200, 200]
+    assert admission.REJECTIONS.labels("test_shed", "queue_full").value == 1
+    assert admission.QUEUED.labels("test_shed").value == 0
+    assert admission.IN_FLIGHT.labels("test_shed").value == 0
+
+
+def test_queued_requests_time_out():
+    group = admission.RouteGroup("test_timeout", ["/heavy/{name}"], max_concurrent=1, max_queue=5, queue_timeout=0.05)
+    test_app, release = _app(group)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=test_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            running = asyncio.create_task(client.get("/api/heavy/1"))
+            await asyncio.sleep(0.02)
+            timed_out = await client.get("/api/heavy/2")
+            release.set()
+            return timed_out.status_code, (await running).status_code
+
+    assert asyncio.run(scenario()) == (503, 200)
+    assert admission.REJECTIONS.labels("test_timeout", "timeout").value == 1
+
+
+def test_declared_groups_name_existing_routes():
+    paths = {route.path for route in app.routes}
+    for group in admission_groups:
+        for route in group.routes:
+            assert f"/api/v1{route}" in paths, route
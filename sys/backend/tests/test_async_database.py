@@ -0,0 +1,63 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base, get_async_database_url
+from app.crud.aio import crud_customer
+from app.schemas import customer as schemas
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASYNC_ENGINE_CHECK = """
+import asyncio
+from sqlalchemy import text
+from app.core import database
+
+async def check():
+    async with database.AsyncSessionLocal() as db:
+        assert (await db.execute(text("SELECT 1"))).scalar() == 1
+    await database.async_engine.dispose()
+
+print(type(database.async_engine.pool).__name__)
+asyncio.run(check())
+"""
+
+def test_async_database_url_swaps_driver():
+    assert get_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert get_async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    with pytest.raises(ValueError):
+        get_async_database_url("mysql://u:p@db/app")
+
+def test_async_crud_roundtrip(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as db:
+            await crud_customer.upsert_customers(db, [
+                schemas.CustomerCreate(id=str(i), name=f"C{i}", status="Active", total_spent=1, total_transactions=1)
+                for i in range(3)
+            ])
+            first, cursor = await crud_customer.get_customers(db, limit=2)
+            rest, end = await crud_customer.get_customers(db, cursor=cursor, limit=2)
+            summary = await crud_customer.get_summary(db)
+        await engine.dispose()
+        return first, rest, end, summary
+
+    first, rest, end, summary = asyncio.run(run())
+    assert [c.id for c in first + rest] == ["0", "1", "2"]
+    assert end is None
+    assert summary["total_customers"] == 3
+
+def test_async_engine_starts_on_a_sqlite_file(tmp_path):
+    # Settings are read at import time, so the module is imported in a fresh interpreter.
+    env = {**os.environ, "DATABASE_ASYNC": "true", "DATABASE_URL": f"sqlite:///{tmp_path / 'async.db'}"}
+    result = subprocess.run(
+        [sys.executable, "-c", ASYNC_ENGINE_CHECK], cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "AsyncAdaptedQueuePool"
@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.core.file_lock import FileLock
+from app.core.jobs import BackgroundJob
+from app.main import app
+
+client = TestClient(app)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRY_LOCK = "import sys; from app.core.file_lock import FileLock; sys.exit(0 if FileLock(sys.argv[1]).acquire(blocking=False) else 1)"
+
+
+def _try_lock_in_subprocess(path):
+    return subprocess.run([sys.executable, "-c", TRY_LOCK, str(path)], cwd=BACKEND_DIR).returncode == 0
+
+
+def test_file_lock_excludes_other_processes(tmp_path):
+    path = tmp_path / "job.lock"
+    lock = FileLock(str(path))
+    assert lock.acquire(blocking=False)
+    assert not _try_lock_in_subprocess(path)
+    lock.release()
+    assert _try_lock_in_subprocess(path)
+
+
+def _jobs(tmp_path, target):
+    paths = dict(lock_path=str(tmp_path / "job.lock"), status_path=str(tmp_path / "status.json"))
+    return BackgroundJob("test", target, **paths), BackgroundJob("test", target, **paths)
+
+
+def test_only_the_lock_holder_runs_and_every_worker_sees_progress(tmp_path):
+    reached, release = threading.Event(), threading.Event()
+    runs = []
+
+    def target(report):
+        runs.append(1)
+        report("halfway", 0.5)
+        reached.set()
+        release.wait(5)
+        return {"rows": 3}
+
+    leader, follower = _jobs(tmp_path, target)
+    assert leader.start()
+    assert not follower.start()
+    assert reached.wait(5)
+
+    for job in (leader, follower):
+        status = job.status()
+        assert (status["state"], status["stage"], status["progress"]) == ("running", "halfway", 0.5)
+    assert leader.status()["leader"] and not follower.status()["leader"]
+
+    release.set()
+    leader.join(5)
+    status = follower.status()
+    assert (status["state"], status["progress"], status["result"]) == ("succeeded", 1.0, {"rows": 3})
+    assert status["finished_at"] is not None
+    assert runs == [1]
+    leader.lock.release()
+
+
+def test_failed_job_records_error(tmp_path):
+    def target(report):
+        raise RuntimeError("sheet is corrupt")
+
+    job, _ = _jobs(tmp_path, target)
+    job.start()
+    job.join(5)
+    status = job.status()
+    assert (status["state"], status["error"]) == ("failed", "sheet is corrupt")
+    job.lock.release()
+
+
+def test_a_succeeded_job_is_not_rerun_by_later_workers(tmp_path):
+    runs = []
+
+    def target(report):
+        runs.append(1)
+        return {"rows": len(runs)}
+
+    first, recycled = _jobs(tmp_path, target)
+    assert first.start()
+    first.join(5)
+    first.lock.release()  # the worker exits
+
+    assert not recycled.start()
+    assert not recycled.lock.held
+    assert (recycled.status()["state"], runs) == ("succeeded", [1])
+
+    assert recycled.start(force=True)
+    recycled.join(5)
+    assert (recycled.status()["result"], runs) == ({"rows": 2}, [1, 1])
+    recycled.lock.release()
+
+
+def test_running_status_without_a_lock_holder_is_reported_as_failed(tmp_path):
+    release = threading.Event()
+    leader, follower = _jobs(tmp_path, lambda report: release.wait(5))
+    assert leader.start()
+    assert follower.status()["state"] == "running"
+
+    # The leader dies mid-run: the OS drops its lock, its status file still says running.
+    leader.lock.release()
+    status = follower.status()
+    assert (status["state"], status["error"]) == ("failed", f"worker {os.getpid()} exited before finishing")
+    assert status["finished_at"] is not None
+    assert not status["leader"] and not follower.lock.held
+    assert BackgroundJob("test", None, str(tmp_path / "job.lock"), str(tmp_path / "status.json")).status()["state"] == "failed"
+
+    # The next worker to start takes the job over.
+    assert follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    follower.lock.release()
+
+
+def test_customer_status_reports_data_load():
+    response = client.get("/api/v1/customer/status")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["data_load"]["job"] == "customer_data_load"
+    assert body["data_load"]["state"] in ("pending", "running", "succeeded", "failed")
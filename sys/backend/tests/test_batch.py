@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import models
+from app.core.cache import LRUCache
+from app.core.database import SessionLocal, engine
+from app.crud import crud_bi
+from app.main import app
+from app.schemas.batch import BATCH_MAX_IDS
+
+client = TestClient(app)
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+def _dimension_selects(path, ids):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.post(path, json={"ids": ids})
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200, response.text
+    return response.json(), statements
+
+def test_dimension_batch_uses_one_in_query_then_the_cache():
+    crud_bi.dimension_row_cache.clear()
+    with SessionLocal() as db:
+        empresa = models.DimEmpresa(nome_empresa="Batch Co", segmento="retail")
+        db.add(empresa)
+        db.flush()
+        pessoas = [models.DimPessoa(nome=f"Batch person {i}", empresa_id=empresa.id) for i in range(5)]
+        db.add_all(pessoas)
+        db.commit()
+        ids = [p.id for p in pessoas]
+
+    requested = [ids[3], ids[0], 999_999, ids[3], ids[1]]
+    body, selects = _dimension_selects("/api/v1/bi/pessoas/batch", requested)
+    assert [item["id"] for item in body["items"]] == [ids[3], ids[0], ids[1]]
+    assert body["items"][0]["nome"] == "Batch person 3"
+    assert body["missing"] == [999_999]
+    assert len(selects) == 1 and " IN " in selects[0].upper()
+
+    body, selects = _dimension_selects("/api/v1/bi/pessoas/batch", [ids[0], ids[1]])
+    assert len(body["items"]) == 2
+    assert selects == []
+
+def test_dimension_batch_validation():
+    assert client.post("/api/v1/bi/unknown/batch", json={"ids": [1]}).status_code == 422
+    assert client.post("/api/v1/bi/empresas/batch", json={"ids": list(range(BATCH_MAX_IDS + 1))}).status_code == 422
+
+def test_customers_batch():
+    client.post("/api/v1/customers/bulk", json=[
+        {"id": f"batch-{i}", "name": f"Batch {i}", "status": "Active", "total_spent": i, "total_transactions": 1}
+        for i in range(3)
+    ])
+    body, selects = _dimension_selects("/api/v1/customers/batch", ["batch-2", "nope", "batch-0"])
+    assert [c["id"] for c in body["items"]] == ["batch-2", "batch-0"]
+    assert body["missing"] == ["nope"]
+    assert len(selects) == 1
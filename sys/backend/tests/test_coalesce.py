@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+from fastapi import Depends
+
+from app.api.coalesce import REQUESTS, coalesce
+
+
+def _dependency():
+    return object()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    calls, release = [], threading.Event()
+
+    @coalesce()
+    def endpoint(start: str, group_by: list = None, db=Depends(_dependency)):
+        calls.append(start)
+        release.wait(5)
+        return {"start": start, "rows": [1, 2]}
+
+    name = f"{endpoint.__module__}.{endpoint.__qualname__}"
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(endpoint(start="2024", group_by=["a"], db=object())))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: REQUESTS.labels(name, "follower").value == 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ["2024"]
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert REQUESTS.labels(name, "leader").value == 1
+
+    # Once finished, nothing is kept without a ttl; other parameters never share.
+    endpoint(start="2024", group_by=["a"], db=object())
+    endpoint(start="2025", group_by=["a"], db=object())
+    assert calls == ["2024", "2024", "2025"]
+
+
+def test_followers_receive_the_leaders_exception():
+    release = threading.Event()
+
+    @coalesce()
+    def endpoint(value: int):
+        release.wait(5)
+        raise ValueError("bad range")
+
+    name = f"{endpoint.__module__}.{endpoint.__qualname__}"
+    errors = []
+
+    def call():
+        try:
+            endpoint(value=1)
+        except ValueError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: REQUESTS.labels(name, "follower").value == 2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert errors == ["bad range"] * 3
+
+
+def test_ttl_reuses_finished_result():
+    calls = []
+
+    @coalesce(ttl=60)
+    def endpoint(value: int):
+        calls.append(value)
+        return value * 2
+
+    assert [endpoint(value=2), endpoint(value=2), endpoint(value=3)] == [4, 4, 6]
+    assert calls == [2, 3]
+
+
+def test_async_calls_share_one_task():
+    calls = []
+
+    @coalesce()
+    async def endpoint(value: int, db=Depends(_dependency)):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return [value]
+
+    async def main():
+        return await asyncio.gather(*(endpoint(value=1, db=object()) for _ in range(10)), endpoint(value=2, db=None))
+
+    results = asyncio.run(main())
+    assert sorted(calls) == [1, 2]
+    assert all(result is results[0] for result in results[:10]) and results[10] == [2]
+
+
+def test_async_exception_reaches_every_caller():
+    @coalesce()
+    async def endpoint(value: int):
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(endpoint(value=1) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(main()))
+
+
+def test_cached_results_are_keyed_by_table_versions():
+    from app.crud import table_versions
+
+    calls = []
+
+    @coalesce(ttl=60, tables=("customers",))
+    def endpoint(value: int):
+        calls.append(value)
+        return {"value": value, "call": len(calls)}
+
+    assert endpoint(value=1) == endpoint(value=1) == {"value": 1, "call": 1}
+    table_versions.bump("customers")
+    assert endpoint(value=1) == {"value": 1, "call": 2}
@@ -0,0 +1,57 @@
+import io
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.business_intelligence import MetodoPagamentoEnum, StatusPagamentoEnum, TipoFinanceiroEnum
+from app.services import columnar_export
+
+client = TestClient(app)
+
+@pytest.fixture
+def seeded_financeiro():
+    # The endpoint opens its own SessionLocal, so the rows go into the shared
+    # test database and are removed again for the tests that run after.
+    db = SessionLocal()
+    rows = [
+        models.FatoFinanceiro(
+            data=datetime(2024, 6, 1), valor=10.0 * i, tipo=TipoFinanceiroEnum.saida,
+            metodo=MetodoPagamentoEnum.boleto if i % 2 else None, status=StatusPagamentoEnum.falha,
+        )
+        for i in range(7)
+    ]
+    db.add_all(rows)
+    db.commit()
+    ids = [row.id for row in rows]
+    yield db.query(models.FatoFinanceiro).count()
+    db.query(models.FatoFinanceiro).filter(models.FatoFinanceiro.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+def test_parquet_export_dictionary_encodes_enums(seeded_financeiro):
+    expected = seeded_financeiro
+    response = client.get("/api/v1/bi/columnar/fato_financeiro")
+    assert response.status_code == 200
+
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == expected
+    assert pa.types.is_dictionary(table.schema.field("metodo").type)
+    assert set(table.column("tipo").to_pylist()) <= {"entrada", "saida"}
+    assert None in table.column("metodo").to_pylist()
+
+def test_arrow_stream_export_matches_batches(seeded_financeiro):
+    expected = seeded_financeiro
+    response = client.get("/api/v1/bi/columnar/fato_financeiro", params={"format": "arrow"})
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == expected
+    assert table.schema == columnar_export.arrow_schema(models.FatoFinanceiro)
+
+def test_unknown_table_is_404():
+    assert client.get("/api/v1/bi/columnar/customers").status_code == 404
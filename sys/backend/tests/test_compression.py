@@ -0,0 +1,103 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.api import precompressed_routes, uncompressed_routes
+from app.core import compression
+from app.main import app
+
+PAYLOAD = [{"id": i, "name": f"row {i}", "status": "Active"} for i in range(200)]
+
+
+def _client():
+    test_app = FastAPI()
+
+    @test_app.get("/api/rows")
+    def rows():
+        return PAYLOAD
+
+    @test_app.get("/api/cached")
+    def cached():
+        return PAYLOAD
+
+    @test_app.get("/api/raw/{name}")
+    def raw(name: str):
+        return PAYLOAD
+
+    @test_app.get("/api/small")
+    def small():
+        return {"ok": True}
+
+    @test_app.get("/api/stream")
+    def stream():
+        return StreamingResponse((f"line {i}\n" for i in range(5_000)), media_type="text/csv")
+
+    @test_app.get("/api/binary")
+    def binary():
+        return PlainTextResponse("x" * 5_000, media_type="application/octet-stream")
+
+    test_app.add_middleware(
+        compression.CompressionMiddleware, minimum_size=500, prefix="/api",
+        exclude=["/raw/{name}"], cacheable=["/cached"],
+    )
+    return TestClient(test_app)
+
+
+def test_accepted_encoding():
+    assert compression.accepted_encoding("gzip, deflate") == "gzip"
+    assert compression.accepted_encoding("gzip;q=0, deflate") is None
+    assert compression.accepted_encoding("*") == ("br" if compression.brotli else "gzip")
+    assert compression.accepted_encoding("") is None
+    assert compression.accepted_encoding("br") == ("br" if compression.brotli else None)
+
+
+def test_large_text_responses_are_compressed():
+    client = _client()
+    gzip = {"Accept-Encoding": "gzip"}
+
+    response = client.get("/api/rows", headers=gzip)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == PAYLOAD
+
+    response = client.get("/api/stream", headers=gzip)
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"line {i}\n" for i in range(5_000))
+
+    for path in ("/api/small", "/api/raw/x", "/api/binary"):
+        assert "content-encoding" not in client.get(path, headers=gzip).headers, path
+    assert "content-encoding" not in client.get("/api/rows", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_cacheable_routes_compress_once():
+    client = _client()
+    before = {result: compression.CACHE_LOOKUPS.labels(result).value for result in ("hit", "miss")}
+
+    bodies = [client.get("/api/cached", headers={"Accept-Encoding": "gzip"}) for _ in range(3)]
+    assert all(response.json() == PAYLOAD for response in bodies)
+    assert compression.CACHE_LOOKUPS.labels("miss").value - before["miss"] == 1
+    assert compression.CACHE_LOOKUPS.labels("hit").value - before["hit"] == 2
+
+    # Uncached routes do not go through the cache.
+    client.get("/api/rows", headers={"Accept-Encoding": "gzip"})
+    assert compression.CACHE_LOOKUPS.labels("miss").value - before["miss"] == 1
+
+
+def test_app_compresses_large_lists():
+    client = TestClient(app)
+    client.post("/api/v1/customers/bulk", json=[
+        {"id": f"gzip-{i}", "name": f"Compressed {i}", "status": "Active", "total_spent": i, "total_transactions": 1}
+        for i in range(30)
+    ])
+    response = client.get("/api/v1/customers/", params={"limit": 30}, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["items"]) == 30
+
+
+def test_declared_routes_exist():
+    paths = {route.path for route in app.routes}
+    for route in [*uncompressed_routes, *precompressed_routes]:
+        assert f"/api/v1{route}" in paths, route
@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+
+from app import models
+from app.api import deps
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.table_versions import TableVersions
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_table_versions_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "versions.bin")
+    worker_a, worker_b = TableVersions(path), TableVersions(path)
+
+    before = worker_b.get("customers", "transactions")
+    assert all(version > 0 for version in before)
+    worker_a.bump("customers")
+    after = worker_b.get("customers", "transactions")
+    assert after == (before[0] + 1, before[1])
+
+
+def test_unchanged_poll_returns_304_without_touching_the_database():
+    response = client.get("/api/v1/customers/", params={"limit": 5})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"] == "no-cache"
+
+    def no_session():
+        raise AssertionError("a 304 must not open a session")
+        yield
+
+    app.dependency_overrides[deps.get_db] = no_session
+    try:
+        response = client.get("/api/v1/customers/", params={"limit": 5}, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        # The strong form of the same tag, and lists of tags, match too.
+        response = client.get(
+            "/api/v1/customers/", params={"limit": 5}, headers={"If-None-Match": f'"other", {etag[2:]}'},
+        )
+        assert response.status_code == 304
+    finally:
+        app.dependency_overrides.pop(deps.get_db)
+
+    # Other query parameters are another resource.
+    response = client.get("/api/v1/customers/", params={"limit": 6}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_writes_change_the_etag():
+    etags = {path: client.get(path).headers["etag"] for path in ("/api/v1/customers/", "/api/v1/customer/summary")}
+    usuarios = client.get("/api/v1/bi/usuarios/").headers["etag"]
+
+    response = client.post(
+        "/api/v1/customers/",
+        json={"name": "ETag Customer", "status": "Active", "total_spent": 5, "total_transactions": 1},
+    )
+    assert response.status_code == 200
+
+    for path, etag in etags.items():
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 200, path
+        assert response.headers["etag"] != etag
+    # Tables that were not written keep their ETags.
+    assert client.get("/api/v1/bi/usuarios/", headers={"If-None-Match": usuarios}).status_code == 304
+
+
+def test_write_in_another_worker_is_not_served_stale_under_the_new_etag():
+    first = client.get("/api/v1/customer/summary")
+    etag = first.headers["etag"]
+
+    # Another worker: its own mapping of the shared file, and a write this
+    # worker's summary cache is never told about.
+    other_worker = TableVersions(settings.TABLE_VERSIONS_PATH)
+    with SessionLocal() as db:
+        db.add(models.Customer(name="Other Worker", status="Active", total_spent=7, total_transactions=1))
+        db.commit()
+    other_worker.bump(models.Customer)
+
+    second = client.get("/api/v1/customer/summary", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert second.json()["total_customers"] == first.json()["total_customers"] + 1
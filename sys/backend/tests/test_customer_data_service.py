@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pandas as pd
+
+from app.services.customer_data_service import aggregate_customers
+
+def test_aggregate_customers_groups_transactions_per_customer():
+    customers_master = pd.DataFrame([
+        {'customer_id': '1', 'name': 'Alice'},
+        {'customer_id': '2', 'name': 'Bob'},
+    ])
+    transactions_df = pd.DataFrame({
+        'Código': ['1', '1', '3', '4', 'nan'],
+        'Valor Total': [10.0, 5.0, 2.0, 7.0, 1.0],
+        'Data (Recibo)': pd.to_datetime(['2024-01-01', '2024-01-20', '2023-01-01', '2023-12-01', None]),
+    })
+    sales_df = pd.DataFrame({'Código': ['5']})
+
+    customers = aggregate_customers(
+        customers_master, transactions_df, sales_df, now=datetime(2024, 2, 1)
+    ).set_index('id')
+
+    assert sorted(customers.index) == ['1', '2', '3', '4', '5']
+    assert customers.loc['1', 'name'] == 'Alice'
+    assert customers.loc['1', 'total_spent'] == 15.0
+    assert customers.loc['1', 'total_transactions'] == 2
+    assert customers.loc['1', 'last_transaction_date'] == datetime(2024, 1, 20)
+    assert customers.loc['1', 'status'] == 'Active'
+    assert customers.loc['4', 'status'] == 'At Risk'
+    assert customers.loc['3', 'status'] == 'Inactive'
+    assert customers.loc['3', 'name'] == 'Unknown Customer'
+    assert customers.loc['2', 'status'] == 'New'
+    assert customers.loc['2', 'last_transaction_date'] is None
+    assert customers.loc['5', 'total_transactions'] == 0
+
+def test_aggregate_customers_handles_empty_sheets():
+    customers = aggregate_customers(pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+    assert customers.empty
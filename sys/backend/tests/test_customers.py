@@ -14,4 +14,32 @@ def test_create_customer():
 def test_read_customers():
     response = client.get("/api/v1/customers/")
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
\ No newline at end of file
+    assert isinstance(response.json()["items"], list)
+
+def test_bulk_upsert_customers_is_idempotent():
+    payload = [
+        {"id": "bulk-1", "name": "Bulk One", "status": "Active", "total_spent": 10, "total_transactions": 1},
+        {"id": "bulk-2", "name": "Bulk Two", "status": "New", "total_spent": 0, "total_transactions": 0},
+    ]
+    response = client.post("/api/v1/customers/bulk", json=payload)
+    assert response.status_code == 200
+    assert response.json() == {"upserted": 2}
+
+    payload[0]["total_spent"] = 25
+    response = client.post("/api/v1/customers/bulk", json=payload)
+    assert response.status_code == 200
+    assert response.json() == {"upserted": 2}
+
+    response = client.get("/api/v1/customers/bulk-1")
+    assert response.json()["total_spent"] == 25
+
+def test_summary_is_refreshed_after_writes():
+    before = client.get("/api/v1/customer/summary").json()
+    client.post(
+        "/api/v1/customers/",
+        json={"name": "Summary Customer", "status": "Active", "total_spent": 40, "total_transactions": 2},
+    )
+    after = client.get("/api/v1/customer/summary").json()
+    assert after["total_customers"] == before["total_customers"] + 1
+    assert after["active_customers"] == before["active_customers"] + 1
+    assert after["total_revenue"] == before["total_revenue"] + 40
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import models
+from app.core.database import Base, SessionLocal, engine
+from app.crud import dimension_cache
+from app.crud.aio import crud_bi as aio_crud_bi
+from app.main import app
+from app.schemas import business_intelligence as schemas
+
+client = TestClient(app)
+
+def _lookups(table, result):
+    return dimension_cache.LOOKUPS.labels(table, result).value
+
+def _selects(fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return result, statements
+
+def test_loaded_rows_are_served_without_queries():
+    with SessionLocal() as db:
+        estagio = models.DimEstagio(estagio_nome="Cache stage", ordem=50)
+        db.add(estagio)
+        db.commit()
+        estagio_id = estagio.id
+        dimension_cache.cache.load(db)
+
+    hits = _lookups("dim_estagio", "hit")
+    response, selects = _selects(lambda: client.post("/api/v1/bi/estagios/batch", json={"ids": [estagio_id]}))
+    assert response.json()["items"][0]["estagio_nome"] == "Cache stage"
+    assert selects == []
+    assert _lookups("dim_estagio", "hit") == hits + 1
+
+def test_writes_through_crud_bi_refresh_the_cache():
+    usuario = client.post("/api/v1/bi/usuarios/", json={"nome": "Cache User", "email": "cache@example.com"}).json()
+    response, selects = _selects(lambda: client.post("/api/v1/bi/usuarios/batch", json={"ids": [usuario["id"]]}))
+    assert response.json()["items"] == [usuario]
+    assert selects == []
+
+def test_async_writes_refresh_the_cache(tmp_path, monkeypatch):
+    cache = dimension_cache.DimensionCache()
+    monkeypatch.setattr(aio_crud_bi, "cache", cache)
+
+    async def run():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(async_engine, expire_on_commit=False)() as db:
+            usuario = await aio_crud_bi.create_usuario(
+                db, schemas.DimUsuarioCreate(nome="Async Cache User", email="async-cache@example.com"),
+            )
+        await async_engine.dispose()
+        return usuario.id
+
+    usuario_id = asyncio.run(run())
+    # A hit never touches the session.
+    rows, missing = cache.get_many(None, models.DimUsuario, [usuario_id])
+    assert [row.nome for row in rows] == ["Async Cache User"]
+    assert missing == []
+
+def test_rows_written_elsewhere_are_fetched_once():
+    with SessionLocal() as db:
+        origem = models.DimOrigem(origem_nome="Cache origem elsewhere")
+        db.add(origem)
+        db.commit()
+        origem_id = origem.id
+
+    misses = _lookups("dim_origem", "miss")
+    _, selects = _selects(lambda: client.post("/api/v1/bi/origens/batch", json={"ids": [origem_id, 888_888]}))
+    assert len(selects) == 1
+    assert _lookups("dim_origem", "miss") == misses + 2
+    _, selects = _selects(lambda: client.post("/api/v1/bi/origens/batch", json={"ids": [origem_id]}))
+    assert selects == []
+
+def test_fact_responses_carry_dimension_labels():
+    with SessionLocal() as db:
+        empresa = models.DimEmpresa(nome_empresa="Label Co", segmento="gym")
+        usuario = models.DimUsuario(nome="Label User", email="label@example.com")
+        estagio = models.DimEstagio(estagio_nome="Label stage", ordem=60)
+        origem = models.DimOrigem(origem_nome="Label origem")
+        pessoa = models.DimPessoa(nome="Label Person", empresa=empresa)
+        db.add_all([empresa, usuario, estagio, origem, pessoa])
+        db.flush()
+        deal = models.FatoOportunidades(
+            company_id=empresa.id, person_id=pessoa.id, user_id=usuario.id, data_criacao=datetime(2024, 1, 1),
+            stage_id=estagio.id, valor=1.0, origem_id=origem.id,
+        )
+        db.add(deal)
+        db.commit()
+        deal_id = deal.id
+        dimension_cache.cache.load(db)
+
+    cursor = None
+    while True:
+        page = client.get("/api/v1/bi/oportunidades/", params={"limit": 100, **({"cursor": cursor} if cursor else {})}).json()
+        match = [item for item in page["items"] if item["id"] == deal_id]
+        if match or not page["next_cursor"]:
+            break
+        cursor = page["next_cursor"]
+    assert match[0]["estagio_nome"] == "Label stage"
+    assert (match[0]["empresa_nome"], match[0]["usuario_nome"], match[0]["origem_nome"]) == (
+        "Label Co", "Label User", "Label origem",
+    )
+    assert match[0]["estagio"] is None  # labels come from the cache, not an expansion
+
+def test_lookups_are_exported_as_metrics():
+    assert "dimension_cache_lookups_total" in client.get("/metrics").text
@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import models
+from app.core.database import SessionLocal, engine
+from app.crud import dimension_cache
+from app.main import app
+
+client = TestClient(app)
+
+ROWS = 40
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture(scope="module", autouse=True)
+def seed():
+    t0 = datetime(2024, 1, 1)
+    with SessionLocal() as db:
+        empresa = models.DimEmpresa(nome_empresa="Expand Co", segmento="fitness")
+        usuario = models.DimUsuario(nome="Expand User", email="expand@example.com")
+        estagios = [models.DimEstagio(estagio_nome=f"Expand stage {i}", ordem=i) for i in range(2)]
+        origem = models.DimOrigem(origem_nome="Expand origem")
+        pessoa = models.DimPessoa(nome="Expand Person", empresa=empresa)
+        db.add_all([empresa, usuario, *estagios, origem, pessoa])
+        db.flush()
+        deals = [
+            models.FatoOportunidades(
+                company_id=empresa.id, person_id=pessoa.id, user_id=usuario.id, data_criacao=t0,
+                stage_id=estagios[i % 2].id, valor=100.0 + i, origem_id=origem.id,
+            )
+            for i in range(ROWS)
+        ]
+        db.add_all(deals)
+        db.flush()
+        db.add_all([
+            models.FatoMovimentacoes(
+                deal_id=deal.id, out_stage_id=estagios[0].id, in_stage_id=estagios[1].id, user_id=usuario.id,
+                data_entrada=t0, data_saida=t0 + timedelta(hours=1),
+            )
+            for deal in deals
+        ])
+        for i in range(ROWS):
+            teacher = models.Teacher(name=f"Expand teacher {i}", type="Titular", contracted_hours=20)
+            teacher.work_logs = [models.WorkLog(check_in=t0, check_out=t0 + timedelta(hours=2)) for _ in range(2)]
+            teacher.schedule_entries = [
+                models.ScheduleEntry(start_time=t0, end_time=t0 + timedelta(hours=1), day=1, class_type="Escalada")
+            ]
+            db.add(teacher)
+        db.commit()
+        dimension_cache.cache.load(db)  # as at startup
+
+def _get(path, **params):
+    with count_statements() as statements:
+        response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["items"], len(statements)
+
+@pytest.mark.parametrize("path, expand, max_statements", [
+    ("/api/v1/bi/oportunidades/", [], 1),
+    ("/api/v1/bi/oportunidades/", ["estagio", "origem,usuario", "empresa", "pessoa"], 1),
+    ("/api/v1/bi/movimentacoes/", ["oportunidade.estagio", "estagio_entrada", "usuario"], 1),
+    ("/api/v1/productivity/teachers/", [], 1),
+    ("/api/v1/productivity/teachers/", ["work_logs", "schedule_entries"], 3),
+])
+def test_statements_per_request_do_not_grow_with_page_size(path, expand, max_statements):
+    small, small_count = _get(path, limit=2, expand=expand)
+    large, large_count = _get(path, limit=ROWS, expand=expand)
+    assert len(large) == ROWS
+    assert small_count == large_count <= max_statements
+
+def test_expanded_relationships_are_embedded():
+    items, _ = _get("/api/v1/bi/movimentacoes/", expand="oportunidade.estagio,estagio_entrada")
+    assert items[0]["oportunidade"]["estagio"]["estagio_nome"].startswith("Expand stage")
+    assert items[0]["estagio_entrada"]["estagio_nome"] == "Expand stage 1"
+    assert items[0]["oportunidade"]["origem"] is None
+    assert items[0]["usuario"] is None
+
+    teachers, _ = _get("/api/v1/productivity/teachers/", expand="work_logs")
+    assert len(teachers[0]["workLogs"]) == 2
+    assert teachers[0]["scheduleEntries"] is None
+    assert teachers[0]["contractedHours"] == 20
+
+def test_unknown_expansion_is_rejected():
+    response = client.get("/api/v1/bi/oportunidades/", params={"expand": "estagio,secret"})
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
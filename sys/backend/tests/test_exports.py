@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.business_intelligence import MetodoPagamentoEnum, StatusPagamentoEnum, TipoFinanceiroEnum
+
+client = TestClient(app)
+
+def test_export_fato_financeiro_ndjson_and_csv():
+    db = SessionLocal()
+    db.add_all([
+        models.FatoFinanceiro(
+            data=datetime(2024, 5, day), valor=100.0 * day, tipo=TipoFinanceiroEnum.entrada,
+            metodo=MetodoPagamentoEnum.pix, status=StatusPagamentoEnum.sucesso,
+        )
+        for day in range(1, 6)
+    ])
+    db.commit()
+    expected = db.query(models.FatoFinanceiro).count()
+    db.close()
+
+    response = client.get("/api/v1/bi/fato_financeiro/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == expected
+    assert rows[0]["metodo"] == "pix"
+    assert rows[0]["data"].startswith("2024-05-01")
+
+    response = client.get("/api/v1/bi/fato_financeiro/export", params={"format": "csv"})
+    assert response.status_code == 200
+    table = list(csv.reader(io.StringIO(response.text)))
+    assert table[0] == [column.name for column in models.FatoFinanceiro.__table__.columns]
+    assert len(table) == expected + 1
@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import create_engine
+
+from benchmarks import bench_fact_indexes as bench
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'facts.db'}")
+    bench.seed(engine, rows=5_000)
+    yield engine
+    engine.dispose()
+
+def test_fact_queries_switch_from_scans_to_index_searches(engine):
+    before = bench.measure(engine, repeat=1)
+    bench.create_indexes(engine)
+    after = bench.measure(engine, repeat=1)
+    for name in bench.QUERIES:
+        assert before[name][0].startswith("SCAN"), name
+        assert after[name][0].startswith("SEARCH") and "USING COVERING INDEX ix_fato_" in after[name][0], name
+
+def test_models_declare_the_migrated_indexes():
+    from importlib import import_module
+    migration = import_module("migrations.versions.3b9d4c7e2a10_fact_table_composite_indexes")
+    declared = {(index.table.name, index.name, tuple(c.name for c in index.columns)) for index in bench.composite_indexes()}
+    assert declared == {(table, name, tuple(columns)) for name, table, columns in migration.INDEXES}
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.api import fast_json
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seed():
+    t0 = datetime(2024, 5, 1, 9, 30)
+    with SessionLocal() as db:
+        teacher = models.Teacher(name="Fast JSON teacher", type="Titular", contracted_hours=20)
+        teacher.work_logs = [
+            models.WorkLog(check_in=t0 + timedelta(days=i), check_out=None if i == 0 else t0 + timedelta(days=i, hours=2))
+            for i in range(5)
+        ]
+        db.add(teacher)
+        db.add_all([
+            models.Transaction(
+                item=f"fast-{i}", category="plan", quantity=1, unit_value=12.5, total_value=12.5 * i,
+                payment_method="pix", date=t0 + timedelta(hours=i), customer_id=7,
+            )
+            for i in range(5)
+        ])
+        db.commit()
+
+
+def _walk(path, monkeypatch, fast):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", fast)
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = pages[-1]["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("path", ["/api/v1/sales/transactions/", "/api/v1/productivity/work_logs/"])
+def test_fast_path_matches_response_model(path, monkeypatch):
+    expected = _walk(path, monkeypatch, fast=False)
+    assert _walk(path, monkeypatch, fast=True) == expected
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert _walk(path, monkeypatch, fast=True) == expected
+
+
+def test_fast_path_uses_schema_aliases(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    item = client.get("/api/v1/productivity/work_logs/", params={"limit": 1}).json()["items"][0]
+    assert set(item) == {"id", "teacherId", "checkIn", "checkOut"}
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.crud import crud_funnel
+from app.schemas.enums import WinGroupBy
+
+def _seed(db):
+    lead, proposal, won = (
+        models.DimEstagio(id=1, estagio_nome="Lead", ordem=1),
+        models.DimEstagio(id=2, estagio_nome="Proposta", ordem=2),
+        models.DimEstagio(id=3, estagio_nome="Ganho", ordem=3),
+    )
+    db.add_all([
+        lead, proposal, won,
+        models.DimOrigem(id=1, origem_nome="Instagram"),
+        models.DimOrigem(id=2, origem_nome="Indicacao"),
+        models.DimUsuario(id=1, nome="Ana", email="ana@example.com"),
+    ])
+    t0 = datetime(2024, 1, 1)
+    deals = [
+        # id, stage, origem, value, closed
+        (1, 1, 1, 100.0, None),
+        (2, 1, 1, 200.0, None),
+        (3, 2, 2, 300.0, None),
+        (4, 3, 1, 400.0, t0 + timedelta(days=10)),
+        (5, 3, 2, 600.0, t0 + timedelta(days=12)),
+    ]
+    for deal_id, stage, origem, value, closed in deals:
+        db.add(models.FatoOportunidades(
+            id=deal_id, company_id=None, person_id=None, user_id=1, data_criacao=t0,
+            data_encerramento=closed, stage_id=stage, valor=value, origem_id=origem,
+        ))
+    # Deal 2 reached the proposal stage before falling back to lead.
+    db.add_all([
+        models.FatoMovimentacoes(deal_id=2, out_stage_id=1, in_stage_id=2, user_id=1,
+                                 data_entrada=t0, data_saida=t0 + timedelta(hours=2)),
+        models.FatoMovimentacoes(deal_id=4, out_stage_id=1, in_stage_id=2, user_id=1,
+                                 data_entrada=t0, data_saida=t0 + timedelta(hours=4)),
+    ])
+    db.commit()
+
+def test_stage_funnel_counts_reached_stages_and_conversion(db):
+    _seed(db)
+    stages = crud_funnel.get_stage_funnel(db)
+    assert [(s["estagio_nome"], s["current_deals"], s["reached"]) for s in stages] == [
+        ("Lead", 2, 5), ("Proposta", 1, 4), ("Ganho", 2, 2),
+    ]
+    assert stages[0]["conversion_from_previous"] is None
+    assert stages[1]["conversion_from_previous"] == pytest.approx(0.8)
+    assert stages[2]["conversion_from_previous"] == pytest.approx(0.5)
+
+def test_stage_funnel_respects_date_range(db):
+    _seed(db)
+    stages = crud_funnel.get_stage_funnel(db, start=datetime(2025, 1, 1))
+    assert all(s["reached"] == 0 and s["current_deals"] == 0 for s in stages)
+
+def test_stage_dwell_in_seconds(db):
+    _seed(db)
+    (proposal,) = crud_funnel.get_stage_dwell(db)
+    assert proposal["estagio_nome"] == "Proposta"
+    assert proposal["transitions"] == 2
+    assert proposal["avg_seconds"] == pytest.approx(3 * 3600, rel=1e-6)
+
+def test_wins_by_origem(db):
+    _seed(db)
+    wins = crud_funnel.get_wins(db, group_by=WinGroupBy.origem)
+    assert [(w["group_name"], w["deals_won"], w["won_value"]) for w in wins] == [
+        ("Indicacao", 1, 600.0), ("Instagram", 1, 400.0),
+    ]
+    assert sum(w["share"] for w in wins) == pytest.approx(1.0)
+    assert crud_funnel.get_wins(db, end=datetime(2024, 1, 12))[0]["won_value"] == 400.0
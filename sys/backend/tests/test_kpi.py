@@ -0,0 +1,110 @@
+import os
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, select
+
+from app import models
+from app.core.config import settings
+from app.core.database import Base
+from app.crud import crud_analytics, crud_kpi, crud_sales
+from app.main import app
+from app.schemas import analytics as analytics_schemas, sales as sales_schemas
+
+client = TestClient(app)
+
+def _transaction(total, date, **extra):
+    return dict(item="plan", category="membership", quantity=1, unit_value=total,
+                total_value=total, payment_method="pix", date=date, **extra)
+
+def _snapshot(db):
+    return {
+        model.__tablename__: sorted(tuple(row) for row in db.execute(select(*model.__table__.columns)))
+        for model in (models.KpiCustomerTotals, models.KpiMonthlyRevenue, models.KpiFunnelStage)
+    }
+
+@pytest.mark.parametrize("on_conflict", [True, False], ids=["on-conflict", "update-then-insert"])
+def test_incremental_updates_match_a_full_rebuild(db, monkeypatch, on_conflict):
+    if not on_conflict:
+        monkeypatch.setattr(crud_kpi, "_upsert_dialects", {})
+    crud_sales.create_transaction(db, sales_schemas.TransactionCreate(**_transaction(100.0, datetime(2024, 1, 5))), 1)
+    crud_sales.create_transaction(db, sales_schemas.TransactionCreate(**_transaction(50.0, datetime(2024, 2, 9))), 1)
+    crud_sales.create_transactions(db, [
+        sales_schemas.TransactionBulkCreate(**_transaction(30.0, datetime(2024, 1, 20), customer_id=2)),
+        sales_schemas.TransactionBulkCreate(**_transaction(20.0, datetime(2024, 1, 2), customer_id=1)),
+    ])
+    crud_analytics.create_activity(db, analytics_schemas.ActivityCreate(description="call", date=datetime(2024, 3, 1)), 2)
+    crud_sales.create_sales_funnel(db, sales_schemas.SalesFunnelCreate(stage="Lead", value=10.0), 1)
+    crud_sales.create_sales_funnel(db, sales_schemas.SalesFunnelCreate(stage="Lead", value=5.0), 2)
+
+    totals = crud_kpi.get_customer_totals(db, "1")
+    assert (totals.transactions, totals.revenue, totals.last_transaction_date) == (3, 170.0, datetime(2024, 2, 9))
+    totals = crud_kpi.get_customer_totals(db, "2")
+    assert (totals.transactions, totals.activities, totals.last_activity_date) == (1, 1, datetime(2024, 3, 1))
+    assert [(m.month, m.transactions, m.revenue) for m in crud_kpi.get_monthly_revenue(db)] == [
+        (datetime(2024, 1, 1), 3, 150.0), (datetime(2024, 2, 1), 1, 50.0),
+    ]
+    assert [(s.stage, s.deals, s.value) for s in crud_kpi.get_funnel_stages(db)] == [("Lead", 2, 15.0)]
+
+    incremental = _snapshot(db)
+    assert crud_kpi.rebuild(db) == {"kpi_customer_totals": 2, "kpi_monthly_revenue": 2, "kpi_funnel_stage": 1}
+    assert _snapshot(db) == incremental
+
+def test_monthly_revenue_range(db):
+    for month in (1, 2, 3):
+        crud_sales.create_transaction(db, sales_schemas.TransactionCreate(**_transaction(10.0, datetime(2024, month, 15))), 1)
+    rows = crud_kpi.get_monthly_revenue(db, start=datetime(2024, 2, 10), end=datetime(2024, 3, 1))
+    assert [row.month for row in rows] == [datetime(2024, 2, 1)]
+
+def test_migration_skips_kpi_tables_created_at_startup(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)  # as app startup does
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    # No config file, so env.py leaves the test run's logging alone.
+    config = Config()
+    config.set_main_option("script_location", os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations"))
+    try:
+        command.stamp(config, "3b9d4c7e2a10")
+        command.upgrade(config, "head")
+        assert {"kpi_customer_totals", "kpi_monthly_revenue", "kpi_funnel_stage"} <= set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+
+def test_kpi_endpoints():
+    response = client.post("/api/v1/sales/transactions/bulk", json=[
+        _transaction(40.0, "2017-05-03T10:00:00", customer_id=9017),
+        _transaction(60.0, "2017-05-04T10:00:00", customer_id=9017),
+    ])
+    assert response.json() == {"created": 2}
+
+    totals = client.get("/api/v1/kpi/customers/9017").json()
+    assert (totals["transactions"], totals["revenue"]) == (2, 100.0)
+    assert client.get("/api/v1/kpi/customers/no-such-customer").status_code == 404
+
+    months = client.get("/api/v1/kpi/revenue/monthly", params={"start": "2017-05-01", "end": "2017-06-01"}).json()
+    assert months == [{"month": "2017-05-01T00:00:00", "transactions": 2, "revenue": 100.0}]
+    assert client.get("/api/v1/kpi/funnel").status_code == 200
+
+def test_async_writes_update_kpis(tmp_path):
+    import asyncio
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from app.crud.aio import crud_sales as async_crud_sales
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async_kpi.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            await async_crud_sales.create_transaction(
+                db, sales_schemas.TransactionCreate(**_transaction(25.0, datetime(2024, 4, 2))), 3,
+            )
+            totals = await db.get(models.KpiCustomerTotals, "3")
+        await engine.dispose()
+        return totals
+
+    totals = asyncio.run(run())
+    assert (totals.transactions, totals.revenue) == (1, 25.0)
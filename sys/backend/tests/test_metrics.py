@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry
+from app.main import app
+
+client = TestClient(app)
+
+def test_metrics_endpoint_reports_route_latency_and_db_time():
+    client.post(
+        "/api/v1/customers/",
+        json={"name": "Metrics Customer", "status": "Active", "total_spent": 1, "total_transactions": 1},
+    )
+    client.get("/api/v1/customers/")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/customers/",status="200"}' in body
+    assert 'http_request_db_seconds_count{method="GET",route="/api/v1/customers/"}' in body
+    assert "http_requests_in_flight " in body
+    rows_sum = next(
+        line for line in body.splitlines()
+        if line.startswith('http_request_db_rows_sum{method="GET",route="/api/v1/customers/"}')
+    )
+    assert float(rows_sum.split()[-1]) >= 1
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.labels("/x").observe(value)
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/x",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/x"} 3' in lines
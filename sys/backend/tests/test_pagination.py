@@ -0,0 +1,72 @@
+from datetime import datetime
+from importlib import import_module
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+
+from app import models
+from app.core.database import Base
+from app.crud.pagination import encode_cursor, keyset
+from app.main import app
+
+client = TestClient(app)
+
+def _create_transaction(day):
+    response = client.post(
+        "/api/v1/sales/transactions/?customer_id=1",
+        json={
+            "item": f"item-{day}", "category": "plan", "quantity": 1, "unit_value": 10,
+            "total_value": 10, "payment_method": "pix", "date": f"2024-03-{day:02d}T10:00:00",
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def test_transactions_cursor_walks_every_row_once_in_date_order():
+    created = {_create_transaction(day) for day in (5, 1, 3, 1, 4)}
+
+    seen, dates, cursor = [], [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/v1/sales/transactions/", params=params).json()
+        assert len(page["items"]) <= 2
+        seen += [item["id"] for item in page["items"]]
+        dates += [item["date"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert created <= set(seen)
+    assert len(seen) == len(set(seen))
+    assert dates == sorted(dates)
+
+def test_invalid_cursor_is_rejected():
+    response = client.get("/api/v1/sales/transactions/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_out_of_range_limits_are_rejected():
+    for path in ("/api/v1/customers/", "/api/v1/sales/transactions/", "/api/v1/bi/usuarios/"):
+        for limit in (0, -1, 1001):
+            assert client.get(path, params={"limit": limit}).status_code == 422, (path, limit)
+        assert client.get(path, params={"limit": 1}).status_code == 200, path
+
+def test_date_keyset_is_served_by_the_date_id_indexes(tmp_path):
+    migration = import_module("migrations.versions.c7a2e5d8f140_keyset_pagination_indexes")
+    engine = create_engine(f"sqlite:///{tmp_path / 'keyset.db'}")
+    Base.metadata.create_all(engine)
+    cursor = encode_cursor([datetime(2024, 3, 1), 7])
+    try:
+        with engine.connect() as conn:
+            for name, table, columns in migration.INDEXES:
+                model = {"transactions": models.Transaction, "activities": models.Activity}[table]
+                declared = {index.name: [c.name for c in index.columns] for index in model.__table__.indexes}
+                assert declared[name] == columns
+                stmt = keyset(select(model), [model.date, model.id], cursor=cursor, limit=10)
+                sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+                plan = " ".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+                assert f"INDEX {name}" in plan, plan
+                assert "TEMP B-TREE" not in plan, plan
+    finally:
+        engine.dispose()
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.query_profiler import QueryProfiler, normalize_statement
+
+def test_normalize_statement_collapses_literals_and_in_lists():
+    assert normalize_statement("SELECT *  FROM t\n WHERE a = 5 AND b = 'x' AND c IN (?, ?, ?)") == \
+        "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)"
+
+def test_profiler_aggregates_calls_and_captures_slow_plans(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    profiler = QueryProfiler(slow_threshold_ms=0)
+    profiler.install(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES ('a'), ('b')"))
+    with engine.connect() as conn:
+        names = [
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id}).scalars().all()
+            for item_id in (1, 2, 3)
+        ]
+    # EXPLAIN runs on its own cursor, so the profiled results are intact.
+    assert names == [["a"], ["b"], []]
+
+    report = {row["statement"]: row for row in profiler.report()}
+    select = report["SELECT name FROM items WHERE id = ?"]
+    assert select["calls"] == 3
+    assert select["p95_ms"] <= select["max_ms"]
+    assert select["explain"] and "items" in str(select["explain"])
+    assert report["CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"]["explain"] is None
+
+    path = tmp_path / "profile.json"
+    assert profiler.dump(str(path)) == len(report)
+    assert json.loads(path.read_text())["statements"][0]["calls"] >= 1
+
+def test_failed_statements_do_not_leak_start_times(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    profiler = QueryProfiler(slow_threshold_ms=0)
+    profiler.install(engine)
+
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["profiler_start_time"] == []
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert conn.info["profiler_start_time"] == []
+    assert [row["statement"] for row in profiler.report()] == ["SELECT ?"]
+
+def test_explain_runs_in_a_savepoint_of_the_callers_transaction(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    profiler = QueryProfiler(slow_threshold_ms=0)
+    profiler.install(engine)
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        conn.execute(text("INSERT INTO items (name) VALUES ('a')"))
+        assert conn.execute(text("SELECT name FROM items")).scalars().all() == ["a"]
+        # A failing EXPLAIN is rolled back to its savepoint; the transaction goes on.
+        assert profiler._explain(conn, "SELECT * FROM missing_table", ()) is None
+        conn.execute(text("INSERT INTO items (name) VALUES ('b')"))
+        # Releasing the savepoints did not commit the caller's writes.
+        transaction.rollback()
+        assert conn.execute(text("SELECT count(*) FROM items")).scalar() == 0
+    report = {row["statement"]: row for row in profiler.report()}
+    assert "items" in str(report["SELECT name FROM items"]["explain"])
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app import models
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import crud_bi, rollup, table_versions
+from app.crud.table_versions import TableVersions
+from app.main import app
+from app.schemas.enums import FinanceiroDimension, RollupBucket
+
+client = TestClient(app)
+
+def test_bucket_boundaries():
+    moment = datetime(2023, 12, 28, 15, 30)  # a Thursday
+    assert rollup.bucket_floor(moment, RollupBucket.day) == datetime(2023, 12, 28)
+    assert rollup.bucket_floor(moment, RollupBucket.week) == datetime(2023, 12, 25)
+    assert rollup.bucket_floor(moment, RollupBucket.month) == datetime(2023, 12, 1)
+    assert rollup.bucket_next(datetime(2023, 12, 1), RollupBucket.month) == datetime(2024, 1, 1)
+    assert rollup.bucket_starts(datetime(2024, 1, 15), datetime(2024, 3, 1), RollupBucket.month) == [
+        datetime(2024, 1, 1), datetime(2024, 2, 1),
+    ]
+
+def _transaction(category, payment_method, total, date):
+    response = client.post("/api/v1/sales/transactions/?customer_id=1", json={
+        "item": "plan", "category": category, "quantity": 1, "unit_value": total,
+        "total_value": total, "payment_method": payment_method, "date": date,
+    })
+    assert response.status_code == 200
+
+def _rollup(**params):
+    response = client.get("/api/v1/sales/transactions/rollup", params=params)
+    assert response.status_code == 200
+    return response.json()["rows"]
+
+def test_transaction_rollup_groups_by_bucket_and_dimensions():
+    _transaction("membership", "pix", 100.0, "2019-03-04T10:00:00")
+    _transaction("membership", "card", 50.0, "2019-03-05T11:00:00")
+    _transaction("store", "pix", 20.0, "2019-03-12T09:00:00")
+
+    weekly = _rollup(start="2019-03-04T00:00:00", end="2019-03-18T00:00:00", bucket="week", group_by="category")
+    assert [(r["bucket"], r["group"], r["count"], r["total"]) for r in weekly] == [
+        ("2019-03-04T00:00:00", {"category": "membership"}, 2, 150.0),
+        ("2019-03-11T00:00:00", {"category": "store"}, 1, 20.0),
+    ]
+
+    daily = _rollup(start="2019-03-04T00:00:00", end="2019-03-06T00:00:00", group_by=["payment_method", "category"])
+    assert [(r["bucket"][:10], r["group"]) for r in daily] == [
+        ("2019-03-04", {"category": "membership", "payment_method": "pix"}),
+        ("2019-03-05", {"category": "membership", "payment_method": "card"}),
+    ]
+
+def test_closed_buckets_are_cached_until_a_write_invalidates_them():
+    params = dict(start="2018-06-01T00:00:00", end="2018-07-01T00:00:00", bucket="month")
+    _transaction("membership", "pix", 10.0, "2018-06-10T10:00:00")
+    assert _rollup(**params)[0]["total"] == 10.0
+
+    with SessionLocal() as db:  # bypasses crud, so the cached bucket is served as is
+        db.execute(insert(models.Transaction).values(
+            item="plan", category="membership", quantity=1, unit_value=5.0, total_value=5.0,
+            payment_method="pix", date=datetime(2018, 6, 11), customer_id=1,
+        ))
+        db.commit()
+    assert _rollup(**params)[0]["total"] == 10.0
+
+    _transaction("membership", "pix", 1.0, "2018-06-12T10:00:00")
+    assert _rollup(**params)[0]["total"] == 16.0
+
+def test_a_write_in_another_worker_retires_cached_buckets():
+    params = dict(start="2017-06-01T00:00:00", end="2017-07-01T00:00:00", bucket="month")
+    _transaction("membership", "pix", 10.0, "2017-06-10T10:00:00")
+    assert _rollup(**params)[0]["total"] == 10.0
+
+    # Another worker's write: only the shared table version tells this process about it.
+    other_worker = TableVersions(settings.TABLE_VERSIONS_PATH)
+    with SessionLocal() as db:
+        db.execute(insert(models.Transaction).values(
+            item="plan", category="membership", quantity=1, unit_value=5.0, total_value=5.0,
+            payment_method="pix", date=datetime(2017, 6, 11), customer_id=1,
+        ))
+        db.commit()
+    other_worker.bump(models.Transaction)
+    assert _rollup(**params)[0]["total"] == 15.0
+
+def test_rollup_rejects_empty_ranges():
+    response = client.get("/api/v1/sales/transactions/rollup", params={
+        "start": "2020-01-02T00:00:00", "end": "2020-01-01T00:00:00",
+    })
+    assert response.status_code == 400
+
+def test_financeiro_rollup_by_tipo(db):
+    table_versions.bump(models.FatoFinanceiro)
+    F = models.business_intelligence
+    db.add_all([
+        models.FatoFinanceiro(data=datetime(2021, 1, 5), valor=100.0, tipo=F.TipoFinanceiroEnum.entrada,
+                              status=F.StatusPagamentoEnum.sucesso),
+        models.FatoFinanceiro(data=datetime(2021, 1, 20), valor=40.0, tipo=F.TipoFinanceiroEnum.saida,
+                              status=F.StatusPagamentoEnum.sucesso),
+        models.FatoFinanceiro(data=datetime(2021, 2, 2), valor=60.0, tipo=F.TipoFinanceiroEnum.entrada,
+                              status=F.StatusPagamentoEnum.falha),
+    ])
+    db.commit()
+    rows = crud_bi.get_financeiro_rollup(
+        db, RollupBucket.month, datetime(2021, 1, 1), datetime(2021, 3, 1), group_by=[FinanceiroDimension.tipo],
+    )
+    assert [(r["bucket"], r["group"]["tipo"], r["total"]) for r in rows] == [
+        (datetime(2021, 1, 1), "entrada", 100.0),
+        (datetime(2021, 1, 1), "saida", 40.0),
+        (datetime(2021, 2, 1), "entrada", 60.0),
+    ]
+    table_versions.bump(models.FatoFinanceiro)
+
+def test_closed_buckets_expire_for_loads_behind_the_crud_layer(db, monkeypatch):
+    monkeypatch.setattr(settings, "ROLLUP_CLOSED_CACHE_TTL_SECONDS", 0.0)
+    table_versions.bump(models.FatoFinanceiro)
+    F = models.business_intelligence
+    span = (RollupBucket.month, datetime(2016, 1, 1), datetime(2016, 2, 1))
+
+    def financeiro(valor):
+        db.add(models.FatoFinanceiro(data=datetime(2016, 1, 5), valor=valor, tipo=F.TipoFinanceiroEnum.entrada,
+                                     status=F.StatusPagamentoEnum.sucesso))
+        db.commit()
+
+    financeiro(100.0)
+    assert crud_bi.get_financeiro_rollup(db, *span)[0]["total"] == 100.0
+    financeiro(20.0)  # no crud write path, no version bump
+    assert crud_bi.get_financeiro_rollup(db, *span)[0]["total"] == 120.0
+    table_versions.bump(models.FatoFinanceiro)
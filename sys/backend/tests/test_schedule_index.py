@@ -0,0 +1,163 @@
+import random
+from datetime import datetime, time, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import schedule_index
+from app.crud.schedule_index import IntervalTree, ScheduleIndex, Slot
+from app.main import app
+
+client = TestClient(app)
+
+T0 = datetime(2024, 3, 4)  # a Monday
+
+
+def _at(hours):
+    return T0 + timedelta(hours=hours)
+
+
+def _entry(teacher_id, start, end, class_type="Escalada"):
+    start, end = _at(start), _at(end)
+    return models.ScheduleEntry(
+        teacher_id=teacher_id, start_time=start, end_time=end,
+        day=(start.weekday() + 1) % 7, class_type=class_type,
+    )
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    tree, slots = IntervalTree(), []
+    for i in range(2_000):
+        start = _at(rng.uniform(0, 24 * 7))
+        slot = Slot(i, 1, start, start + timedelta(minutes=rng.randint(15, 600)), 1, "Escalada")
+        tree.add(slot)
+        slots.append(slot)
+    for _ in range(200):
+        start = _at(rng.uniform(-5, 24 * 7))
+        end = start + timedelta(minutes=rng.randint(1, 720))
+        expected = sorted(
+            (slot for slot in slots if slot.start_time < end and slot.end_time > start),
+            key=lambda slot: (slot.start_time, slot.id),
+        )
+        assert tree.overlapping(start, end) == expected
+
+
+def test_overlaps_and_free_slots(db):
+    db.add_all([
+        _entry(1, 9, 10),
+        _entry(1, 9.5, 11, "Calistenia"),
+        _entry(1, 14, 15),
+        _entry(2, 9, 12),
+        # Tuesday
+        _entry(1, 24 + 8, 24 + 9),
+    ])
+    db.commit()
+    index = ScheduleIndex()
+    assert index.load(db) == 5
+
+    overlaps = index.overlapping(_at(10), _at(14.5), teacher_id=1)
+    assert [(slot.start_time, slot.class_type) for slot in overlaps] == [(_at(9.5), "Calistenia"), (_at(14), "Escalada")]
+    assert [slot.teacher_id for slot in index.overlapping(_at(10), _at(11))] == [2, 1]
+    assert index.overlapping(_at(10), _at(11), teacher_id=1, class_type="Escalada") == []
+    # Touching intervals do not overlap, and an entry never conflicts with itself.
+    assert index.overlapping(_at(10), _at(11), teacher_id=1, exclude_id=overlaps[0].id) == []
+    with pytest.raises(schedule_index.InvalidSlotError):
+        index.overlapping(_at(10), _at(10))
+
+    free = index.free_slots(1, T0, T0 + timedelta(days=2), opens=time(8), closes=time(18))
+    assert free == [
+        (_at(8), _at(9)), (_at(11), _at(14)), (_at(15), _at(18)),
+        (_at(24 + 9), _at(24 + 18)),
+    ]
+    # Gaps shorter than min_length are dropped.
+    assert index.free_slots(1, T0, T0 + timedelta(days=1), opens=time(8), closes=time(18),
+                            min_length=timedelta(hours=3)) == [(_at(11), _at(14)), (_at(15), _at(18))]
+
+
+def test_sync_picks_up_rows_written_elsewhere(db):
+    db.add(_entry(1, 9, 10))
+    db.commit()
+    index = ScheduleIndex()
+    index.load(db)
+
+    db.add(_entry(1, 12, 13))
+    db.commit()
+    assert len(index.overlapping(T0, _at(24), teacher_id=1)) == 1
+    index.sync(db)
+    assert len(index.overlapping(T0, _at(24), teacher_id=1)) == 2
+    index.sync(db)
+    assert len(index) == 2
+
+
+def _entry_with_id(id_, start, end):
+    entry = _entry(1, start, end)
+    entry.id = id_
+    return entry
+
+
+def test_sync_picks_up_ids_committed_out_of_order(db):
+    # Ids 2 and 4 were handed out but their transactions had not committed yet.
+    db.add_all([_entry_with_id(1, 8, 9), _entry_with_id(3, 10, 11)])
+    db.commit()
+    index = ScheduleIndex()
+    index.load(db)
+    index.add(_entry_with_id(5, 14, 15))  # committed by this worker
+
+    db.add_all([_entry_with_id(2, 9, 10), _entry_with_id(4, 12, 13), _entry_with_id(5, 14, 15)])
+    db.commit()
+    index.sync(db)
+    assert [slot.id for slot in index.overlapping(T0, _at(24), teacher_id=1)] == [1, 2, 3, 4, 5]
+    assert index._gaps == {}
+
+
+def test_expired_gaps_wait_for_the_periodic_reload(db, monkeypatch):
+    db.add_all([_entry_with_id(1, 8, 9), _entry_with_id(3, 10, 11)])
+    db.commit()
+    index = ScheduleIndex()
+    index.load(db)
+
+    monkeypatch.setattr(settings, "SCHEDULE_INDEX_GAP_TTL_SECONDS", -1.0)
+    db.add(_entry_with_id(2, 9, 10))
+    db.commit()
+    index.sync(db)
+    assert len(index) == 2
+
+    monkeypatch.setattr(settings, "SCHEDULE_INDEX_RELOAD_SECONDS", 0.0)
+    index.sync(db)
+    assert len(index) == 3
+
+
+def test_schedule_endpoints():
+    with SessionLocal() as db:
+        entry = _entry(9_001, 9, 10)
+        db.add(entry)
+        db.commit()
+        entry_id = entry.id
+
+    response = client.get("/api/v1/productivity/schedule/overlaps", params={
+        "start": _at(9.5).isoformat(), "end": _at(12).isoformat(), "teacher_id": 9_001,
+    })
+    assert response.status_code == 200
+    assert [(row["id"], row["startTime"], row["classType"]) for row in response.json()] == [
+        (entry_id, _at(9).isoformat(), "Escalada")
+    ]
+
+    response = client.get("/api/v1/productivity/schedule/free_slots", params={
+        "teacher_id": 9_001, "week_start": T0.isoformat(), "opens": "08:00", "closes": "12:00",
+    })
+    assert response.status_code == 200
+    slots = response.json()
+    assert len(slots) == 8  # two gaps on Monday, the whole window on the other six days
+    assert slots[:2] == [
+        {"startTime": _at(8).isoformat(), "endTime": _at(9).isoformat()},
+        {"startTime": _at(10).isoformat(), "endTime": _at(12).isoformat()},
+    ]
+
+    response = client.get("/api/v1/productivity/schedule/overlaps", params={
+        "start": _at(10).isoformat(), "end": _at(9).isoformat(),
+    })
+    assert response.status_code == 400
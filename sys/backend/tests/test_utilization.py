@@ -0,0 +1,106 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.crud import utilization
+from app.main import app
+
+client = TestClient(app)
+
+T0 = datetime(2024, 3, 4)  # a Monday
+
+
+def _at(hours):
+    return T0 + timedelta(hours=hours)
+
+
+def test_utilization_counts_overlapping_intervals_once(db):
+    ana = models.Teacher(id=1, name="Ana", type="Titular", contracted_hours=20)
+    bia = models.Teacher(id=2, name="Bia", type="Auxiliar", contracted_hours=10)
+    idle = models.Teacher(id=3, name="Caio", type="Auxiliar", contracted_hours=0)
+    db.add_all([ana, bia, idle])
+    db.add_all([
+        # Ana: 8-12 and an overlapping 11-13 log (5h on the clock), classes 9-10 and 12-14.
+        models.WorkLog(teacher_id=1, check_in=_at(8), check_out=_at(12)),
+        models.WorkLog(teacher_id=1, check_in=_at(11), check_out=_at(13)),
+        models.ScheduleEntry(teacher_id=1, start_time=_at(9), end_time=_at(10), day=1, class_type="Escalada"),
+        models.ScheduleEntry(teacher_id=1, start_time=_at(12), end_time=_at(14), day=1, class_type="Escalada"),
+        # Bia: a log straddling the range start and one still open.
+        models.WorkLog(teacher_id=2, check_in=_at(-2), check_out=_at(1)),
+        models.WorkLog(teacher_id=2, check_in=_at(30), check_out=None),
+        # Outside the range.
+        models.WorkLog(teacher_id=1, check_in=_at(24 * 8), check_out=_at(24 * 8 + 5)),
+    ])
+    db.commit()
+
+    rows = {row["teacher_id"]: row for row in utilization.utilization(
+        db, start=T0, end=T0 + timedelta(days=7), now=_at(32),
+    )}
+    assert list(rows) == [1, 2, 3]
+
+    ana = rows[1]
+    assert (ana["worked_hours"], ana["scheduled_hours"], ana["overlap_hours"]) == (5, 3, 2)
+    assert (ana["idle_hours"], ana["missed_hours"]) == (3, 1)
+    assert ana["expected_hours"] == 20
+    assert ana["utilization"] == 0.25
+    assert ana["schedule_adherence"] == pytest.approx(2 / 3)
+
+    bia = rows[2]
+    assert bia["worked_hours"] == pytest.approx(1 + 2)
+    assert bia["scheduled_hours"] == 0 and bia["schedule_adherence"] is None
+
+    assert rows[3]["worked_hours"] == 0 and rows[3]["utilization"] is None
+
+    only_bia = utilization.utilization(db, start=T0, end=T0 + timedelta(days=7), teacher_ids=[2], now=_at(32))
+    assert [row["teacher_id"] for row in only_bia] == [2]
+
+
+def _brute_force(worked, scheduled):
+    """Minute grid per teacher; ``worked``/``scheduled`` are ``(teacher, start, end)`` in minutes."""
+    result = {}
+    for teacher in {t for t, _, _ in worked + scheduled}:
+        on_clock = {m for t, s, e in worked if t == teacher for m in range(s, e)}
+        in_class = {m for t, s, e in scheduled if t == teacher for m in range(s, e)}
+        result[teacher] = {
+            "worked": len(on_clock) * 60.0,
+            "scheduled": len(in_class) * 60.0,
+            "overlap": len(on_clock & in_class) * 60.0,
+        }
+    return result
+
+
+def _arrays(intervals):
+    teachers, starts, ends = zip(*intervals)
+    return np.array(teachers), np.array(starts, dtype=float) * 60, np.array(ends, dtype=float) * 60
+
+
+def test_sweep_matches_brute_force():
+    rng = random.Random(3)
+
+    def intervals(n):
+        out = []
+        for _ in range(n):
+            start = rng.randrange(0, 600)
+            out.append((rng.randrange(1, 6), start, start + rng.randrange(1, 120)))
+        return out
+
+    worked, scheduled = intervals(200), intervals(150)
+    assert utilization.sweep(_arrays(worked), _arrays(scheduled)) == _brute_force(worked, scheduled)
+
+
+def test_utilization_endpoint_validates_range():
+    response = client.get("/api/v1/productivity/utilization", params={
+        "start": "2024-03-10T00:00:00", "end": "2024-03-04T00:00:00",
+    })
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/productivity/utilization", params={
+        "start": "2024-03-04T00:00:00", "end": "2024-03-11T00:00:00",
+    })
+    assert response.status_code == 200
+    for row in response.json():
+        assert {"teacherId", "workedHours", "scheduledHours", "overlapHours", "idleHours"} <= set(row)